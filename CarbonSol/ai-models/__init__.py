@@ -3,10 +3,29 @@ AI Models for the CarbonSol platform
 
 This module contains AI models for price prediction, carbon footprint calculation,
 and project analysis for the CarbonSol platform.
+
+The models are imported on first attribute access, so importing the package
+does not load pandas, scikit-learn or other heavy dependencies up front.
 """
 
-from .price_prediction import PricePredictor
-from .carbon_footprint import CarbonFootprintCalculator
-from .project_analyzer import ProjectAnalyzer
+import importlib
+
+# Public name -> submodule defining it
+_LAZY_ATTRIBUTES = {
+    'PricePredictor': 'price_prediction',
+    'CarbonFootprintCalculator': 'carbon_footprint',
+    'ProjectAnalyzer': 'project_analyzer',
+}
+
+__all__ = ['PricePredictor', 'CarbonFootprintCalculator', 'ProjectAnalyzer']
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        module = importlib.import_module(f".{_LAZY_ATTRIBUTES[name]}", __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-__all__ = ['PricePredictor', 'CarbonFootprintCalculator', 'ProjectAnalyzer'] 
\ No newline at end of file
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -13,6 +13,13 @@ from flask_cors import CORS
 import os
 import json
 import logging
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import pandas as pd
+from batching import MicroBatcher, QueueFullError
+from forecast_cache import ForecastCache
+from forecast_store import ForecastStore
+from metrics import instrument_app, span
 from price_prediction import PricePredictor
 from carbon_footprint import CarbonFootprintCalculator
 from project_analyzer import ProjectAnalyzer
@@ -31,11 +38,131 @@ logger = logging.getLogger(__name__)
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
+instrument_app(app)  # Request metrics, served at /metrics
 
-# Initialize AI models
-price_predictor = PricePredictor()
+# Initialize AI models. The scikit-learn models are created on first use so
+# that importing the API (and starting a worker) does not pay for sklearn.
+# Trained models are loaded from these paths when set; artifact directories
+# saved with artifact_format='mmap' are memory-mapped and shared by workers.
+PRICE_MODEL_PATH = os.environ.get('PRICE_MODEL_PATH')
+PROJECT_MODEL_PATH = os.environ.get('PROJECT_MODEL_PATH')
 carbon_calculator = CarbonFootprintCalculator()
-project_analyzer = ProjectAnalyzer()
+_models = {}
+_models_lock = threading.Lock()
+
+def get_price_predictor():
+    """Get the price predictor, creating it on first use"""
+    with _models_lock:
+        if 'price_predictor' not in _models:
+            _models['price_predictor'] = PricePredictor(PRICE_MODEL_PATH)
+        return _models['price_predictor']
+
+def get_project_analyzer():
+    """Get the project analyzer, creating it on first use"""
+    with _models_lock:
+        if 'project_analyzer' not in _models:
+            _models['project_analyzer'] = ProjectAnalyzer(PROJECT_MODEL_PATH)
+        return _models['project_analyzer']
+
+def __getattr__(name):
+    """Module attribute access for the lazily created models"""
+    if name == 'price_predictor':
+        return get_price_predictor()
+    if name == 'project_analyzer':
+        return get_project_analyzer()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Cache of recent forecasts; keys include the model version, so retraining
+# the predictor makes earlier entries unreachable
+forecast_cache = ForecastCache(
+    max_entries=int(os.environ.get('FORECAST_CACHE_SIZE', 256)),
+    ttl_seconds=float(os.environ.get('FORECAST_CACHE_TTL', 300))
+)
+
+# Forecasts precomputed by forecast_job, served for requests without history
+FORECAST_STORE_PATH = os.environ.get('FORECAST_STORE_PATH')
+forecast_store = ForecastStore(FORECAST_STORE_PATH) if FORECAST_STORE_PATH else None
+
+# Micro-batching settings shared by all model endpoints
+BATCH_MAX_SIZE = int(os.environ.get('BATCH_MAX_SIZE', 32))
+BATCH_MAX_WAIT_MS = float(os.environ.get('BATCH_MAX_WAIT_MS', 5))
+BATCH_QUEUE_SIZE = int(os.environ.get('BATCH_QUEUE_SIZE', 1024))
+INFERENCE_TIMEOUT = float(os.environ.get('INFERENCE_TIMEOUT', 30))
+
+# Upper bound on the forecast horizon; a batch runs every series to its longest horizon
+MAX_DAYS_AHEAD = int(os.environ.get('MAX_DAYS_AHEAD', 365))
+
+# Upper bound on the number of Monte Carlo paths a single request may ask for
+MAX_SCENARIOS = int(os.environ.get('MAX_SCENARIOS', 10000))
+# Upper bound on the scenario horizon; paths cost memory per simulated day
+MAX_SCENARIO_DAYS = int(os.environ.get('MAX_SCENARIO_DAYS', 365))
+
+def is_count(value, upper):
+    """Check that a request parameter is an integer between 1 and upper"""
+    return isinstance(value, int) and not isinstance(value, bool) and 1 <= value <= upper
+
+def wait_for(future):
+    """Wait for a batched result; on timeout, cancel the request so its batch work is dropped"""
+    try:
+        return future.result(timeout=INFERENCE_TIMEOUT)
+    except FutureTimeoutError:
+        future.cancel()
+        raise
+
+def predict_price_batch(items):
+    """Forecast a batch of (historical_data, days_ahead) requests"""
+    # Histories with the same optional columns share a feature layout and
+    # can be stacked into one matrix per forecast step
+    groups = {}
+    for i, (historical_data, _) in enumerate(items):
+        layout = ('volume' in historical_data.columns, 'sentiment' in historical_data.columns)
+        groups.setdefault(layout, []).append(i)
+    
+    results = [None] * len(items)
+    for indices in groups.values():
+        forecasts = get_price_predictor().predict_batch(
+            [items[i][0] for i in indices],
+            [items[i][1] for i in indices]
+        )
+        for i, forecast in zip(indices, forecasts):
+            results[i] = forecast
+    return results
+
+def calculate_footprint_batch(items):
+    """Calculate footprints for a batch of activity payloads"""
+    footprints = carbon_calculator.calculate_batch(pd.DataFrame(items))
+    
+    results = []
+    for row in footprints.to_dict(orient='records'):
+        results.append({
+            "total_emissions": row['total_kg'],
+            "total_tons": row['total_tons'],
+            "breakdown": {category: row[category] for category in carbon_calculator.CATEGORIES},
+            "recommendations": carbon_calculator.get_offset_recommendations(row['total_tons'])
+        })
+    return results
+
+def analyze_project_batch(items):
+    """Analyze a batch of project payloads; a project that fails gets an 'error' entry"""
+    results = get_project_analyzer().analyze_batch(pd.DataFrame(items))
+    results = results.astype(object).where(results.notna(), None)
+    return results.to_dict(orient='records')
+
+price_batcher = MicroBatcher(
+    predict_price_batch, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS, BATCH_QUEUE_SIZE, name='price'
+)
+footprint_batcher = MicroBatcher(
+    calculate_footprint_batch, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS, BATCH_QUEUE_SIZE, name='footprint'
+)
+project_batcher = MicroBatcher(
+    analyze_project_batch, BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS, BATCH_QUEUE_SIZE, name='project'
+)
+
+def overloaded_response():
+    """503 response returned when a batcher's queue is full"""
+    response = jsonify({"error": "Server is busy, please retry"})
+    response.headers['Retry-After'] = '1'
+    return response, 503
 
 @app.route('/health', methods=['GET'])
 def health_check():
@@ -46,44 +173,155 @@ def health_check():
 def predict_price():
     """Endpoint for carbon credit price prediction"""
     try:
-        data = request.json
-        if not data or 'historical_data' not in data:
+        with span('parse'):
+            data = request.json
+        if not data:
             return jsonify({"error": "Missing required parameter: historical_data"}), 400
         
         # Optional parameters
         days_ahead = data.get('days_ahead', 30)
         credit_type = data.get('credit_type', 'VCU')
         
-        # Get prediction
-        prediction = price_predictor.predict(
+        if not is_count(days_ahead, MAX_DAYS_AHEAD):
+            return jsonify({"error": f"days_ahead must be an integer between 1 and {MAX_DAYS_AHEAD}"}), 400
+        
+        # Without a history of its own, the request is answered from the
+        # forecasts the scheduled job stored for the credit type
+        if 'historical_data' not in data:
+            stored = forecast_store.read(credit_type, days_ahead) if forecast_store else None
+            if stored is None:
+                return jsonify({"error": "Missing required parameter: historical_data"}), 400
+            
+            return jsonify({
+                "prediction": [
+                    {"date": date.strftime('%Y-%m-%d'), "predicted_price": float(price)}
+                    for date, price in zip(stored['date'], stored['predicted_price'])
+                ],
+                "credit_type": credit_type,
+                "days_ahead": days_ahead,
+                "model_version": int(stored['model_version'].iloc[0]),
+                "forecast_run_at": stored['run_at'].iloc[0].isoformat()
+            }), 200
+        
+        # Reuse a cached forecast for the same inputs covering at least days_ahead
+        cache_key = forecast_cache.make_key(
             historical_data=data['historical_data'],
-            days_ahead=days_ahead,
-            credit_type=credit_type
+            credit_type=credit_type,
+            model_version=get_price_predictor().model_version
         )
+        cached = forecast_cache.get(cache_key, days_ahead)
+        
+        if cached is None:
+            with span('features'):
+                historical_data = pd.DataFrame(data['historical_data'])
+                historical_data['date'] = pd.to_datetime(historical_data['date'])
+            
+            # Get prediction, batched with concurrent requests
+            with span('inference'):
+                future = price_batcher.submit((historical_data, days_ahead))
+                result = wait_for(future)
+            with span('postprocess'):
+                result['date'] = result['date'].dt.strftime('%Y-%m-%d')
+                cached = {'prediction': result.to_dict(orient='records')}
+            forecast_cache.put(cache_key, days_ahead, cached)
         
-        return jsonify({
-            "prediction": prediction,
-            "credit_type": credit_type,
-            "days_ahead": days_ahead
-        }), 200
+        with span('serialize'):
+            response = jsonify({
+                "prediction": cached['prediction'],
+                "credit_type": credit_type,
+                "days_ahead": days_ahead
+            })
+        return response, 200
     
+    except QueueFullError:
+        return overloaded_response()
     except Exception as e:
         logger.error(f"Error in price prediction: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/predict/price/scenarios', methods=['POST'])
+def predict_price_scenarios():
+    """Endpoint for Monte Carlo price bands"""
+    try:
+        with span('parse'):
+            data = request.json
+        if not data or 'historical_data' not in data:
+            return jsonify({"error": "Missing required parameter: historical_data"}), 400
+        
+        # Optional parameters
+        days_ahead = data.get('days_ahead', 30)
+        credit_type = data.get('credit_type', 'VCU')
+        n_scenarios = data.get('n_scenarios', 1000)
+        quantiles = data.get('quantiles', [0.1, 0.5, 0.9])
+        
+        if not is_count(n_scenarios, MAX_SCENARIOS):
+            return jsonify({"error": f"n_scenarios must be an integer between 1 and {MAX_SCENARIOS}"}), 400
+        if not is_count(days_ahead, MAX_SCENARIO_DAYS):
+            return jsonify({"error": f"days_ahead must be an integer between 1 and {MAX_SCENARIO_DAYS}"}), 400
+        if not all(0 <= q <= 1 for q in quantiles):
+            return jsonify({"error": "quantiles must be between 0 and 1"}), 400
+        
+        with span('features'):
+            historical_data = pd.DataFrame(data['historical_data'])
+            historical_data['date'] = pd.to_datetime(historical_data['date'])
+        
+        with span('inference'):
+            bands = get_price_predictor().predict_scenarios(
+                historical_data,
+                days_ahead=days_ahead,
+                n_scenarios=n_scenarios,
+                quantiles=quantiles,
+                seed=data.get('seed')
+            )
+        
+        with span('serialize'):
+            bands['date'] = bands['date'].dt.strftime('%Y-%m-%d')
+            response = jsonify({
+                "bands": bands.to_dict(orient='records'),
+                "credit_type": credit_type,
+                "days_ahead": days_ahead,
+                "n_scenarios": n_scenarios
+            })
+        return response, 200
+    
+    except Exception as e:
+        logger.error(f"Error in price scenarios: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/cache/stats', methods=['GET'])
+def cache_stats():
+    """Forecast cache hit/miss counters"""
+    return jsonify(forecast_cache.stats()), 200
+
+@app.route('/batching/stats', methods=['GET'])
+def batching_stats():
+    """Micro-batching counters per model endpoint"""
+    return jsonify({
+        "price": price_batcher.stats(),
+        "footprint": footprint_batcher.stats(),
+        "project": project_batcher.stats()
+    }), 200
+
 @app.route('/calculate/footprint', methods=['POST'])
 def calculate_footprint():
     """Endpoint for carbon footprint calculation"""
     try:
-        data = request.json
+        with span('parse'):
+            data = request.json
         if not data:
             return jsonify({"error": "Missing request data"}), 400
         
-        # Get calculation
-        result = carbon_calculator.calculate(data)
+        # Get calculation, batched with concurrent requests
+        with span('inference'):
+            future = footprint_batcher.submit(data)
+            result = wait_for(future)
         
-        return jsonify(result), 200
+        with span('serialize'):
+            response = jsonify(result)
+        return response, 200
     
+    except QueueFullError:
+        return overloaded_response()
     except Exception as e:
         logger.error(f"Error in footprint calculation: {str(e)}")
         return jsonify({"error": str(e)}), 500
@@ -92,15 +330,26 @@ def calculate_footprint():
 def analyze_project():
     """Endpoint for carbon project analysis"""
     try:
-        data = request.json
+        with span('parse'):
+            data = request.json
         if not data or 'project_data' not in data:
             return jsonify({"error": "Missing required parameter: project_data"}), 400
         
-        # Get analysis
-        analysis = project_analyzer.analyze(data['project_data'])
+        # Get analysis, batched with concurrent requests
+        with span('inference'):
+            future = project_batcher.submit(data['project_data'])
+            analysis = wait_for(future)
+        if analysis.get('error'):
+            logger.error(f"Error in project analysis: {analysis['error']}")
+            return jsonify({"error": analysis['error']}), 500
+        analysis.pop('error', None)
         
-        return jsonify(analysis), 200
+        with span('serialize'):
+            response = jsonify(analysis)
+        return response, 200
     
+    except QueueFullError:
+        return overloaded_response()
     except Exception as e:
         logger.error(f"Error in project analysis: {str(e)}")
         return jsonify({"error": str(e)}), 500
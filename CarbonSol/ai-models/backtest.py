@@ -0,0 +1,450 @@
+"""
+Walk-Forward Backtesting
+
+This module scores a price model the way it is used in production: a training
+window slides over the history, the model is refitted (or warm-started with
+the newest prices) at a fixed interval, and at every forecast origin the next
+days are forecast and compared with the prices that actually followed.
+
+Folds are grouped into segments that start with a full refit; segments are
+independent and run in a process pool. The numeric columns of the history are
+placed in shared memory once, and every worker reads the rows of its training
+windows from there instead of receiving a pickled copy of the dataset per task.
+
+    python backtest.py --prices prices.csv --credit-type VCU --horizons 1 7 30
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from feature_cache import FeatureCache
+from forecast_job import limit_threads
+
+# Forecast horizons scored by default, in rows (days for daily prices)
+DEFAULT_HORIZONS = (1, 7, 30)
+
+# Shared history arrays and feature cache of the current worker process
+_shared = {}
+
+
+class SharedHistory:
+    """
+    A price history whose numeric columns live in shared memory.
+
+    Dates are stored as int64 nanoseconds and the other numeric columns as
+    one float64 matrix. Worker processes attach to the blocks by name (see
+    attach_history) and see the same memory without copying it.
+    """
+
+    def __init__(self, history):
+        """
+        Copy a history into shared memory.
+
+        Args:
+            history (pd.DataFrame): Price history with a 'date' column and
+                numeric columns such as 'price', 'volume' and 'sentiment'.
+        """
+        if "date" not in history.columns or "price" not in history.columns:
+            raise ValueError("History must include 'date' and 'price' columns")
+
+        dates = (
+            pd.to_datetime(history["date"])
+            .to_numpy(dtype="datetime64[ns]")
+            .view(np.int64)
+        )
+        self.columns = [
+            c
+            for c in history.columns
+            if c != "date" and pd.api.types.is_numeric_dtype(history[c])
+        ]
+        values = history[self.columns].to_numpy(dtype=np.float64)
+
+        self._blocks = []
+        self.dates = self._share(dates)
+        self.values = self._share(values)
+
+    def _share(self, array):
+        """Create a shared block holding a copy of array and return a view of it."""
+        block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self._blocks.append(block)
+        shared = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)
+        shared[...] = array
+        return shared
+
+    @property
+    def spec(self):
+        """dict: Picklable description that workers attach with."""
+        return {
+            "dates": (self._blocks[0].name, self.dates.shape),
+            "values": (self._blocks[1].name, self.values.shape),
+            "columns": self.columns,
+        }
+
+    def close(self):
+        """Release and remove the shared blocks."""
+        self.dates = self.values = None
+        for block in self._blocks:
+            block.close()
+            block.unlink()
+        self._blocks = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def attach_history(spec):
+    """
+    Attach to a SharedHistory created in another process.
+
+    Args:
+        spec (dict): SharedHistory.spec of the history.
+
+    Returns:
+        dict: The 'dates' and 'values' arrays (views of the shared memory),
+            the 'columns' names and the attached 'blocks', which must stay
+            referenced while the arrays are used.
+    """
+    blocks = []
+    arrays = {}
+    for key, dtype in [("dates", np.int64), ("values", np.float64)]:
+        name, shape = spec[key]
+        block = shared_memory.SharedMemory(name=name)
+        blocks.append(block)
+        arrays[key] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+
+    arrays["columns"] = spec["columns"]
+    arrays["blocks"] = blocks
+    return arrays
+
+
+def _init_worker(spec, n_threads):
+    """Process pool initializer: limit threads and attach the shared history."""
+    limit_threads(n_threads)
+    _shared.clear()
+    _shared.update(attach_history(spec))
+
+    # Expanding training windows append rows, so their features are extended
+    _shared["feature_cache"] = FeatureCache()
+
+
+def _history_rows(start, stop):
+    """Build the history DataFrame of rows [start, stop) from the shared arrays."""
+    frame = pd.DataFrame(_shared["values"][start:stop], columns=_shared["columns"])
+    frame.insert(0, "date", pd.to_datetime(_shared["dates"][start:stop]))
+    return frame
+
+
+def walk_forward_origins(n_rows, train_size, horizon=1, step=1):
+    """
+    List the forecast origins of a walk-forward backtest.
+
+    An origin is the index of the first forecast row: the model sees rows
+    before it and is scored on the horizon rows from it on.
+
+    Args:
+        n_rows (int): Number of rows in the history.
+        train_size (int): Rows before the first origin.
+        horizon (int): Longest forecast horizon; every origin leaves room for it.
+        step (int): Rows between consecutive origins.
+
+    Returns:
+        list: Origin row indices in increasing order.
+    """
+    if train_size < 2:
+        raise ValueError("train_size must be at least 2")
+    if horizon < 1 or step < 1:
+        raise ValueError("horizon and step must be at least 1")
+
+    return list(range(train_size, n_rows - horizon + 1, step))
+
+
+def plan_segments(origins, refit_every=None):
+    """
+    Group forecast origins into segments that share one model fit.
+
+    Args:
+        origins (list): Increasing forecast origins (see walk_forward_origins).
+        refit_every (int, optional): Rows between full refits. Without it,
+            the model is fitted once at the first origin.
+
+    Returns:
+        list: Lists of origins; the model is refitted at the first origin of
+            each segment.
+    """
+    segments = []
+    for origin in origins:
+        if segments and (refit_every is None or origin - segments[-1][0] < refit_every):
+            segments[-1].append(origin)
+        else:
+            segments.append([origin])
+    return segments
+
+
+def backtest_segment(
+    origins,
+    window=None,
+    horizons=DEFAULT_HORIZONS,
+    warm_start=False,
+    model_params=None,
+    update_params=None,
+    n_threads=1,
+):
+    """
+    Fit a model at the first origin of a segment and forecast every origin.
+
+    Runs in a worker process and reads the history from the shared arrays.
+
+    Args:
+        origins (list): Forecast origins of the segment.
+        window (int, optional): Length of the rolling training window in rows.
+            Without it, the window expands from the start of the history.
+        horizons (tuple): Forecast horizons to score, in rows.
+        warm_start (bool): Whether to update the model with the rows that
+            arrived before each later origin instead of keeping it fixed.
+        model_params (dict, optional): Parameters set on the model before fitting.
+        update_params (dict, optional): Keyword arguments for PricePredictor.update.
+        n_threads (int): Threads the model may use for training.
+
+    Returns:
+        pd.DataFrame: One row per origin and horizon with the origin index
+            and date, the fit ('refit', 'update' or 'none'), the horizon, and
+            the predicted and actual prices.
+    """
+    from price_prediction import PricePredictor
+
+    def window_start(origin):
+        return 0 if window is None else max(0, origin - window)
+
+    predictor = PricePredictor(feature_cache=_shared.get("feature_cache"))
+    params = dict(model_params or {})
+    if "n_jobs" in predictor.model.get_params():
+        params.setdefault("n_jobs", n_threads)
+    predictor.model.set_params(**params)
+
+    first = origins[0]
+    if not predictor.train(_history_rows(window_start(first), first)):
+        raise RuntimeError(f"Training failed at origin {first}")
+
+    days_ahead = max(horizons)
+    histories = [_history_rows(window_start(origin), origin) for origin in origins]
+    fits = ["refit"] + ["update" if warm_start else "none"] * (len(origins) - 1)
+
+    if warm_start:
+        # The model changes between origins, so each one is forecast after its update
+        forecasts = [predictor.predict(histories[0], days_ahead=days_ahead)]
+        for origin, history in zip(origins[1:], histories[1:]):
+            if not predictor.update(history, **(update_params or {})):
+                raise RuntimeError(f"Updating the model failed at origin {origin}")
+            forecasts.append(predictor.predict(history, days_ahead=days_ahead))
+    else:
+        forecasts = predictor.predict_batch(histories, days_ahead=days_ahead)
+
+    price_column = _shared["columns"].index("price")
+    rows = []
+    for origin, fit, forecast in zip(origins, fits, forecasts):
+        predicted = forecast["predicted_price"].to_numpy()
+        origin_date = pd.Timestamp(_shared["dates"][origin])
+        for horizon in horizons:
+            rows.append(
+                {
+                    "origin": origin,
+                    "origin_date": origin_date,
+                    "fit": fit,
+                    "horizon": horizon,
+                    "predicted": predicted[horizon - 1],
+                    "actual": _shared["values"][origin + horizon - 1, price_column],
+                }
+            )
+    return pd.DataFrame(rows)
+
+
+def score_forecasts(forecasts):
+    """
+    Summarize backtest forecasts per horizon.
+
+    Args:
+        forecasts (pd.DataFrame): Forecast rows as returned by backtest_segment.
+
+    Returns:
+        pd.DataFrame: One row per horizon with the number of forecasts and
+            the mae, rmse and mape (in percent).
+    """
+    errors = forecasts.assign(
+        abs_error=(forecasts["predicted"] - forecasts["actual"]).abs(),
+        sq_error=(forecasts["predicted"] - forecasts["actual"]) ** 2,
+        pct_error=(
+            (forecasts["predicted"] - forecasts["actual"]) / forecasts["actual"]
+        ).abs()
+        * 100,
+    )
+    grouped = errors.groupby("horizon")
+    return pd.DataFrame(
+        {
+            "n": grouped.size(),
+            "mae": grouped["abs_error"].mean(),
+            "rmse": np.sqrt(grouped["sq_error"].mean()),
+            "mape": grouped["pct_error"].mean(),
+        }
+    ).reset_index()
+
+
+def run_backtest(
+    history,
+    train_size,
+    horizons=DEFAULT_HORIZONS,
+    step=1,
+    window=None,
+    refit_every=None,
+    warm_start=False,
+    model_params=None,
+    update_params=None,
+    max_workers=None,
+    threads_per_worker=1,
+):
+    """
+    Run a walk-forward backtest of the price model over one history.
+
+    Args:
+        history (pd.DataFrame): Price history with 'date' and 'price' columns
+            and optional 'volume' and 'sentiment', one row per day.
+        train_size (int): Rows before the first forecast origin.
+        horizons (tuple): Forecast horizons to score, in rows.
+        step (int): Rows between consecutive forecast origins.
+        window (int, optional): Length of the rolling training window. Without
+            it, the training window expands from the start of the history.
+        refit_every (int, optional): Rows between full refits. Without it,
+            the model is fitted once at the first origin.
+        warm_start (bool): Whether to update the model with new rows at every
+            origin between refits.
+        model_params (dict, optional): Parameters set on the model before fitting.
+        update_params (dict, optional): Keyword arguments for PricePredictor.update.
+        max_workers (int, optional): Worker processes; defaults to the number
+            of CPUs divided by threads_per_worker.
+        threads_per_worker (int): Native threads allowed per worker.
+
+    Returns:
+        dict: The per-horizon 'scores', the 'forecasts' of every origin and
+            horizon, and the number of 'folds' and 'refits'.
+    """
+    horizons = tuple(sorted(set(horizons)))
+    history = history.sort_values("date").reset_index(drop=True)
+    origins = walk_forward_origins(len(history), train_size, max(horizons), step)
+    if not origins:
+        raise ValueError("History is too short for the training size and horizons")
+
+    segments = plan_segments(origins, refit_every)
+    if max_workers is None:
+        max_workers = max(1, (os.cpu_count() or 1) // threads_per_worker)
+    max_workers = min(max_workers, len(segments))
+
+    with SharedHistory(history) as shared:
+        with ProcessPoolExecutor(
+            max_workers=max_workers,
+            initializer=_init_worker,
+            initargs=(shared.spec, threads_per_worker),
+        ) as pool:
+            futures = [
+                pool.submit(
+                    backtest_segment,
+                    segment,
+                    window,
+                    horizons,
+                    warm_start,
+                    model_params,
+                    update_params,
+                    threads_per_worker,
+                )
+                for segment in segments
+            ]
+            forecasts = pd.concat(
+                [future.result() for future in futures], ignore_index=True
+            )
+
+    return {
+        "scores": score_forecasts(forecasts),
+        "forecasts": forecasts,
+        "folds": len(origins),
+        "refits": len(segments),
+    }
+
+
+def main():
+    """Run a walk-forward backtest from the command line."""
+    parser = argparse.ArgumentParser(
+        description="Walk-forward backtest of the price model"
+    )
+    parser.add_argument(
+        "--prices", required=True, help="CSV file with date and price columns"
+    )
+    parser.add_argument(
+        "--credit-type",
+        help="Backtest only this credit type (needs a credit_type column)",
+    )
+    parser.add_argument(
+        "--train-size",
+        type=int,
+        default=365,
+        help="Rows before the first forecast origin",
+    )
+    parser.add_argument(
+        "--horizons",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_HORIZONS),
+        help="Forecast horizons to score, in rows",
+    )
+    parser.add_argument(
+        "--step", type=int, default=7, help="Rows between forecast origins"
+    )
+    parser.add_argument(
+        "--window", type=int, help="Rolling training window (default: expanding)"
+    )
+    parser.add_argument(
+        "--refit-every", type=int, default=30, help="Rows between full refits"
+    )
+    parser.add_argument(
+        "--warm-start",
+        action="store_true",
+        help="Update the model with new rows at every origin between refits",
+    )
+    parser.add_argument("--workers", type=int, help="Worker processes")
+    parser.add_argument(
+        "--threads-per-worker", type=int, default=1, help="Native threads per worker"
+    )
+    parser.add_argument("--output", help="CSV file for the forecasts of every origin")
+    args = parser.parse_args()
+
+    history = pd.read_csv(args.prices, parse_dates=["date"])
+    if args.credit_type:
+        history = history[history["credit_type"] == args.credit_type]
+
+    result = run_backtest(
+        history,
+        args.train_size,
+        horizons=args.horizons,
+        step=args.step,
+        window=args.window,
+        refit_every=args.refit_every,
+        warm_start=args.warm_start,
+        max_workers=args.workers,
+        threads_per_worker=args.threads_per_worker,
+    )
+
+    print(f"{result['folds']} folds, {result['refits']} refits")
+    print(result["scores"].to_string(index=False))
+    if args.output:
+        result["forecasts"].to_csv(args.output, index=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+"""
+Micro-Batching for Model Inference
+
+This module collects concurrent inference requests into small batches and
+dispatches them to the vectorized model paths (PricePredictor.predict_batch,
+CarbonFootprintCalculator.calculate_batch, ProjectAnalyzer.analyze_batch).
+Each request gets a future for its own result; a bounded queue provides
+backpressure when the models cannot keep up.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class QueueFullError(Exception):
+    """Raised when a batcher's request queue is full."""
+
+
+class MicroBatcher:
+    """
+    A worker thread that runs a batch function over queued requests.
+
+    A batch is dispatched as soon as it reaches max_batch_size or when the
+    oldest request in it has waited max_wait_ms, whichever comes first.
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        batch_fn,
+        max_batch_size=32,
+        max_wait_ms=5,
+        max_queue_size=1024,
+        name="batcher",
+    ):
+        """
+        Initialize the micro-batcher.
+
+        Args:
+            batch_fn (callable): Function taking a list of request items and
+                returning a list of results in the same order.
+            max_batch_size (int): Maximum number of requests per batch.
+            max_wait_ms (float): Maximum time to wait for a batch to fill.
+            max_queue_size (int): Maximum number of pending requests.
+            name (str): Name of the worker thread.
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.name = name
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._worker = None
+        self._lock = threading.Lock()
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+        self.rejected = 0
+
+    def _ensure_worker(self):
+        """Start the worker thread on first use."""
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name=self.name, daemon=True
+                )
+                self._worker.start()
+
+    def submit(self, item):
+        """
+        Queue a request for batched processing.
+
+        Args:
+            item: The request payload passed to batch_fn.
+
+        Returns:
+            concurrent.futures.Future: Future resolving to the request's result.
+
+        Raises:
+            QueueFullError: If the queue is full.
+        """
+        future = Future()
+        try:
+            self._queue.put_nowait((item, future))
+        except queue.Full:
+            self.rejected += 1
+            raise QueueFullError(f"{self.name} queue is full")
+
+        self._ensure_worker()
+        return future
+
+    def stop(self):
+        """Stop the worker thread after the queued requests are processed."""
+        with self._lock:
+            worker = self._worker
+        if worker is not None and worker.is_alive():
+            self._queue.put(self._STOP)
+            worker.join()
+
+    def stats(self):
+        """
+        Get batching counters.
+
+        Returns:
+            dict: Batches run, requests processed, mean and largest batch size,
+                pending and rejected requests.
+        """
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "pending": self._queue.qsize(),
+            "rejected": self.rejected,
+        }
+
+    def _run(self):
+        """Worker loop: collect a batch, run it, repeat."""
+        while True:
+            entry = self._queue.get()
+            if entry is self._STOP:
+                return
+
+            batch = [entry]
+            stopping = False
+            deadline = time.monotonic() + self.max_wait_ms / 1000
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entry = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if entry is self._STOP:
+                    stopping = True
+                    break
+                batch.append(entry)
+
+            self._process(batch)
+            if stopping:
+                return
+
+    def _process(self, batch):
+        """
+        Run the batch function and resolve the futures.
+
+        If the batch fails, its requests are retried one by one so a single
+        bad request only fails its own future.
+
+        Args:
+            batch (list): (item, future) pairs.
+        """
+        batch = [
+            (item, future)
+            for item, future in batch
+            if future.set_running_or_notify_cancel()
+        ]
+        if not batch:
+            return
+
+        self.batches += 1
+        self.items += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+
+        try:
+            results = self.batch_fn([item for item, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(
+                    f"{self.name} returned {len(results)} results for {len(batch)} requests"
+                )
+        except Exception as e:
+            if len(batch) == 1:
+                batch[0][1].set_exception(e)
+                return
+
+            for item, future in batch:
+                try:
+                    future.set_result(self.batch_fn([item])[0])
+                except Exception as item_error:
+                    future.set_exception(item_error)
+            return
+
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
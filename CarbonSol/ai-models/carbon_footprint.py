@@ -5,9 +5,189 @@ This module provides functionality to calculate carbon footprints
 for individuals and organizations based on various activities.
 """
 
+import threading
+import types
+from collections import OrderedDict
+
 import numpy as np
 import pandas as pd
 
+from metrics import timed
+
+class EmissionFactorSet:
+    """
+    An immutable, compiled set of emission factors.
+    
+    Factors are stored as a read-only float array with one column per
+    activity, in the calculator's fixed activity order, plus per-category
+    tuples for the scalar calculation methods.
+    """
+    
+    def __init__(self, vector, index, categories):
+        """
+        Initialize the factor set.
+        
+        Args:
+            vector (np.ndarray): Emission factors in activity column order.
+            index (dict): Mapping of factor name to column.
+            categories (dict): Mapping of category to its factor columns, in order.
+        """
+        self.vector = vector
+        self.vector.flags.writeable = False
+        self.index = index
+        self.values = tuple(vector.tolist())
+        self._category_values = {
+            category: tuple(self.values[column] for column in columns)
+            for category, columns in categories.items()
+        }
+    
+    def category(self, category):
+        """
+        Get the factors of one category in calculation order.
+        
+        Args:
+            category (str): Category name, e.g. 'energy'.
+            
+        Returns:
+            tuple: Emission factors for the category's activities.
+        """
+        return self._category_values[category]
+    
+    def as_dict(self):
+        """
+        Get the factors as a name-to-value dict.
+        
+        Returns:
+            dict: A new dict of emission factors.
+        """
+        return {name: self.values[column] for name, column in self.index.items()}
+
+class EmissionFactorRegistry:
+    """
+    A registry of compiled emission factor sets shared across calculators.
+    
+    The default factors are compiled once. Custom factors are applied as a
+    copy-on-write overlay of the default vector, and identical overlays are
+    compiled once and shared. Named sets (per country, per tenant) can be
+    registered up front and looked up by name.
+    """
+    
+    def __init__(self, emission_factors, activities, max_overlays=1024):
+        """
+        Initialize the registry.
+        
+        Args:
+            emission_factors (dict): Default emission factors.
+            activities (list): (input name, emission factor, category) tuples
+                defining the column order.
+            max_overlays (int): Maximum number of anonymous overlays to keep.
+        """
+        self.index = {factor: column for column, (_, factor, _) in enumerate(activities)}
+        self.categories = {}
+        for column, (_, _, category) in enumerate(activities):
+            self.categories.setdefault(category, []).append(column)
+        
+        self.max_overlays = max_overlays
+        self.default = self._compile(
+            np.array([emission_factors[factor] for _, factor, _ in activities], dtype=float)
+        )
+        self._named = {}
+        self._overlays = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _compile(self, vector):
+        """
+        Wrap a factor vector in an immutable factor set.
+        
+        Args:
+            vector (np.ndarray): Emission factors in activity column order.
+            
+        Returns:
+            EmissionFactorSet: The compiled factor set.
+        """
+        return EmissionFactorSet(vector, self.index, self.categories)
+    
+    def _overlay(self, custom_factors):
+        """
+        Compile the default factors with custom overrides applied.
+        
+        Args:
+            custom_factors (dict): Emission factors to override.
+            
+        Returns:
+            EmissionFactorSet: The compiled factor set.
+        """
+        unknown = set(custom_factors) - set(self.index)
+        if unknown:
+            raise ValueError(f"Unknown emission factors: {', '.join(sorted(unknown))}")
+        
+        vector = self.default.vector.copy()
+        for factor, value in custom_factors.items():
+            vector[self.index[factor]] = value
+        return self._compile(vector)
+    
+    def register(self, name, custom_factors):
+        """
+        Register a named factor set, e.g. for a country or tenant.
+        
+        Re-registering a name replaces the set and drops the overlays that
+        were compiled on top of the previous one.
+        
+        Args:
+            name (str): Name of the factor set.
+            custom_factors (dict): Emission factors overriding the defaults.
+            
+        Returns:
+            EmissionFactorSet: The compiled factor set.
+        """
+        factor_set = self._overlay(custom_factors)
+        with self._lock:
+            self._named[name] = factor_set
+            for key in [key for key in self._overlays if key[0] == name]:
+                del self._overlays[key]
+        return factor_set
+    
+    def get(self, name=None, custom_factors=None):
+        """
+        Get a compiled factor set.
+        
+        Args:
+            name (str, optional): Name of a registered factor set to start from.
+            custom_factors (dict, optional): Further overrides on top of it.
+            
+        Returns:
+            EmissionFactorSet: The shared, compiled factor set.
+        """
+        with self._lock:
+            if name is None:
+                base = self.default
+            elif name in self._named:
+                base = self._named[name]
+            else:
+                raise ValueError(f"Unknown emission factor set: {name}")
+        
+        if not custom_factors:
+            return base
+        
+        key = (name, tuple(sorted(custom_factors.items())))
+        with self._lock:
+            if key in self._overlays:
+                self._overlays.move_to_end(key)
+                return self._overlays[key]
+        
+        overrides = base.as_dict() if name is not None else {}
+        overrides.update(custom_factors)
+        factor_set = self._overlay(overrides)
+        
+        with self._lock:
+            # Do not cache an overlay of a set re-registered in the meantime
+            if name is not None and self._named.get(name) is not base:
+                return factor_set
+            self._overlays[key] = factor_set
+            while len(self._overlays) > self.max_overlays:
+                self._overlays.popitem(last=False)
+        return factor_set
+
 class CarbonFootprintCalculator:
     """
     A class for calculating carbon footprints based on various activities.
@@ -52,17 +232,78 @@ class CarbonFootprintCalculator:
         'waste': 0.5,          # kg CO2e per kg
     }
     
-    def __init__(self, custom_factors=None):
+    # Activity inputs in calculation order: (input name, emission factor, category)
+    ACTIVITIES = [
+        ('electricity_kwh', 'electricity', 'energy'),
+        ('natural_gas_kwh', 'natural_gas', 'energy'),
+        ('heating_oil_kwh', 'heating_oil', 'energy'),
+        ('car_petrol_km', 'car_petrol', 'transportation'),
+        ('car_diesel_km', 'car_diesel', 'transportation'),
+        ('car_electric_km', 'car_electric', 'transportation'),
+        ('bus_km', 'bus', 'transportation'),
+        ('train_km', 'train', 'transportation'),
+        ('flight_short_km', 'flight_short', 'transportation'),
+        ('flight_medium_km', 'flight_medium', 'transportation'),
+        ('flight_long_km', 'flight_long', 'transportation'),
+        ('beef_kg', 'beef', 'food'),
+        ('lamb_kg', 'lamb', 'food'),
+        ('pork_kg', 'pork', 'food'),
+        ('chicken_kg', 'chicken', 'food'),
+        ('fish_kg', 'fish', 'food'),
+        ('dairy_kg', 'dairy', 'food'),
+        ('vegetables_kg', 'vegetables', 'food'),
+        ('fruits_kg', 'fruits', 'food'),
+        ('grains_kg', 'grains', 'food'),
+        ('clothing_items', 'clothing', 'goods'),
+        ('electronics_items', 'electronics', 'goods'),
+        ('paper_kg', 'paper', 'goods'),
+        ('plastic_kg', 'plastic', 'goods'),
+        ('water_m3', 'water', 'home'),
+        ('waste_kg', 'waste', 'home'),
+    ]
+    
+    # Footprint categories in the order they are totalled
+    CATEGORIES = ['energy', 'transportation', 'food', 'goods', 'home']
+    
+    # Compiled factor sets shared by all calculators
+    factor_registry = EmissionFactorRegistry(EMISSION_FACTORS, ACTIVITIES)
+    
+    def __init__(self, custom_factors=None, factor_set=None):
         """
         Initialize the carbon footprint calculator.
         
         Args:
             custom_factors (dict, optional): Custom emission factors to override defaults.
+            factor_set (str, optional): Name of a factor set registered in
+                factor_registry (e.g. a country or tenant) to use as defaults.
+        """
+        self.factor_set = factor_set
+        self.factors = self.factor_registry.get(name=factor_set, custom_factors=custom_factors)
+    
+    @property
+    def emission_factors(self):
+        """
+        Emission factors in use, as a read-only mapping.
+        
+        The compiled factors are shared between calculators, so they cannot
+        be changed item by item; assign a dict to this property instead.
+        
+        Returns:
+            types.MappingProxyType: The emission factors by name.
+        """
+        return types.MappingProxyType(self.factors.as_dict())
+    
+    @emission_factors.setter
+    def emission_factors(self, custom_factors):
         """
-        self.emission_factors = self.EMISSION_FACTORS.copy()
+        Replace the emission factors in use.
         
-        if custom_factors:
-            self.emission_factors.update(custom_factors)
+        Args:
+            custom_factors (dict): Emission factors to use; factors missing
+                from it keep their values in the calculator's factor set (or
+                the defaults).
+        """
+        self.factors = self.factor_registry.get(name=self.factor_set, custom_factors=dict(custom_factors))
     
     def calculate_energy_emissions(self, electricity_kwh=0, natural_gas_kwh=0, heating_oil_kwh=0):
         """
@@ -76,9 +317,11 @@ class CarbonFootprintCalculator:
         Returns:
             dict: Emissions breakdown by energy type and total.
         """
-        electricity_emissions = electricity_kwh * self.emission_factors['electricity']
-        natural_gas_emissions = natural_gas_kwh * self.emission_factors['natural_gas']
-        heating_oil_emissions = heating_oil_kwh * self.emission_factors['heating_oil']
+        electricity, natural_gas, heating_oil = self.factors.category('energy')
+        
+        electricity_emissions = electricity_kwh * electricity
+        natural_gas_emissions = natural_gas_kwh * natural_gas
+        heating_oil_emissions = heating_oil_kwh * heating_oil
         
         total_emissions = electricity_emissions + natural_gas_emissions + heating_oil_emissions
         
@@ -109,14 +352,17 @@ class CarbonFootprintCalculator:
         Returns:
             dict: Emissions breakdown by transportation type and total.
         """
-        car_petrol_emissions = car_petrol_km * self.emission_factors['car_petrol']
-        car_diesel_emissions = car_diesel_km * self.emission_factors['car_diesel']
-        car_electric_emissions = car_electric_km * self.emission_factors['car_electric']
-        bus_emissions = bus_km * self.emission_factors['bus']
-        train_emissions = train_km * self.emission_factors['train']
-        flight_short_emissions = flight_short_km * self.emission_factors['flight_short']
-        flight_medium_emissions = flight_medium_km * self.emission_factors['flight_medium']
-        flight_long_emissions = flight_long_km * self.emission_factors['flight_long']
+        (car_petrol, car_diesel, car_electric, bus, train,
+         flight_short, flight_medium, flight_long) = self.factors.category('transportation')
+        
+        car_petrol_emissions = car_petrol_km * car_petrol
+        car_diesel_emissions = car_diesel_km * car_diesel
+        car_electric_emissions = car_electric_km * car_electric
+        bus_emissions = bus_km * bus
+        train_emissions = train_km * train
+        flight_short_emissions = flight_short_km * flight_short
+        flight_medium_emissions = flight_medium_km * flight_medium
+        flight_long_emissions = flight_long_km * flight_long
         
         total_emissions = (car_petrol_emissions + car_diesel_emissions + 
                           car_electric_emissions + bus_emissions + 
@@ -155,15 +401,18 @@ class CarbonFootprintCalculator:
         Returns:
             dict: Emissions breakdown by food type and total.
         """
-        beef_emissions = beef_kg * self.emission_factors['beef']
-        lamb_emissions = lamb_kg * self.emission_factors['lamb']
-        pork_emissions = pork_kg * self.emission_factors['pork']
-        chicken_emissions = chicken_kg * self.emission_factors['chicken']
-        fish_emissions = fish_kg * self.emission_factors['fish']
-        dairy_emissions = dairy_kg * self.emission_factors['dairy']
-        vegetables_emissions = vegetables_kg * self.emission_factors['vegetables']
-        fruits_emissions = fruits_kg * self.emission_factors['fruits']
-        grains_emissions = grains_kg * self.emission_factors['grains']
+        (beef, lamb, pork, chicken, fish, dairy,
+         vegetables, fruits, grains) = self.factors.category('food')
+        
+        beef_emissions = beef_kg * beef
+        lamb_emissions = lamb_kg * lamb
+        pork_emissions = pork_kg * pork
+        chicken_emissions = chicken_kg * chicken
+        fish_emissions = fish_kg * fish
+        dairy_emissions = dairy_kg * dairy
+        vegetables_emissions = vegetables_kg * vegetables
+        fruits_emissions = fruits_kg * fruits
+        grains_emissions = grains_kg * grains
         
         total_emissions = (beef_emissions + lamb_emissions + pork_emissions + 
                           chicken_emissions + fish_emissions + dairy_emissions + 
@@ -196,10 +445,12 @@ class CarbonFootprintCalculator:
         Returns:
             dict: Emissions breakdown by goods type and total.
         """
-        clothing_emissions = clothing_items * self.emission_factors['clothing']
-        electronics_emissions = electronics_items * self.emission_factors['electronics']
-        paper_emissions = paper_kg * self.emission_factors['paper']
-        plastic_emissions = plastic_kg * self.emission_factors['plastic']
+        clothing, electronics, paper, plastic = self.factors.category('goods')
+        
+        clothing_emissions = clothing_items * clothing
+        electronics_emissions = electronics_items * electronics
+        paper_emissions = paper_kg * paper
+        plastic_emissions = plastic_kg * plastic
         
         total_emissions = (clothing_emissions + electronics_emissions + 
                           paper_emissions + plastic_emissions)
@@ -223,8 +474,10 @@ class CarbonFootprintCalculator:
         Returns:
             dict: Emissions breakdown by home activity and total.
         """
-        water_emissions = water_m3 * self.emission_factors['water']
-        waste_emissions = waste_kg * self.emission_factors['waste']
+        water, waste = self.factors.category('home')
+        
+        water_emissions = water_m3 * water
+        waste_emissions = waste_kg * waste
         
         total_emissions = water_emissions + waste_emissions
         
@@ -234,6 +487,7 @@ class CarbonFootprintCalculator:
             'total': total_emissions
         }
     
+    @timed('CarbonFootprintCalculator.calculate_total_footprint')
     def calculate_total_footprint(self, **kwargs):
         """
         Calculate total carbon footprint from all activities.
@@ -306,6 +560,61 @@ class CarbonFootprintCalculator:
             }
         }
     
+    @timed('CarbonFootprintCalculator.calculate_batch')
+    def calculate_batch(self, activity_data, detailed=False):
+        """
+        Calculate carbon footprints for many entities at once.
+        
+        Activity quantities form an (entities x activities) matrix that is
+        multiplied by the emission factor vector in one vectorized step.
+        Category and overall totals are then accumulated column by column in
+        the same order as calculate_total_footprint, so every entity gets
+        exactly the same numbers as the scalar calculation.
+        
+        Args:
+            activity_data (pd.DataFrame or dict): One row per entity, with
+                columns named like the calculate_total_footprint keyword
+                arguments (e.g. 'electricity_kwh', 'beef_kg'). Missing columns
+                and missing values count as zero activity.
+            detailed (bool): Whether to include per-activity emission columns,
+                named after their emission factor (e.g. 'electricity').
+                
+        Returns:
+            pd.DataFrame: Emissions in kg per category, 'total_kg' and
+                'total_tons', indexed like the input.
+        """
+        if not isinstance(activity_data, pd.DataFrame):
+            activity_data = pd.DataFrame(activity_data)
+        
+        n_entities = len(activity_data)
+        quantities = np.zeros((n_entities, len(self.ACTIVITIES)))
+        for column, (input_name, _, _) in enumerate(self.ACTIVITIES):
+            if input_name in activity_data.columns:
+                quantities[:, column] = activity_data[input_name].fillna(0).to_numpy(dtype=float)
+        
+        # Per-activity emissions for every entity
+        emissions = quantities * self.factors.vector
+        
+        results = {}
+        if detailed:
+            for column, (_, factor, _) in enumerate(self.ACTIVITIES):
+                results[factor] = emissions[:, column]
+        
+        # Category totals, summed in the scalar methods' order
+        category_totals = {category: np.zeros(n_entities) for category in self.CATEGORIES}
+        for column, (_, _, category) in enumerate(self.ACTIVITIES):
+            category_totals[category] = category_totals[category] + emissions[:, column]
+        
+        total_emissions = np.zeros(n_entities)
+        for category in self.CATEGORIES:
+            results[category] = category_totals[category]
+            total_emissions = total_emissions + category_totals[category]
+        
+        results['total_kg'] = total_emissions
+        results['total_tons'] = total_emissions / 1000
+        
+        return pd.DataFrame(results, index=activity_data.index)
+    
     def get_offset_recommendations(self, total_emissions_tons):
         """
         Get recommendations for carbon offsets based on emissions.
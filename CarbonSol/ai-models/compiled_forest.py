@@ -0,0 +1,357 @@
+"""
+Compiled Tree-Ensemble Inference
+
+This module flattens fitted scikit-learn tree ensembles into a compact set of
+NumPy arrays (one node table shared by all trees) and evaluates them with a
+vectorized traversal: every row walks every tree one level per step, so a
+single row costs a handful of array operations instead of sklearn's per-call
+validation and thread dispatch, and many rows are scored in one pass.
+
+The node arrays can be stored in a model artifact (see model_store) and
+evaluated directly from memory-mapped files.
+"""
+
+import numpy as np
+
+# Array names written by CompiledForest.to_arrays
+ARRAY_NAMES = [
+    "kind",
+    "feature",
+    "threshold",
+    "children_left",
+    "children_right",
+    "value",
+    "roots",
+    "depth",
+    "scale",
+    "bias",
+    "classes",
+]
+
+
+class CompiledForest:
+    """
+    An array-backed tree ensemble with vectorized prediction.
+
+    Supports RandomForestRegressor and ExtraTreesRegressor (mean of the trees),
+    RandomForestClassifier and ExtraTreesClassifier (mean of the tree class
+    probabilities) and GradientBoostingRegressor (constant initial prediction
+    plus the learning-rate-scaled sum of the trees).
+
+    Leaves point to themselves, so rows that reach a leaf early stay there
+    while deeper trees are still being traversed.
+    """
+
+    def __init__(
+        self,
+        kind,
+        feature,
+        threshold,
+        children_left,
+        children_right,
+        value,
+        roots,
+        depth,
+        scale=1.0,
+        bias=None,
+        classes=None,
+        n_features=None,
+    ):
+        """
+        Initialize the compiled forest from its node arrays.
+
+        Args:
+            kind (str): 'mean', 'proba' or 'boosting'.
+            feature (np.ndarray): Split feature per node.
+            threshold (np.ndarray): Split threshold per node.
+            children_left (np.ndarray): Global index of the left child per node.
+            children_right (np.ndarray): Global index of the right child per node.
+            value (np.ndarray): Leaf values of shape (n_nodes, n_values).
+            roots (np.ndarray): Global index of each tree's root node.
+            depth (int): Maximum depth over all trees.
+            scale (float): Factor applied to the summed tree values.
+            bias (np.ndarray, optional): Value added to the result per output.
+            classes (np.ndarray, optional): Class labels for classifiers.
+            n_features (int, optional): Number of features the model was
+                fitted on; inputs must have exactly this many columns. If
+                omitted, inputs only need the features the splits use.
+        """
+        self.kind = str(kind)
+        self.feature = feature
+        self.threshold = threshold
+        self.children_left = children_left
+        self.children_right = children_right
+        self.value = value
+        self.roots = roots
+        self.depth = int(depth)
+        self.scale = float(scale)
+        self.bias = np.zeros(value.shape[1]) if bias is None else bias
+        self.classes = classes
+        self.exact_features = n_features is not None
+        if n_features is None:
+            n_features = int(feature.max()) + 1 if len(feature) else 0
+        self.n_features = int(n_features)
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """
+        Compile a fitted scikit-learn tree ensemble.
+
+        Args:
+            model: A fitted supported ensemble (see the class docstring).
+
+        Returns:
+            CompiledForest: The compiled ensemble.
+
+        Raises:
+            ValueError: If the model is not fitted or not supported.
+        """
+        from sklearn.ensemble import (
+            ExtraTreesClassifier,
+            ExtraTreesRegressor,
+            GradientBoostingRegressor,
+            RandomForestClassifier,
+            RandomForestRegressor,
+        )
+
+        if not hasattr(model, "estimators_"):
+            raise ValueError(f"{type(model).__name__} is not fitted")
+
+        bias = None
+        scale = 1.0
+        classes = None
+        if isinstance(model, (RandomForestRegressor, ExtraTreesRegressor)):
+            kind = "mean"
+            trees = [estimator.tree_ for estimator in model.estimators_]
+        elif isinstance(model, (RandomForestClassifier, ExtraTreesClassifier)):
+            if model.n_outputs_ != 1:
+                raise ValueError("Multi-output classifiers are not supported")
+            kind = "proba"
+            trees = [estimator.tree_ for estimator in model.estimators_]
+            classes = np.asarray(model.classes_)
+        elif isinstance(model, GradientBoostingRegressor):
+            kind = "boosting"
+            trees = [estimator.tree_ for estimator in model.estimators_[:, 0]]
+            scale = model.learning_rate
+            if model.init_ == "zero":
+                bias = np.zeros(1)
+            elif hasattr(model.init_, "constant_"):
+                bias = np.asarray(model.init_.constant_, dtype=np.float64).reshape(1)
+            else:
+                raise ValueError("Only constant initial estimators are supported")
+        else:
+            raise ValueError(f"Unsupported model type: {type(model).__name__}")
+
+        sizes = np.array([tree.node_count for tree in trees])
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        n_nodes = int(sizes.sum())
+
+        feature = np.empty(n_nodes, dtype=np.int32)
+        threshold = np.empty(n_nodes, dtype=np.float64)
+        children_left = np.empty(n_nodes, dtype=np.int32)
+        children_right = np.empty(n_nodes, dtype=np.int32)
+        values = []
+
+        for tree, offset, size in zip(trees, offsets, sizes):
+            nodes = slice(offset, offset + size)
+            own_index = np.arange(offset, offset + size, dtype=np.int32)
+            is_leaf = tree.children_left == -1
+
+            feature[nodes] = np.where(is_leaf, 0, tree.feature)
+            threshold[nodes] = np.where(is_leaf, np.inf, tree.threshold)
+            children_left[nodes] = np.where(
+                is_leaf, own_index, tree.children_left + offset
+            )
+            children_right[nodes] = np.where(
+                is_leaf, own_index, tree.children_right + offset
+            )
+
+            # tree.value has shape (n_nodes, n_outputs, n_classes)
+            value = tree.value[:, 0, :].astype(np.float64)
+            if kind == "proba":
+                normalizer = value.sum(axis=1, keepdims=True)
+                normalizer[normalizer == 0] = 1.0
+                value = value / normalizer
+            values.append(value)
+
+        return cls(
+            kind,
+            feature,
+            threshold,
+            children_left,
+            children_right,
+            np.concatenate(values),
+            offsets.astype(np.int32),
+            max(tree.max_depth for tree in trees),
+            scale=scale,
+            bias=bias,
+            classes=classes,
+            n_features=model.n_features_in_,
+        )
+
+    def to_arrays(self, prefix="model"):
+        """
+        Export the node arrays, e.g. for save_artifact.
+
+        Args:
+            prefix (str): Prefix for the array names.
+
+        Returns:
+            dict: Arrays keyed by name.
+        """
+        arrays = {
+            "kind": np.array(self.kind),
+            "feature": self.feature,
+            "threshold": self.threshold,
+            "children_left": self.children_left,
+            "children_right": self.children_right,
+            "value": self.value,
+            "roots": self.roots,
+            "depth": np.array(self.depth),
+            "scale": np.array(self.scale),
+            "bias": self.bias,
+            "classes": np.zeros(0) if self.classes is None else self.classes,
+        }
+        if self.exact_features:
+            arrays["n_features"] = np.array(self.n_features)
+        return {f"{prefix}.{name}": array for name, array in arrays.items()}
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix="model"):
+        """
+        Rebuild a compiled forest from arrays exported by to_arrays.
+
+        Args:
+            arrays (dict): Arrays keyed by name, e.g. memory-mapped from disk.
+            prefix (str): Prefix of the array names.
+
+        Returns:
+            CompiledForest: The compiled ensemble, or None if the arrays do
+                not hold one.
+        """
+        if f"{prefix}.roots" not in arrays:
+            return None
+
+        parts = {name: arrays[f"{prefix}.{name}"] for name in ARRAY_NAMES}
+        return cls(
+            parts["kind"].item(),
+            parts["feature"],
+            parts["threshold"],
+            parts["children_left"],
+            parts["children_right"],
+            parts["value"],
+            parts["roots"],
+            parts["depth"].item(),
+            scale=parts["scale"].item(),
+            bias=parts["bias"],
+            classes=parts["classes"] if len(parts["classes"]) else None,
+            n_features=(
+                arrays[f"{prefix}.n_features"].item()
+                if f"{prefix}.n_features" in arrays
+                else None
+            ),
+        )
+
+    @property
+    def n_trees(self):
+        """Number of trees in the ensemble."""
+        return len(self.roots)
+
+    def _leaf_values(self, X, trees=None):
+        """
+        Find each row's leaf in every tree, or in one tree per row.
+
+        Args:
+            X (array-like): Feature matrix of shape (n_samples, n_features).
+            trees (array-like, optional): Index of the tree to evaluate for
+                each row.
+
+        Returns:
+            np.ndarray: Leaf values of shape (n_samples, n_trees, n_values),
+                with n_trees 1 if trees is given.
+        """
+        # sklearn evaluates splits on float32 inputs
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if X.ndim != 2:
+            raise ValueError(f"Expected a 2D feature matrix, got {X.ndim} dimensions")
+        if self.exact_features:
+            wrong_width = X.shape[1] != self.n_features
+        else:
+            wrong_width = X.shape[1] < self.n_features
+        if wrong_width:
+            raise ValueError(
+                f"Feature matrix has {X.shape[1]} columns, "
+                f"but the model was fitted on {self.n_features}"
+            )
+
+        flat_X = X.ravel()
+        row_offsets = (np.arange(X.shape[0]) * X.shape[1])[:, np.newaxis]
+        if trees is None:
+            nodes = np.broadcast_to(self.roots, (X.shape[0], len(self.roots)))
+        else:
+            nodes = self.roots[np.asarray(trees)].reshape(X.shape[0], 1)
+
+        for _ in range(self.depth):
+            go_left = flat_X[row_offsets + self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(
+                go_left, self.children_left[nodes], self.children_right[nodes]
+            )
+
+        return self.value[nodes]
+
+    def predict(self, X):
+        """
+        Predict with the compiled ensemble.
+
+        Args:
+            X (array-like): Feature matrix of shape (n_samples, n_features).
+
+        Returns:
+            np.ndarray: Predictions of shape (n_samples,); class labels for
+                classifiers.
+        """
+        if self.kind == "proba":
+            return self.classes[np.argmax(self.predict_proba(X), axis=1)]
+
+        leaf_values = self._leaf_values(X)[:, :, 0]
+        if self.kind == "boosting":
+            return self.bias[0] + self.scale * leaf_values.sum(axis=1)
+        return leaf_values.mean(axis=1)
+
+    def predict_trees(self, X, trees=None):
+        """
+        Predict with the individual trees of a forest regressor.
+
+        The spread of the per-tree predictions reflects the model's
+        uncertainty; their mean is predict(X).
+
+        Args:
+            X (array-like): Feature matrix of shape (n_samples, n_features).
+            trees (array-like, optional): Index of the tree to use for each
+                row; only that tree is evaluated.
+
+        Returns:
+            np.ndarray: Predictions of shape (n_samples, n_trees), or
+                (n_samples,) if trees is given.
+        """
+        if self.kind != "mean":
+            raise ValueError(
+                "Per-tree predictions are only available for forest regressors"
+            )
+
+        leaf_values = self._leaf_values(X, trees)[:, :, 0]
+        return leaf_values if trees is None else leaf_values[:, 0]
+
+    def predict_proba(self, X):
+        """
+        Predict class probabilities with a compiled classifier.
+
+        Args:
+            X (array-like): Feature matrix of shape (n_samples, n_features).
+
+        Returns:
+            np.ndarray: Probabilities of shape (n_samples, n_classes).
+        """
+        if self.kind != "proba":
+            raise ValueError("predict_proba is only available for classifiers")
+        return self._leaf_values(X).mean(axis=1)
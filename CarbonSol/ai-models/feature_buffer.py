@@ -0,0 +1,83 @@
+"""
+Reusable Feature Buffers
+
+This module provides preallocated, C-contiguous feature matrices for the
+opt-in float32 input path of the AI models. A buffer keeps its allocation
+across calls and only grows when a larger matrix is needed, so repeated
+feature preparation does not allocate a fresh matrix every time. Float32
+C-contiguous input is also what the scikit-learn tree ensembles convert their
+input to, so they consume the buffer without a hidden copy.
+"""
+
+import numpy as np
+
+# Feature dtypes the models accept
+FEATURE_DTYPES = ("float64", "float32")
+
+
+def feature_dtype(dtype):
+    """
+    Validate a feature dtype.
+
+    Args:
+        dtype (str or np.dtype): 'float64' or 'float32'.
+
+    Returns:
+        np.dtype: The validated dtype.
+    """
+    dtype = np.dtype(dtype)
+    if dtype.name not in FEATURE_DTYPES:
+        raise ValueError(
+            f"Feature dtype must be one of {FEATURE_DTYPES}, not {dtype.name}"
+        )
+    return dtype
+
+
+class FeatureBuffer:
+    """
+    A growable C-contiguous matrix reused across calls.
+
+    Views returned by rows() share memory with the buffer: they are
+    overwritten by the next call, so callers must finish with (or copy) a
+    view before preparing the next matrix. A buffer must not be shared
+    between threads.
+    """
+
+    def __init__(self, dtype=np.float32, growth=1.5):
+        """
+        Initialize an empty buffer.
+
+        Args:
+            dtype (np.dtype): Element type of the buffer.
+            growth (float): Factor by which the row capacity grows when a
+                larger matrix is requested, to amortize growing row by row.
+        """
+        self.dtype = np.dtype(dtype)
+        self.growth = growth
+        self._array = np.empty((0, 0), dtype=self.dtype)
+
+    def rows(self, n_rows, n_columns):
+        """
+        Get a matrix view of the buffer.
+
+        Args:
+            n_rows (int): Number of rows.
+            n_columns (int): Number of columns. Changing the column count
+                reallocates the buffer.
+
+        Returns:
+            np.ndarray: Uninitialized C-contiguous view of shape (n_rows, n_columns).
+        """
+        capacity, columns = self._array.shape
+        if columns != n_columns or capacity < n_rows:
+            if columns == n_columns:
+                n_rows_allocated = max(n_rows, int(capacity * self.growth))
+            else:
+                n_rows_allocated = n_rows
+            self._array = np.empty((n_rows_allocated, n_columns), dtype=self.dtype)
+        return self._array[:n_rows]
+
+    @property
+    def nbytes(self):
+        """int: Bytes currently allocated."""
+        return self._array.nbytes
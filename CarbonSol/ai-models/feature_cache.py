@@ -0,0 +1,231 @@
+"""
+Feature Matrix Cache
+
+This module provides a content-addressed cache for the feature matrices the
+AI models build from raw frames. Entries are keyed on a fingerprint of the
+feature columns (names, dtypes and a hash of every row), held in memory with
+LRU eviction and optionally written to disk as .npy files.
+
+When a frame only appends rows to a cached one, as when new prices arrive or
+a backtest's training window expands, the cached matrix is extended by
+computing the features of the new rows (plus the rows their rolling windows
+look back on) instead of the whole frame.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def row_hashes(frame):
+    """
+    Hash every row of a frame.
+
+    Args:
+        frame (pd.DataFrame): The frame to hash.
+
+    Returns:
+        np.ndarray: One uint64 hash per row, independent of the index.
+    """
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+def frame_fingerprint(frame, hashes=None):
+    """
+    Fingerprint the content of a frame.
+
+    Args:
+        frame (pd.DataFrame): The frame to fingerprint.
+        hashes (np.ndarray, optional): Row hashes of the frame, if already computed.
+
+    Returns:
+        str: Hex digest of the column names, dtypes and row contents.
+    """
+    if hashes is None:
+        hashes = row_hashes(frame)
+    header = json.dumps(
+        [[str(column), str(dtype)] for column, dtype in frame.dtypes.items()]
+    )
+
+    digest = hashlib.sha256(header.encode("utf-8"))
+    digest.update(np.ascontiguousarray(hashes).tobytes())
+    return digest.hexdigest()
+
+
+class FeatureCache:
+    """
+    A thread-safe LRU cache of feature matrices keyed by frame content.
+
+    Cached matrices are read-only; callers that need to modify one must copy it.
+    """
+
+    def __init__(self, max_entries=32, max_bytes=256 * 1024 * 1024, cache_dir=None):
+        """
+        Initialize the feature cache.
+
+        Args:
+            max_entries (int): Maximum number of cached matrices.
+            max_bytes (int): Maximum total size of the cached matrices.
+            cache_dir (str, optional): Directory where matrices are also
+                stored as .npy files, so they survive restarts and can be
+                shared between processes.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.cache_dir = cache_dir
+        self._entries = OrderedDict()
+        self._latest = {}  # Series key -> cache key of its longest cached frame
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.extensions = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def get_or_compute(self, namespace, frame, compute, context_rows=None):
+        """
+        Get the feature matrix of a frame, computing it on a miss.
+
+        Args:
+            namespace (str): Identifies the feature builder and everything
+                besides the frame it depends on, e.g. a learned feature schema.
+            frame (pd.DataFrame): The columns the features are computed from.
+            compute (callable): Builds the feature matrix of a frame, one row
+                per frame row.
+            context_rows (int, optional): Rows before a new row that its
+                features depend on (e.g. 29 for a 30-day rolling mean). When
+                given, a frame that appends rows to a cached frame is
+                extended incrementally; without it, it is computed in full.
+
+        Returns:
+            np.ndarray: The read-only feature matrix.
+        """
+        hashes = row_hashes(frame)
+        key = hashlib.sha256(
+            f"{namespace}:{frame_fingerprint(frame, hashes)}".encode("utf-8")
+        ).hexdigest()
+        series_key = (
+            namespace,
+            tuple(frame.columns),
+            int(hashes[0]) if len(hashes) else None,
+        )
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            base = self._entries.get(self._latest.get(series_key))
+
+        matrix = self._load(key)
+        if matrix is not None:
+            outcome = "disk_hits"
+        elif (
+            context_rows is not None
+            and base is not None
+            and len(base[1]) < len(hashes)
+            and np.array_equal(base[1], hashes[: len(base[1])])
+        ):
+            # Only rows were appended: compute the new rows with the rows
+            # their windows look back on and stack them under the cached matrix
+            n_cached = len(base[1])
+            start = max(0, n_cached - context_rows)
+            tail = np.asarray(compute(frame.iloc[start:]))[n_cached - start :]
+            matrix = np.concatenate([base[0], tail])
+            outcome = "extensions"
+        else:
+            matrix = np.asarray(compute(frame))
+            outcome = "misses"
+
+        matrix.setflags(write=False)
+        self._store(key, matrix)
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            if key not in self._entries:
+                self._bytes += matrix.nbytes
+            self._entries[key] = (matrix, hashes)
+            self._entries.move_to_end(key)
+
+            # An extended frame supersedes the prefix it was built from
+            previous = self._latest.get(series_key)
+            if (
+                base is not None
+                and previous in self._entries
+                and self._entries[previous] is base
+            ):
+                del self._entries[previous]
+                self._bytes -= base[0].nbytes
+            self._latest[series_key] = key
+
+            # The newest matrix is kept even if it alone exceeds max_bytes
+            while len(self._entries) > 1 and (
+                len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+            ):
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self.evictions += 1
+
+        return matrix
+
+    def _path(self, key):
+        """Path of the .npy file of a cache key."""
+        return os.path.join(self.cache_dir, f"{key}.npy")
+
+    def _load(self, key):
+        """Load a matrix from the cache directory, or None if it is not there."""
+        if not self.cache_dir or not os.path.exists(self._path(key)):
+            return None
+        try:
+            return np.load(self._path(key))
+        except (OSError, ValueError):
+            return None
+
+    def _store(self, key, matrix):
+        """Write a matrix to the cache directory, if there is one."""
+        if not self.cache_dir or os.path.exists(self._path(key)):
+            return
+
+        # Write to a temporary file first so readers never see a partial file
+        tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, matrix)
+        os.replace(tmp_path, self._path(key))
+
+    def clear(self):
+        """Drop all matrices held in memory; files on disk are kept."""
+        with self._lock:
+            self._entries.clear()
+            self._latest.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """
+        Get cache counters.
+
+        Returns:
+            dict: Hits, disk hits, extensions, misses, hit rate, size, bytes
+                and evictions.
+        """
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.extensions + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "extensions": self.extensions,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "evictions": self.evictions,
+            }
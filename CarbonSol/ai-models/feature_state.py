@@ -0,0 +1,225 @@
+"""
+Streaming Feature State for Price Forecasting
+
+This module provides constant-time feature updates for the autoregressive
+forecasting loop in PricePredictor. Instead of re-running the rolling window
+statistics over the whole history for every predicted day, the state keeps
+ring buffers with running sums for each window and emits the next feature row
+after each appended price.
+"""
+
+import numpy as np
+
+
+class RollingWindow:
+    """
+    A fixed-size ring buffer with running sums for rolling statistics.
+
+    Sums are accumulated relative to the first finite value pushed (shifted
+    data) so the variance stays accurate for series with a large mean. NaN
+    values are counted instead of summed, so, as with pandas rolling windows,
+    the statistics are NaN while the window holds one and recover once it has
+    been evicted.
+    """
+
+    def __init__(self, size, values=None):
+        """
+        Initialize the rolling window.
+
+        Args:
+            size (int): Number of observations in the window.
+            values (array-like, optional): Initial observations, oldest first.
+                Only the last `size` values are kept.
+        """
+        self.size = size
+        self._buffer = np.zeros(size)
+        self._count = 0
+        self._pos = 0
+        self._shift = None
+        self._nan_count = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+
+        if values is not None:
+            for value in np.asarray(values, dtype=float)[-size:]:
+                self.push(value)
+
+    def push(self, value):
+        """
+        Add a value to the window, evicting the oldest one if the window is full.
+
+        Args:
+            value (float): The new observation.
+        """
+        is_nan = np.isnan(value)
+        if self._shift is None and not is_nan:
+            self._shift = value
+
+        if self._count == self.size:
+            evicted = self._buffer[self._pos]
+            if np.isnan(evicted):
+                self._nan_count -= 1
+            else:
+                self._sum -= evicted
+                self._sum_sq -= evicted * evicted
+        else:
+            self._count += 1
+
+        if is_nan:
+            self._buffer[self._pos] = np.nan
+            self._nan_count += 1
+        else:
+            shifted = value - self._shift
+            self._buffer[self._pos] = shifted
+            self._sum += shifted
+            self._sum_sq += shifted * shifted
+        self._pos = (self._pos + 1) % self.size
+
+    def mean(self):
+        """
+        Mean of the window, NaN until the window is full and while it holds a
+        NaN (pandas semantics).
+
+        Returns:
+            float: The rolling mean.
+        """
+        if self._count < self.size or self._nan_count:
+            return np.nan
+        return self._shift + self._sum / self._count
+
+    def std(self):
+        """
+        Sample standard deviation of the window, NaN until the window is full
+        and while it holds a NaN.
+
+        Returns:
+            float: The rolling standard deviation (ddof=1).
+        """
+        if self._count < self.size or self._count < 2 or self._nan_count:
+            return np.nan
+        n = self._count
+        variance = (self._sum_sq - self._sum * self._sum / n) / (n - 1)
+        return np.sqrt(max(variance, 0.0))
+
+
+class RunningColumnStats:
+    """
+    Running per-column mean and variance (Welford's algorithm).
+
+    Reproduces what StandardScaler.fit would learn on a matrix that grows by
+    one row at a time, without revisiting earlier rows.
+    """
+
+    def __init__(self, feature_matrix):
+        """
+        Initialize the statistics from an existing feature matrix.
+
+        Args:
+            feature_matrix (np.ndarray): Matrix of shape (n_samples, n_features).
+        """
+        self.n = feature_matrix.shape[0]
+        self.mean = feature_matrix.mean(axis=0, dtype=np.float64)
+        self._m2 = feature_matrix.var(axis=0, dtype=np.float64) * self.n
+
+    def update(self, row):
+        """
+        Add a row to the statistics.
+
+        Args:
+            row (np.ndarray): Feature row of shape (n_features,).
+        """
+        self.n += 1
+        delta = row - self.mean
+        self.mean = self.mean + delta / self.n
+        self._m2 = self._m2 + delta * (row - self.mean)
+
+    def transform(self, row):
+        """
+        Standardize a row with the current statistics.
+
+        Args:
+            row (np.ndarray): Feature row of shape (n_features,).
+
+        Returns:
+            np.ndarray: The standardized row.
+        """
+        scale = np.sqrt(self._m2 / self.n)
+        scale[scale < 10 * np.finfo(scale.dtype).eps] = 1.0
+        return (row - self.mean) / scale
+
+
+class PriceFeatureState:
+    """
+    Incremental feature state for PricePredictor's autoregressive forecast.
+
+    The feature layout matches PricePredictor._prepare_features: price, 7-day
+    mean, 30-day mean, 7-day std, then volume and 7-day volume mean when the
+    history has a volume column, then sentiment when it has one.
+    """
+
+    def __init__(self, historical_data, feature_matrix, scaler=None):
+        """
+        Initialize the state from the history and its unscaled features.
+
+        Args:
+            historical_data (pd.DataFrame): Historical price data.
+            feature_matrix (np.ndarray): Unscaled feature matrix for the history,
+                as built by PricePredictor._build_feature_matrix.
+            scaler (StandardScaler, optional): A fitted scaler. If omitted, the
+                scaling statistics are tracked over the history and every
+                appended row, as if the scaler were refitted each step.
+        """
+        prices = historical_data["price"].values
+        self.price_7 = RollingWindow(7, prices)
+        self.price_30 = RollingWindow(30, prices)
+
+        self.has_volume = "volume" in historical_data.columns
+        self.has_sentiment = "sentiment" in historical_data.columns
+
+        # Future volume and sentiment are filled with the historical mean,
+        # which does not change as mean-valued rows are appended
+        if self.has_volume:
+            self.volume_fill = historical_data["volume"].mean()
+            self.volume_7 = RollingWindow(7, historical_data["volume"].values)
+        if self.has_sentiment:
+            self.sentiment_fill = historical_data["sentiment"].mean()
+
+        self.scaler = scaler
+        self.stats = None if scaler is not None else RunningColumnStats(feature_matrix)
+        # Copied, since the matrix may be a buffer reused for the next history
+        self.last_row = np.array(feature_matrix[-1], dtype=float)
+
+    def append(self, price):
+        """
+        Append a predicted price and compute the feature row for it.
+
+        Args:
+            price (float): The predicted price for the next day.
+        """
+        self.price_7.push(price)
+        self.price_30.push(price)
+
+        row = [price, self.price_7.mean(), self.price_30.mean(), self.price_7.std()]
+
+        if self.has_volume:
+            self.volume_7.push(self.volume_fill)
+            row.extend([self.volume_fill, self.volume_7.mean()])
+        if self.has_sentiment:
+            row.append(self.sentiment_fill)
+
+        self.last_row = np.nan_to_num(np.array(row, dtype=float))
+        if self.stats is not None:
+            self.stats.update(self.last_row)
+
+    def current_features(self):
+        """
+        Get the scaled feature row for the most recent day.
+
+        Returns:
+            np.ndarray: Scaled feature row of shape (1, n_features).
+        """
+        if self.stats is None:
+            scaled = (self.last_row - self.scaler.mean_) / self.scaler.scale_
+        else:
+            scaled = self.stats.transform(self.last_row)
+        return scaled.reshape(1, -1)
@@ -0,0 +1,159 @@
+"""
+Forecast Result Cache
+
+This module provides a bounded LRU cache with a time-to-live for price
+forecasts served by the API. Entries are keyed on a hash of the request
+inputs (excluding the horizon) and the model version, so a cached long
+forecast also answers any shorter request for the same inputs.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class ForecastCache:
+    """
+    A thread-safe LRU/TTL cache for forecast results.
+
+    Cached forecasts are dicts whose list values are per-day series (e.g.
+    'dates' and 'prices'); a hit for fewer days returns those lists truncated.
+    """
+
+    def __init__(self, max_entries=128, ttl_seconds=300, clock=time.monotonic):
+        """
+        Initialize the forecast cache.
+
+        Args:
+            max_entries (int): Maximum number of cached forecasts.
+            ttl_seconds (float): Seconds before a cached forecast expires.
+            clock (callable): Monotonic time source, replaceable in tests.
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(**inputs):
+        """
+        Build a cache key from the request inputs.
+
+        Args:
+            **inputs: Everything the forecast depends on except the horizon,
+                e.g. token, last data timestamp and model version.
+
+        Returns:
+            str: Hex digest identifying the inputs.
+        """
+        payload = json.dumps(inputs, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key, days):
+        """
+        Look up a forecast covering at least the requested number of days.
+
+        Args:
+            key (str): Cache key from make_key.
+            days (int): Requested forecast horizon.
+
+        Returns:
+            dict: The forecast truncated to `days`, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                cached_days, forecast, expires_at = entry
+                if expires_at <= self._clock():
+                    del self._entries[key]
+                    entry = None
+                elif cached_days < days:
+                    entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        return self._truncate(forecast, days)
+
+    def put(self, key, days, forecast):
+        """
+        Store a forecast, keeping the longer horizon if one is already cached.
+
+        Args:
+            key (str): Cache key from make_key.
+            days (int): Horizon of the forecast.
+            forecast (dict): Forecast with per-day lists.
+        """
+        with self._lock:
+            now = self._clock()
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > days and entry[2] > now:
+                return
+
+            self._entries[key] = (
+                days,
+                self._truncate(forecast, days),
+                now + self.ttl_seconds,
+            )
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self):
+        """
+        Drop all cached forecasts, e.g. after new data is loaded or the model
+        is retrained.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self):
+        """
+        Get cache counters.
+
+        Returns:
+            dict: Hits, misses, hit rate, size, evictions and invalidations.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    @staticmethod
+    def _truncate(forecast, days):
+        """
+        Copy a forecast keeping only the first `days` values of each series.
+
+        Args:
+            forecast (dict): Forecast with per-day lists.
+            days (int): Number of days to keep.
+
+        Returns:
+            dict: The truncated copy.
+        """
+        return {
+            name: value[:days] if isinstance(value, list) else value
+            for name, value in forecast.items()
+        }
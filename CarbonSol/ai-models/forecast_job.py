@@ -0,0 +1,302 @@
+"""
+Multi-Credit-Type Forecasting Job
+
+This module runs the scheduled price forecasts: it splits the price history
+into one series per credit type (and registry vintage), trains or loads one
+PricePredictor per series, forecasts every series in a process pool and
+writes the results to a ForecastStore that the API serves from.
+
+Each worker is limited to a fixed number of BLAS/OpenMP/TensorFlow threads so
+that N workers do not oversubscribe the machine. Run it on a schedule, e.g.
+hourly from cron:
+
+    python forecast_job.py --prices prices.csv --store forecasts --model-dir models
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from forecast_store import ForecastStore, safe_name
+from model_store import is_artifact, read_manifest
+
+# Forecast horizon in days; shorter horizons are prefixes of the same path
+DEFAULT_HORIZON = 90
+
+# Environment variables read by the native thread pools at startup
+THREAD_ENV_VARS = [
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "TF_NUM_INTRAOP_THREADS",
+    "TF_NUM_INTEROP_THREADS",
+]
+
+
+def limit_threads(n_threads):
+    """
+    Limit the native thread pools of the current process.
+
+    Used as the process pool initializer, so it runs in every worker before
+    any model code.
+
+    Args:
+        n_threads (int): Threads allowed per pool.
+    """
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(n_threads)
+
+    # Pools that are already running ignore the environment variables
+    try:
+        from threadpoolctl import threadpool_limits
+
+        threadpool_limits(n_threads)
+    except ImportError:
+        pass
+
+    if "tensorflow" in sys.modules:
+        tf = sys.modules["tensorflow"]
+        try:
+            tf.config.threading.set_intra_op_parallelism_threads(n_threads)
+            tf.config.threading.set_inter_op_parallelism_threads(n_threads)
+        except RuntimeError:
+            pass  # TensorFlow has already initialized its thread pools
+
+
+def split_series(price_data):
+    """
+    Split price data into one history per credit type.
+
+    Args:
+        price_data (pd.DataFrame): Price data with 'date', 'price' and
+            'credit_type' columns, optional 'volume' and 'sentiment', and an
+            optional 'vintage' column for registry vintages.
+
+    Returns:
+        dict: History DataFrames keyed by credit type ('VCU', or 'VCU-2021'
+            for a vintage), sorted by date.
+    """
+    if "credit_type" not in price_data.columns:
+        raise ValueError("Price data must include a 'credit_type' column")
+
+    keys = price_data["credit_type"].astype(str)
+    if "vintage" in price_data.columns:
+        has_vintage = price_data["vintage"].notna()
+        keys = keys.where(~has_vintage, keys + "-" + price_data["vintage"].astype(str))
+
+    series = {}
+    for key, history in price_data.groupby(keys, sort=True):
+        history = history.drop(
+            columns=[c for c in ["credit_type", "vintage"] if c in history.columns]
+        )
+        series[key] = history.sort_values("date").reset_index(drop=True)
+    return series
+
+
+def forecast_series(
+    credit_type,
+    history,
+    horizon=DEFAULT_HORIZON,
+    model_path=None,
+    retrain=False,
+    update=False,
+    n_threads=1,
+):
+    """
+    Train or load the model for one credit type and forecast it.
+
+    Args:
+        credit_type (str): Credit type of the series.
+        history (pd.DataFrame): Price history of the series.
+        horizon (int): Number of days to forecast.
+        model_path (str, optional): Artifact directory of the series' model.
+            An existing artifact is loaded unless retrain is set; a newly
+            trained model is saved there.
+        retrain (bool): Whether to retrain even if an artifact exists.
+        update (bool): Whether to incrementally update an existing model with
+            the prices that arrived since it was last trained.
+        n_threads (int): Threads the model may use for training.
+
+    Returns:
+        pd.DataFrame: Forecast rows with credit_type, model_version, day, date
+            and predicted_price columns.
+    """
+    from price_prediction import PricePredictor
+
+    previous_version = 0
+    if model_path and is_artifact(model_path):
+        previous_version = read_manifest(model_path)["model_version"]
+
+    if previous_version and not retrain:
+        predictor = PricePredictor(model_path=model_path)
+        model_version = previous_version
+
+        if update:
+            loaded_version = predictor.model_version
+            if not predictor.update(history):
+                raise RuntimeError(f"Updating the model failed for {credit_type}")
+            if predictor.model_version != loaded_version:
+                model_version = previous_version + 1
+                predictor.model_version = model_version
+                predictor.save_model(model_path, artifact_format="mmap")
+    else:
+        predictor = PricePredictor()
+        if "n_jobs" in predictor.model.get_params():
+            predictor.model.set_params(n_jobs=n_threads)
+        if not predictor.train(history):
+            raise RuntimeError(f"Training failed for {credit_type}")
+
+        # Versions keep increasing across runs that retrain the same series
+        model_version = previous_version + 1
+        predictor.model_version = model_version
+        if model_path:
+            predictor.save_model(model_path, artifact_format="mmap")
+
+    forecast = predictor.predict(history, days_ahead=horizon)
+    forecast.insert(0, "credit_type", credit_type)
+    forecast.insert(1, "model_version", model_version)
+    forecast.insert(2, "day", np.arange(1, horizon + 1))
+    return forecast
+
+
+def run_forecast_job(
+    price_data,
+    store_path,
+    horizon=DEFAULT_HORIZON,
+    model_dir=None,
+    max_workers=None,
+    threads_per_worker=1,
+    retrain=False,
+    update=False,
+):
+    """
+    Forecast every credit type in parallel and write the results to the store.
+
+    Args:
+        price_data (pd.DataFrame): Price data for all credit types (see split_series).
+        store_path (str): Directory of the ForecastStore to write to.
+        horizon (int): Number of days to forecast.
+        model_dir (str, optional): Directory with one model artifact per credit
+            type. Without it, every run trains fresh models.
+        max_workers (int, optional): Worker processes; defaults to the number
+            of CPUs divided by threads_per_worker.
+        threads_per_worker (int): Native threads allowed per worker.
+        retrain (bool): Whether to retrain models that already have an artifact.
+        update (bool): Whether to incrementally update existing models with
+            new prices instead of only loading them.
+
+    Returns:
+        dict: Run summary with 'run_at', the forecast 'credit_types' and the
+            'failed' credit types mapped to their error messages.
+    """
+    series = split_series(price_data)
+    if max_workers is None:
+        max_workers = max(1, (os.cpu_count() or 1) // threads_per_worker)
+
+    run_at = pd.Timestamp.now(tz="UTC")
+    forecasts = []
+    failed = {}
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=limit_threads,
+        initargs=(threads_per_worker,),
+    ) as pool:
+        futures = {}
+        for credit_type, history in series.items():
+            model_path = (
+                os.path.join(model_dir, safe_name(credit_type)) if model_dir else None
+            )
+            futures[credit_type] = pool.submit(
+                forecast_series,
+                credit_type,
+                history,
+                horizon,
+                model_path,
+                retrain,
+                update,
+                threads_per_worker,
+            )
+
+        for credit_type, future in futures.items():
+            try:
+                forecasts.append(future.result())
+            except Exception as e:
+                print(f"Error forecasting {credit_type}: {e}")
+                failed[credit_type] = str(e)
+
+    if forecasts:
+        forecasts = pd.concat(forecasts, ignore_index=True)
+        forecasts["run_at"] = run_at
+        ForecastStore(store_path).write(forecasts)
+        credit_types = list(forecasts["credit_type"].unique())
+    else:
+        credit_types = []
+
+    return {
+        "run_at": run_at.isoformat(),
+        "credit_types": credit_types,
+        "failed": failed,
+    }
+
+
+def main():
+    """Run the forecasting job from the command line."""
+    parser = argparse.ArgumentParser(
+        description="Forecast carbon credit prices for every credit type"
+    )
+    parser.add_argument(
+        "--prices",
+        required=True,
+        help="CSV file with date, price and credit_type columns",
+    )
+    parser.add_argument(
+        "--store", required=True, help="Forecast store directory read by the API"
+    )
+    parser.add_argument(
+        "--model-dir", help="Directory with one model artifact per credit type"
+    )
+    parser.add_argument(
+        "--horizon", type=int, default=DEFAULT_HORIZON, help="Days to forecast"
+    )
+    parser.add_argument("--workers", type=int, help="Worker processes")
+    parser.add_argument(
+        "--threads-per-worker", type=int, default=1, help="Native threads per worker"
+    )
+    parser.add_argument(
+        "--retrain", action="store_true", help="Retrain models that already exist"
+    )
+    parser.add_argument(
+        "--update",
+        action="store_true",
+        help="Incrementally update existing models with new prices",
+    )
+    args = parser.parse_args()
+
+    price_data = pd.read_csv(args.prices, parse_dates=["date"])
+    summary = run_forecast_job(
+        price_data,
+        args.store,
+        horizon=args.horizon,
+        model_dir=args.model_dir,
+        max_workers=args.workers,
+        threads_per_worker=args.threads_per_worker,
+        retrain=args.retrain,
+        update=args.update,
+    )
+
+    print(
+        f"Forecasts written for {len(summary['credit_types'])} credit types at {summary['run_at']}"
+    )
+    for credit_type, error in summary["failed"].items():
+        print(f"Failed: {credit_type}: {error}")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
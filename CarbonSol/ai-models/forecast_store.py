@@ -0,0 +1,155 @@
+"""
+Precomputed Forecast Store
+
+This module persists the price forecasts produced by the forecasting job
+(see forecast_job) as one Parquet file per credit type, and serves them to
+the API. Reads are cached in memory until the underlying file changes, so
+serving a stored forecast costs a dictionary lookup and a slice.
+"""
+
+import os
+import re
+import threading
+
+import pandas as pd
+
+# Columns of a stored forecast, one row per credit type and forecast day
+FORECAST_COLUMNS = [
+    "credit_type",
+    "run_at",
+    "model_version",
+    "day",
+    "date",
+    "predicted_price",
+]
+
+
+def safe_name(credit_type):
+    """
+    Turn a credit type into a name usable as a file or directory name.
+
+    Args:
+        credit_type (str): Credit type, e.g. 'VCU' or 'VCU-2021'.
+
+    Returns:
+        str: The credit type with unsafe characters replaced.
+    """
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", str(credit_type))
+
+
+class ForecastStore:
+    """
+    A directory of per-credit-type forecast files in Parquet format.
+    """
+
+    def __init__(self, path):
+        """
+        Initialize the forecast store.
+
+        Args:
+            path (str): Directory holding the forecast files.
+        """
+        self.path = path
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _file_path(self, credit_type):
+        """
+        Get the file path for a credit type.
+
+        Args:
+            credit_type (str): Credit type, e.g. 'VCU' or 'VCU-2021'.
+
+        Returns:
+            str: Path of the credit type's Parquet file.
+        """
+        return os.path.join(self.path, f"{safe_name(credit_type)}.parquet")
+
+    def write(self, forecasts):
+        """
+        Store forecasts, replacing the previous forecast of each credit type.
+
+        Files are written to a temporary name and renamed, so readers never
+        see a partially written forecast.
+
+        Args:
+            forecasts (pd.DataFrame): Forecast rows with FORECAST_COLUMNS.
+        """
+        missing = [
+            column for column in FORECAST_COLUMNS if column not in forecasts.columns
+        ]
+        if missing:
+            raise ValueError(f"Forecasts are missing columns: {missing}")
+
+        os.makedirs(self.path, exist_ok=True)
+        for credit_type, rows in forecasts.groupby("credit_type", sort=False):
+            file_path = self._file_path(credit_type)
+            rows[FORECAST_COLUMNS].sort_values("day").to_parquet(
+                f"{file_path}.tmp", index=False
+            )
+            os.replace(f"{file_path}.tmp", file_path)
+
+    def credit_types(self):
+        """
+        List the credit types with a stored forecast.
+
+        Returns:
+            list: Credit types, sorted.
+        """
+        if not os.path.isdir(self.path):
+            return []
+
+        credit_types = []
+        for filename in sorted(os.listdir(self.path)):
+            if filename.endswith(".parquet"):
+                forecast = self._load(os.path.join(self.path, filename))
+                if forecast is not None and len(forecast):
+                    credit_types.append(forecast["credit_type"].iloc[0])
+        return sorted(credit_types)
+
+    def _load(self, file_path):
+        """
+        Read a forecast file, reusing the cached copy while it is unchanged.
+
+        Args:
+            file_path (str): Path of the Parquet file.
+
+        Returns:
+            pd.DataFrame: The stored forecast, or None if there is no file.
+        """
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            return None
+        version = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+        with self._lock:
+            cached = self._cache.get(file_path)
+            if cached is not None and cached[0] == version:
+                return cached[1]
+
+        forecast = pd.read_parquet(file_path)
+        with self._lock:
+            self._cache[file_path] = (version, forecast)
+        return forecast
+
+    def read(self, credit_type, days=None):
+        """
+        Get the stored forecast for a credit type.
+
+        Args:
+            credit_type (str): Credit type to look up.
+            days (int, optional): Number of forecast days required.
+
+        Returns:
+            pd.DataFrame: The first `days` rows of the forecast, or None if no
+                forecast is stored or it covers fewer days.
+        """
+        forecast = self._load(self._file_path(credit_type))
+        if forecast is None:
+            return None
+        if days is None:
+            return forecast
+        if len(forecast) < days:
+            return None
+        return forecast.iloc[:days]
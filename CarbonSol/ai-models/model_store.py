@@ -0,0 +1,329 @@
+"""
+Memory-Mapped Model Artifacts
+
+This module saves and loads model artifacts as a directory of flat files: NumPy
+arrays as `.npy` files and other objects as uncompressed joblib pickles, plus a
+`manifest.json` recording the model type, model version and a SHA-256 checksum
+for every file. Loading memory-maps the files read-only, so worker processes
+serving the same artifact share one page-cached copy of the arrays instead of
+each deserializing its own.
+
+Files are never rewritten in place: every save writes files under new names
+and then swaps in the manifest listing them, so processes that have the
+previous files mapped keep reading intact data. Objects loaded lazily keep
+their file open from load time, so they can still be unpickled after later
+saves deleted the file.
+
+Checksums are written at save time. Checking them hashes every file, so
+loading skips it unless asked; run verify_artifact when deploying an artifact.
+"""
+
+import hashlib
+import json
+import os
+import uuid
+from datetime import datetime, timezone
+
+import numpy as np
+
+MANIFEST_NAME = "manifest.json"
+FORMAT_VERSION = 1
+
+
+class ArtifactError(Exception):
+    """Raised when a model artifact is missing, incomplete or corrupted."""
+
+
+class Deferred:
+    """Placeholder for an artifact object that is loaded on first access."""
+
+    def __init__(self, loader):
+        """
+        Initialize the placeholder.
+
+        Args:
+            loader (callable): Zero-argument function returning the object.
+        """
+        self.loader = loader
+
+
+class DeferredAttribute:
+    """
+    Instance attribute that resolves a Deferred placeholder on first access.
+
+    Lets a model class keep its fitted estimator attribute while an artifact
+    defers unpickling the estimator until something actually needs it.
+    """
+
+    def __set_name__(self, owner, name):
+        self.attr = f"_{name}"
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = obj.__dict__.get(self.attr)
+        if isinstance(value, Deferred):
+            value = value.loader()
+            obj.__dict__[self.attr] = value
+        return value
+
+    def __set__(self, obj, value):
+        obj.__dict__[self.attr] = value
+
+
+def is_artifact(path):
+    """
+    Check whether a path is a model artifact directory.
+
+    Args:
+        path (str): Path to check.
+
+    Returns:
+        bool: True if the path holds an artifact manifest, False otherwise.
+    """
+    return os.path.isfile(os.path.join(path, MANIFEST_NAME))
+
+
+def file_checksum(path, chunk_size=1 << 20):
+    """
+    Compute the SHA-256 checksum of a file.
+
+    Args:
+        path (str): Path to the file.
+        chunk_size (int): Number of bytes read at a time.
+
+    Returns:
+        str: Hex digest of the file contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _deferred_loader(path, mmap_mode):
+    """
+    Open an object file now and return a function that unpickles it later.
+
+    While the path still names the opened file, it is loaded by path so the
+    arrays inside can be memory-mapped; once a later save deleted the file,
+    it is unpickled from the open handle instead.
+
+    Args:
+        path (str): Path to the joblib file.
+        mmap_mode (str): Memory-map mode for joblib, or None.
+
+    Returns:
+        callable: Zero-argument function returning the object; call it once.
+    """
+    import joblib
+
+    handle = open(path, "rb")
+
+    def load():
+        with handle:
+            try:
+                same_file = os.path.samestat(os.fstat(handle.fileno()), os.stat(path))
+            except OSError:
+                same_file = False
+            if same_file:
+                return joblib.load(path, mmap_mode=mmap_mode)
+            return joblib.load(handle)
+
+    return load
+
+
+def save_artifact(
+    directory, model_type, arrays=None, objects=None, model_version=0, metadata=None
+):
+    """
+    Save a model artifact directory.
+
+    Each save writes its files under names no earlier save has used, and the
+    manifest is replaced last (atomically), so the manifest always lists a
+    complete artifact, even while the directory is being saved over. The
+    files of the previous save are kept until the next one, so readers that
+    read the old manifest just before the swap can still open them; older
+    files are deleted.
+
+    Args:
+        directory (str): Directory to write the artifact to.
+        model_type (str): Name of the model class the artifact belongs to.
+        arrays (dict, optional): NumPy arrays keyed by name.
+        objects (dict, optional): Other picklable objects keyed by name.
+        model_version (int): Version of the model being saved.
+        metadata (dict, optional): Additional JSON-serializable metadata.
+
+    Returns:
+        dict: The written manifest.
+    """
+    import joblib
+
+    arrays = arrays or {}
+    objects = objects or {}
+    os.makedirs(directory, exist_ok=True)
+
+    try:
+        previous = read_manifest(directory)
+    except (ArtifactError, OSError, ValueError):
+        previous = None
+    generation = uuid.uuid4().hex[:12]
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "model_type": model_type,
+        "model_version": model_version,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "arrays": {},
+        "objects": {},
+        "files": {},
+        "previous_files": sorted(previous["files"]) if previous else [],
+        "metadata": metadata or {},
+    }
+
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        filename = f"{name}.{generation}.npy"
+        np.save(os.path.join(directory, filename), array, allow_pickle=False)
+        manifest["arrays"][name] = {
+            "file": filename,
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+        }
+
+    for name, obj in objects.items():
+        filename = f"{name}.{generation}.joblib"
+        # Uncompressed, so the arrays inside can be memory-mapped on load
+        joblib.dump(obj, os.path.join(directory, filename), compress=0)
+        manifest["objects"][name] = {"file": filename}
+
+    for entry in list(manifest["arrays"].values()) + list(manifest["objects"].values()):
+        path = os.path.join(directory, entry["file"])
+        manifest["files"][entry["file"]] = {
+            "sha256": file_checksum(path),
+            "bytes": os.path.getsize(path),
+        }
+
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    tmp_path = f"{manifest_path}.{generation}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=4)
+    os.replace(tmp_path, manifest_path)
+
+    # Drop the files of the save before the previous one
+    if previous:
+        keep = set(manifest["files"]) | set(previous["files"])
+        for filename in previous.get("previous_files", []):
+            if filename not in keep:
+                try:
+                    os.remove(os.path.join(directory, filename))
+                except OSError:
+                    pass  # Already gone, or still mapped on a platform that forbids deleting it
+
+    return manifest
+
+
+def read_manifest(directory):
+    """
+    Read the manifest of an artifact directory.
+
+    Args:
+        directory (str): Artifact directory.
+
+    Returns:
+        dict: The manifest.
+
+    Raises:
+        ArtifactError: If the manifest is missing or has an unsupported format.
+    """
+    manifest_path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.isfile(manifest_path):
+        raise ArtifactError(f"No artifact manifest in {directory}")
+
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ArtifactError(
+            f"Unsupported artifact format version: {manifest.get('format_version')}"
+        )
+    return manifest
+
+
+def verify_artifact(directory, manifest=None):
+    """
+    Check every artifact file against the sizes and checksums in the manifest.
+
+    Args:
+        directory (str): Artifact directory.
+        manifest (dict, optional): Manifest already read from the directory.
+
+    Raises:
+        ArtifactError: If a file is missing or does not match the manifest.
+    """
+    if manifest is None:
+        manifest = read_manifest(directory)
+
+    for filename, expected in manifest["files"].items():
+        path = os.path.join(directory, filename)
+        if not os.path.isfile(path):
+            raise ArtifactError(f"Artifact file missing: {filename}")
+        if (
+            os.path.getsize(path) != expected["bytes"]
+            or file_checksum(path) != expected["sha256"]
+        ):
+            raise ArtifactError(f"Checksum mismatch for artifact file: {filename}")
+
+
+def load_artifact(
+    directory, model_type=None, mmap=True, verify=False, lazy_objects=False
+):
+    """
+    Load a model artifact directory.
+
+    Args:
+        directory (str): Artifact directory.
+        model_type (str, optional): Expected model type; checked if given.
+        mmap (bool): Whether to memory-map arrays read-only instead of reading
+            them into process memory.
+        verify (bool): Whether to check file checksums before loading. This
+            reads every file in full, so it is meant for deploy time, not
+            for every worker start.
+        lazy_objects (bool): Whether to return Deferred placeholders instead of
+            unpickling the objects now.
+
+    Returns:
+        tuple: (arrays dict, objects dict, manifest dict)
+
+    Raises:
+        ArtifactError: If the artifact is missing, of the wrong type or corrupted.
+    """
+    import joblib
+
+    manifest = read_manifest(directory)
+    if model_type is not None and manifest["model_type"] != model_type:
+        raise ArtifactError(
+            f"Artifact holds a {manifest['model_type']}, expected a {model_type}"
+        )
+    if verify:
+        verify_artifact(directory, manifest)
+
+    mmap_mode = "r" if mmap else None
+
+    arrays = {}
+    for name, entry in manifest["arrays"].items():
+        path = os.path.join(directory, entry["file"])
+        # Empty files cannot be memory-mapped
+        mode = mmap_mode if np.prod(entry["shape"]) > 0 else None
+        arrays[name] = np.load(path, mmap_mode=mode, allow_pickle=False)
+
+    objects = {}
+    for name, entry in manifest["objects"].items():
+        path = os.path.join(directory, entry["file"])
+        if lazy_objects:
+            objects[name] = Deferred(_deferred_loader(path, mmap_mode))
+        else:
+            objects[name] = joblib.load(path, mmap_mode=mmap_mode)
+
+    return arrays, objects, manifest
@@ -7,90 +7,287 @@ using machine learning models based on historical data and market trends.
 
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import StandardScaler
 from datetime import datetime, timedelta
 
+from compiled_forest import CompiledForest
+from feature_buffer import FeatureBuffer, feature_dtype as validate_feature_dtype
+from feature_state import PriceFeatureState
+from metrics import span, timed
+from model_store import DeferredAttribute, is_artifact, load_artifact, save_artifact
+from scaling import apply_scaler, is_fitted, scaler_arrays, scaler_from_arrays
+
 class PricePredictor:
     """
     A class for predicting carbon credit prices using machine learning.
     """
     
-    def __init__(self, model_path=None):
+    # Fitted sklearn model; artifacts with compiled trees load it on first access
+    model = DeferredAttribute()
+    
+    # Rows before a day that its features look back on (30-day rolling mean)
+    FEATURE_CONTEXT_ROWS = 29
+    
+    def __init__(self, model_path=None, feature_cache=None, feature_dtype='float64'):
         """
         Initialize the price predictor.
         
         Args:
-            model_path (str, optional): Path to a pre-trained model file.
+            model_path (str, optional): Path to a pre-trained model file or
+                artifact directory.
+            feature_cache (FeatureCache, optional): Cache for feature matrices,
+                reused for repeated histories and extended for appended prices.
+            feature_dtype (str): 'float64', or 'float32' to prepare features
+                in preallocated float32 buffers reused across calls. This
+                halves the feature memory, but a prepared matrix is only valid
+                until the next call and the predictor must not be shared
+                between threads.
         """
+        # scikit-learn is imported on first use to keep module import cheap
+        from sklearn.preprocessing import StandardScaler
+        
         self.model = None
         self.scaler = StandardScaler()
+        self.model_version = 0  # Bumped whenever the fitted model changes
+        self.trained_through = None  # Date of the last price the model has learned from
+        self.manifest = None  # Manifest of the loaded artifact, if any
+        self._compiled = None  # Compiled trees for inference (see compiled_forest)
+        self._compiled_version = None
+        self.feature_cache = feature_cache
+        self.feature_dtype = validate_feature_dtype(feature_dtype)
+        self._feature_buffers = None
+        if self.feature_dtype == np.float32:
+            self._feature_buffers = {
+                'features': FeatureBuffer(self.feature_dtype),
+                'scaled': FeatureBuffer(self.feature_dtype)
+            }
         
         if model_path:
             self._load_model(model_path)
         else:
-            self.model = RandomForestRegressor(
-                n_estimators=100,
-                max_depth=10,
-                random_state=42
-            )
+            self.model = self._default_model()
+    
+    def _default_model(self):
+        """
+        Create an untrained model with the default hyperparameters.
+        
+        Returns:
+            RandomForestRegressor: The untrained model.
+        """
+        from sklearn.ensemble import RandomForestRegressor
+        
+        return RandomForestRegressor(
+            n_estimators=100,
+            max_depth=10,
+            random_state=42
+        )
     
     def _load_model(self, model_path):
         """
-        Load a pre-trained model from a file.
+        Load a pre-trained model from a file or artifact directory.
         
         Args:
-            model_path (str): Path to the model file.
+            model_path (str): Path to the model file or artifact directory.
         """
         try:
+            if is_artifact(model_path):
+                arrays, objects, self.manifest = load_artifact(
+                    model_path, model_type='PricePredictor', lazy_objects=True
+                )
+                self.model = objects['model']
+                self.scaler = scaler_from_arrays(arrays)
+                self.trained_through = self._parse_date(self.manifest['metadata'].get('trained_through'))
+                self.model_version += 1
+                
+                # Inference runs on the memory-mapped node arrays, so the
+                # pickled forest is only unpickled if something needs it
+                self._compiled = CompiledForest.from_arrays(arrays, 'model')
+                self._compiled_version = self.model_version if self._compiled else None
+                print(f"Model loaded from {model_path}")
+                return
+            
             import joblib
-            self.model = joblib.load(model_path)
+            artifact = joblib.load(model_path)
+            
+            # Artifacts saved with scaler statistics are a dict; older
+            # artifacts hold only the model and refit the scaler on use
+            if isinstance(artifact, dict):
+                self.model = artifact['model']
+                self.scaler = artifact['scaler']
+                self.trained_through = artifact.get('trained_through')
+            else:
+                self.model = artifact
+            self.model_version += 1
             print(f"Model loaded from {model_path}")
         except Exception as e:
             print(f"Error loading model: {e}")
-            self.model = RandomForestRegressor(
-                n_estimators=100,
-                max_depth=10,
-                random_state=42
-            )
+            self.model = self._default_model()
     
-    def _prepare_features(self, historical_data):
+    @staticmethod
+    def _parse_date(value):
         """
-        Prepare features for the prediction model.
+        Parse an optional stored date.
+        
+        Args:
+            value (str): ISO date string, or None.
+            
+        Returns:
+            pd.Timestamp: The date, or None.
+        """
+        return pd.Timestamp(value) if value else None
+    
+    def _compiled_model(self):
+        """
+        Get the compiled form of the fitted model, compiling it when the model
+        version has changed.
+        
+        Returns:
+            CompiledForest: The compiled model, or None if the model cannot be
+                compiled (e.g. it is not fitted or not a supported ensemble).
+        """
+        if self._compiled_version != self.model_version:
+            try:
+                self._compiled = CompiledForest.from_sklearn(self.model)
+            except ValueError:
+                self._compiled = None
+            self._compiled_version = self.model_version
+        return self._compiled
+    
+    @timed('inference')
+    def _predict_rows(self, X):
+        """
+        Predict prices for scaled feature rows.
+        
+        Args:
+            X (np.ndarray): Scaled feature matrix.
+            
+        Returns:
+            np.ndarray: Predicted prices.
+        """
+        compiled = self._compiled_model()
+        if compiled is None:
+            return self.model.predict(X)
+        return compiled.predict(X)
+    
+    @timed('features')
+    def _build_feature_matrix(self, historical_data):
+        """
+        Build the unscaled feature matrix from historical data, through the
+        feature cache if the predictor has one.
         
         Args:
             historical_data (pd.DataFrame): Historical price data.
             
         Returns:
-            np.ndarray: Prepared feature matrix.
+            np.ndarray: Unscaled feature matrix with NaN values replaced by zero.
         """
-        # Extract features from historical data
-        features = []
+        if self.feature_cache is None:
+            out = None
+            if self._feature_buffers is not None:
+                out = self._feature_buffers['features'].rows(
+                    len(historical_data), self._n_features(historical_data)
+                )
+            return self._compute_feature_matrix(historical_data, out=out)
         
+        # Features depend only on these columns and the feature dtype; each
+        # row looks back at most FEATURE_CONTEXT_ROWS rows, so appended
+        # prices extend a cached matrix
+        columns = [c for c in ['price', 'volume', 'sentiment'] if c in historical_data.columns]
+        return self.feature_cache.get_or_compute(
+            f"PricePredictor:{np.dtype(self.feature_dtype).name}",
+            historical_data[columns],
+            self._compute_feature_matrix,
+            context_rows=self.FEATURE_CONTEXT_ROWS
+        )
+    
+    @staticmethod
+    def _n_features(historical_data):
+        """
+        Count the feature columns built for historical data.
+        
+        Args:
+            historical_data (pd.DataFrame): Historical price data.
+            
+        Returns:
+            int: Number of feature columns.
+        """
+        return 4 + 2 * ('volume' in historical_data.columns) + ('sentiment' in historical_data.columns)
+    
+    @staticmethod
+    def _feature_columns(historical_data):
+        """
+        Generate the unscaled feature columns one at a time.
+        
+        Args:
+            historical_data (pd.DataFrame): Historical price data.
+            
+        Yields:
+            np.ndarray: The next feature column, in feature matrix order.
+        """
         # Price-based features
-        features.append(historical_data['price'].values)
-        features.append(historical_data['price'].rolling(7).mean().values)
-        features.append(historical_data['price'].rolling(30).mean().values)
-        features.append(historical_data['price'].rolling(7).std().values)
+        yield historical_data['price'].values
+        yield historical_data['price'].rolling(7).mean().values
+        yield historical_data['price'].rolling(30).mean().values
+        yield historical_data['price'].rolling(7).std().values
         
         # Volume-based features
         if 'volume' in historical_data.columns:
-            features.append(historical_data['volume'].values)
-            features.append(historical_data['volume'].rolling(7).mean().values)
+            yield historical_data['volume'].values
+            yield historical_data['volume'].rolling(7).mean().values
         
         # Market sentiment features
         if 'sentiment' in historical_data.columns:
-            features.append(historical_data['sentiment'].values)
+            yield historical_data['sentiment'].values
+    
+    def _compute_feature_matrix(self, historical_data, out=None):
+        """
+        Compute the unscaled feature matrix from historical data.
+        
+        Args:
+            historical_data (pd.DataFrame): Historical price data.
+            out (np.ndarray, optional): Matrix of shape (rows, features) to
+                write the features into, instead of allocating one.
+            
+        Returns:
+            np.ndarray: Unscaled feature matrix with NaN values replaced by zero.
+        """
+        if out is None:
+            out = np.empty(
+                (len(historical_data), self._n_features(historical_data)), dtype=self.feature_dtype
+            )
+        
+        # Write each column into the matrix as it is computed, so only one
+        # intermediate column is alive at a time
+        for i, column in enumerate(self._feature_columns(historical_data)):
+            out[:, i] = column
+        
+        # Handle NaN values
+        np.nan_to_num(out, copy=False)
+        
+        return out
+    
+    def _prepare_features(self, historical_data, fit=False):
+        """
+        Prepare features for the prediction model.
         
-        # Combine features and handle NaN values
-        feature_matrix = np.column_stack(features)
-        feature_matrix = np.nan_to_num(feature_matrix)
+        Args:
+            historical_data (pd.DataFrame): Historical price data.
+            fit (bool): Whether to fit the scaler on this data. Only training
+                should fit; inference reuses the fitted statistics.
+            
+        Returns:
+            np.ndarray: Prepared feature matrix.
+        """
+        feature_matrix = self._build_feature_matrix(historical_data)
         
-        # Scale features
-        feature_matrix = self.scaler.fit_transform(feature_matrix)
+        # Scale features, into the reused buffer on the float32 path
+        out = None
+        if self._feature_buffers is not None:
+            out = self._feature_buffers['scaled'].rows(*feature_matrix.shape)
+        feature_matrix = apply_scaler(self.scaler, feature_matrix, fit=fit, out=out)
         
         return feature_matrix
     
+    @timed('PricePredictor.train')
     def train(self, historical_data):
         """
         Train the price prediction model.
@@ -107,22 +304,100 @@ class PricePredictor:
         """
         try:
             # Prepare features and target
-            X = self._prepare_features(historical_data)
-            y = historical_data['price'].shift(-1).values[:-1]  # Predict next day's price
-            X = X[:-1]  # Remove last row as we don't have target for it
-            
-            # Remove NaN values
-            mask = ~np.isnan(y)
-            X = X[mask]
-            y = y[mask]
+            X, y = self._training_arrays(historical_data, fit=True)
             
             # Train the model
-            self.model.fit(X, y)
+            with span('fit'):
+                self.model.fit(X, y)
+            self.model_version += 1
+            self.trained_through = pd.Timestamp(historical_data['date'].iloc[-1])
             return True
         except Exception as e:
             print(f"Error training model: {e}")
             return False
     
+    def _training_arrays(self, historical_data, fit=False):
+        """
+        Build the training pairs: each day's features and the next day's price.
+        
+        Args:
+            historical_data (pd.DataFrame): Historical price data.
+            fit (bool): Whether to fit the scaler on this data.
+            
+        Returns:
+            tuple: (X, y) for the days with a known next-day price.
+        """
+        X = self._prepare_features(historical_data, fit=fit)
+        y = historical_data['price'].shift(-1).values[:-1]  # Predict next day's price
+        X = X[:-1]  # Remove last row as we don't have target for it
+        
+        # Remove NaN values; without any, X is passed on as a view
+        mask = ~np.isnan(y)
+        if mask.all():
+            return X, y
+        return X[mask], y[mask]
+    
+    @timed('PricePredictor.update')
+    def update(self, historical_data, n_new_trees=10, recent_days=90, max_trees=None):
+        """
+        Incrementally update the model with newly arrived prices.
+        
+        Instead of retraining from scratch, new trees are fitted on recent
+        days and added to the existing forest (warm start). The scaler is kept
+        fixed so the existing trees remain valid. Without a fitted model, this
+        falls back to train().
+        
+        Args:
+            historical_data (pd.DataFrame): Historical price data including
+                the new prices; features need the preceding history for the
+                rolling windows.
+            n_new_trees (int): Number of trees to add.
+            recent_days (int): Minimum number of most recent days the new trees
+                are fitted on (more if more days are new).
+            max_trees (int, optional): Maximum forest size; the oldest trees
+                are dropped beyond it so the forest tracks recent prices.
+                
+        Returns:
+            bool: True if the model is up to date, False if the update failed.
+        """
+        try:
+            if not hasattr(self.model, 'estimators_'):
+                return self.train(historical_data)
+            if 'warm_start' not in self.model.get_params():
+                raise ValueError(f"{type(self.model).__name__} does not support incremental updates")
+            
+            # Count the training pairs whose target price is new
+            dates = pd.to_datetime(historical_data['date'])
+            n_new = len(dates) - 1
+            if self.trained_through is not None:
+                n_new = int((dates.values[1:] > np.datetime64(self.trained_through)).sum())
+            if n_new == 0:
+                return True
+            
+            X, y = self._training_arrays(historical_data)
+            n_rows = min(len(y), max(n_new, recent_days))
+            
+            # Grow the forest with trees fitted on the recent rows only
+            n_trees = len(self.model.estimators_)
+            self.model.set_params(warm_start=True, n_estimators=n_trees + n_new_trees)
+            with span('fit'):
+                self.model.fit(X[-n_rows:], y[-n_rows:])
+            self.model.set_params(warm_start=False)
+            
+            if max_trees is not None and len(self.model.estimators_) > max_trees:
+                self.model.estimators_ = self.model.estimators_[-max_trees:]
+                self.model.set_params(n_estimators=max_trees)
+            
+            # Downstream caches key on the version, so they stop serving
+            # forecasts from the previous forest
+            self.model_version += 1
+            self.trained_through = dates.iloc[-1]
+            return True
+        except Exception as e:
+            print(f"Error updating model: {e}")
+            return False
+    
+    @timed('PricePredictor.predict')
     def predict(self, historical_data, days_ahead=30):
         """
         Predict future carbon credit prices.
@@ -134,17 +409,20 @@ class PricePredictor:
         Returns:
             pd.DataFrame: DataFrame with dates and predicted prices.
         """
-        if self.model is None:
+        if self._compiled_model() is None and self.model is None:
             raise ValueError("Model not trained. Call train() first.")
         
-        # Make a copy of the data to avoid modifying the original
-        data = historical_data.copy()
-        
-        # Prepare initial features
-        X = self._prepare_features(data)
+        # Build the streaming feature state once; each forecast step then
+        # appends the predicted price and updates the rolling windows and
+        # scaling statistics in constant time
+        state = PriceFeatureState(
+            historical_data,
+            self._build_feature_matrix(historical_data),
+            scaler=self.scaler if is_fitted(self.scaler) else None
+        )
         
         # Get the last date in the historical data
-        last_date = data['date'].iloc[-1]
+        last_date = historical_data['date'].iloc[-1]
         
         # Initialize results
         future_dates = [last_date + timedelta(days=i+1) for i in range(days_ahead)]
@@ -153,21 +431,11 @@ class PricePredictor:
         # Predict each day iteratively
         for _ in range(days_ahead):
             # Predict the next day's price
-            next_price = self.model.predict([X[-1]])[0]
+            next_price = self._predict_rows(state.current_features())[0]
             predictions.append(next_price)
             
-            # Update the data with the prediction
-            new_row = pd.DataFrame({
-                'date': [future_dates[_]],
-                'price': [next_price],
-                'volume': [data['volume'].mean()] if 'volume' in data.columns else [0],
-                'sentiment': [data['sentiment'].mean()] if 'sentiment' in data.columns else [0]
-            })
-            
-            data = pd.concat([data, new_row], ignore_index=True)
-            
-            # Update features
-            X = self._prepare_features(data)
+            # Update the features with the prediction
+            state.append(next_price)
         
         # Create result DataFrame
         result = pd.DataFrame({
@@ -177,6 +445,170 @@ class PricePredictor:
         
         return result
     
+    @timed('PricePredictor.predict_batch')
+    def predict_batch(self, histories, days_ahead=30):
+        """
+        Predict future prices for many independent histories at once.
+        
+        All histories are advanced together: each forecast day makes a single
+        model call on the stacked feature rows of every series still running.
+        
+        Args:
+            histories (list): Historical price DataFrames with the same columns.
+            days_ahead (int or list): Days to predict ahead, for all histories
+                or per history.
+            
+        Returns:
+            list: One DataFrame with dates and predicted prices per history.
+        """
+        if self._compiled_model() is None and self.model is None:
+            raise ValueError("Model not trained. Call train() first.")
+        
+        if isinstance(days_ahead, int):
+            days_ahead = [days_ahead] * len(histories)
+        
+        scaler = self.scaler if is_fitted(self.scaler) else None
+        states = [
+            PriceFeatureState(history, self._build_feature_matrix(history), scaler=scaler)
+            for history in histories
+        ]
+        if len({state.last_row.shape[0] for state in states}) > 1:
+            raise ValueError("All histories must have the same feature columns")
+        
+        horizon = max(days_ahead, default=0)
+        predictions = np.zeros((len(states), horizon))
+        
+        for step in range(horizon):
+            active = [i for i, days in enumerate(days_ahead) if days > step]
+            X = np.vstack([states[i].current_features() for i in active])
+            next_prices = self._predict_rows(X)
+            
+            for i, next_price in zip(active, next_prices):
+                predictions[i, step] = next_price
+                states[i].append(next_price)
+        
+        results = []
+        for history, days, series_predictions in zip(histories, days_ahead, predictions):
+            last_date = history['date'].iloc[-1]
+            results.append(pd.DataFrame({
+                'date': [last_date + timedelta(days=i+1) for i in range(days)],
+                'predicted_price': series_predictions[:days]
+            }))
+        
+        return results
+    
+    @timed('PricePredictor.predict_scenarios')
+    def predict_scenarios(self, historical_data, days_ahead=30, n_scenarios=1000,
+                          quantiles=(0.1, 0.5, 0.9), price_noise=None, sample_trees=True,
+                          seed=None, return_paths=False):
+        """
+        Forecast price bands over many sampled future scenarios.
+        
+        Each scenario draws its future volume and sentiment from the
+        history (bootstrap) instead of filling them with the historical mean,
+        adds Gaussian noise to every predicted price, and, for forest models,
+        follows a single randomly drawn tree so that the spread between trees
+        adds model uncertainty. All scenarios are advanced together: each
+        forecast day is one model evaluation on the stacked
+        (n_scenarios, n_features) matrix.
+        
+        Args:
+            historical_data (pd.DataFrame): Historical price data.
+            days_ahead (int): Number of days to predict ahead.
+            n_scenarios (int): Number of scenario paths.
+            quantiles (tuple): Quantiles of the price distribution to return.
+            price_noise (float, optional): Standard deviation of the noise
+                added to each predicted price. Defaults to the standard
+                deviation of the model's one-step errors on the history.
+            sample_trees (bool): Whether to follow one tree per scenario
+                instead of the forest mean.
+            seed (int, optional): Random seed.
+            return_paths (bool): Whether to also return the scenario paths.
+        
+        Returns:
+            pd.DataFrame: Dates with the mean and one column per quantile
+                (e.g. p10, p50, p90) of the predicted prices. With
+                return_paths, a tuple of the bands and the paths of shape
+                (n_scenarios, days_ahead).
+        """
+        if self._compiled_model() is None and self.model is None:
+            raise ValueError("Model not trained. Call train() first.")
+        if n_scenarios < 1:
+            raise ValueError("n_scenarios must be at least 1")
+        
+        rng = np.random.default_rng(seed)
+        feature_matrix = self._build_feature_matrix(historical_data)
+        if is_fitted(self.scaler):
+            mean, scale = self.scaler.mean_, self.scaler.scale_
+        else:
+            mean, scale = feature_matrix.mean(axis=0), feature_matrix.std(axis=0)
+            scale[scale == 0] = 1.0
+        
+        prices = historical_data['price'].to_numpy(dtype=float)
+        if price_noise is None:
+            # One-step errors of the model on the history
+            X_history = (feature_matrix[:-1] - mean) / scale
+            errors = prices[1:] - self._predict_rows(X_history)
+            price_noise = float(np.nanstd(errors)) if len(errors) else 0.0
+        
+        compiled = self._compiled_model()
+        trees = None
+        if sample_trees and compiled is not None and compiled.kind == 'mean':
+            trees = rng.integers(0, compiled.n_trees, n_scenarios)
+        
+        # Rolling windows of every scenario: the last 30 known prices (and 7
+        # volumes), NaN-padded for short histories, followed by the forecast
+        price_paths = np.full((n_scenarios, 30 + days_ahead), np.nan)
+        known = prices[-30:]
+        price_paths[:, 30 - len(known):30] = known
+        
+        has_volume = 'volume' in historical_data.columns
+        has_sentiment = 'sentiment' in historical_data.columns
+        if has_volume:
+            volumes = historical_data['volume'].to_numpy(dtype=float)
+            volume_paths = np.full((n_scenarios, 7 + days_ahead), np.nan)
+            volume_paths[:, 7 - len(volumes[-7:]):7] = volumes[-7:]
+            volume_paths[:, 7:] = rng.choice(volumes[~np.isnan(volumes)], size=(n_scenarios, days_ahead))
+        if has_sentiment:
+            sentiments = historical_data['sentiment'].to_numpy(dtype=float)
+            future_sentiment = rng.choice(sentiments[~np.isnan(sentiments)], size=(n_scenarios, days_ahead))
+        
+        noise = rng.normal(0.0, price_noise, size=(n_scenarios, days_ahead))
+        X = np.tile((feature_matrix[-1] - mean) / scale, (n_scenarios, 1))
+        
+        for step in range(days_ahead):
+            if trees is None:
+                next_prices = self._predict_rows(X)
+            else:
+                with span('inference'):
+                    next_prices = compiled.predict_trees(X, trees)
+            next_prices = next_prices + noise[:, step]
+            price_paths[:, 30 + step] = next_prices
+            
+            # Feature rows for the new day, in _build_feature_matrix order
+            window = price_paths[:, step + 1:step + 31]
+            columns = [next_prices, window[:, -7:].mean(axis=1), window.mean(axis=1), window[:, -7:].std(axis=1, ddof=1)]
+            if has_volume:
+                volume_window = volume_paths[:, step + 1:step + 8]
+                columns.extend([volume_window[:, -1], volume_window.mean(axis=1)])
+            if has_sentiment:
+                columns.append(future_sentiment[:, step])
+            X = (np.nan_to_num(np.column_stack(columns)) - mean) / scale
+        
+        paths = price_paths[:, 30:]
+        last_date = historical_data['date'].iloc[-1]
+        bands = pd.DataFrame({
+            'date': [last_date + timedelta(days=i+1) for i in range(days_ahead)],
+            'mean': paths.mean(axis=0)
+        })
+        for q, values in zip(quantiles, np.quantile(paths, quantiles, axis=0)):
+            bands[f"p{q * 100:g}"] = values
+        
+        if return_paths:
+            return bands, paths
+        return bands
+    
+    @timed('PricePredictor.evaluate')
     def evaluate(self, test_data):
         """
         Evaluate the model on test data.
@@ -187,7 +619,7 @@ class PricePredictor:
         Returns:
             dict: Evaluation metrics.
         """
-        if self.model is None:
+        if self._compiled_model() is None and self.model is None:
             raise ValueError("Model not trained. Call train() first.")
         
         # Prepare features
@@ -195,7 +627,7 @@ class PricePredictor:
         y_true = test_data['price'].values
         
         # Make predictions
-        y_pred = self.model.predict(X)
+        y_pred = self._predict_rows(X)
         
         # Calculate metrics
         mse = np.mean((y_pred - y_true) ** 2)
@@ -208,22 +640,52 @@ class PricePredictor:
             'mape': mape
         }
     
-    def save_model(self, model_path):
+    def save_model(self, model_path, artifact_format='pickle'):
         """
         Save the trained model to a file.
         
         Args:
             model_path (str): Path to save the model.
+            artifact_format (str): 'pickle' for a single joblib file, or 'mmap'
+                for an artifact directory with a manifest that worker processes
+                can memory-map (see model_store).
             
         Returns:
             bool: True if saving was successful, False otherwise.
         """
         if self.model is None:
             raise ValueError("Model not trained. Call train() first.")
+        if artifact_format not in ('pickle', 'mmap'):
+            raise ValueError(f"Unknown artifact format: {artifact_format}")
         
         try:
+            if artifact_format == 'mmap':
+                # Store the compiled trees next to the pickled model so that
+                # workers can serve predictions from the shared mapped arrays
+                arrays = scaler_arrays(self.scaler)
+                trained_through = None
+                if self.trained_through is not None:
+                    trained_through = self.trained_through.isoformat()
+                compiled = self._compiled_model()
+                if compiled is not None:
+                    arrays.update(compiled.to_arrays('model'))
+                self.manifest = save_artifact(
+                    model_path,
+                    'PricePredictor',
+                    arrays=arrays,
+                    objects={'model': self.model},
+                    model_version=self.model_version,
+                    metadata={'trained_through': trained_through}
+                )
+                print(f"Model saved to {model_path}")
+                return True
+            
             import joblib
-            joblib.dump(self.model, model_path)
+            joblib.dump({
+                'model': self.model,
+                'scaler': self.scaler,
+                'trained_through': self.trained_through
+            }, model_path)
             print(f"Model saved to {model_path}")
             return True
         except Exception as e:
@@ -5,11 +5,16 @@ This module provides functionality to analyze and evaluate carbon reduction
 projects using machine learning models.
 """
 
+import json
+
 import numpy as np
 import pandas as pd
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingRegressor
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
+
+from compiled_forest import CompiledForest
+from feature_buffer import FeatureBuffer, feature_dtype as validate_feature_dtype
+from metrics import span, timed
+from model_store import DeferredAttribute, is_artifact, load_artifact, save_artifact
+from scaling import apply_scaler, scaler_arrays, scaler_from_arrays
 
 class ProjectAnalyzer:
     """
@@ -36,145 +41,352 @@ class ProjectAnalyzer:
         'social_impact': 0.15      # Potential negative social consequences
     }
     
-    def __init__(self, model_path=None):
+    # Numerical feature columns, in feature matrix order
+    NUMERICAL_FEATURES = [
+        'size_hectares', 'duration_years',                           # Project size and duration
+        'cost_per_ton', 'total_investment', 'expected_roi',          # Financial metrics
+        'annual_reduction_tons', 'total_reduction_tons',             # Environmental metrics
+        'biodiversity_score',
+        'community_benefit_score', 'jobs_created'                    # Social metrics
+    ] + list(RISK_FACTORS.keys())                                    # Risk metrics
+    
+    # Categorical feature columns with a vocabulary learned at training time
+    LEARNED_CATEGORIES = ['region', 'verification_standard']
+    
+    # Fitted sklearn models; artifacts with compiled trees load them on first access
+    classification_model = DeferredAttribute()
+    regression_model = DeferredAttribute()
+    
+    def __init__(self, model_path=None, feature_cache=None, feature_dtype='float64'):
         """
         Initialize the project analyzer.
         
         Args:
             model_path (str, optional): Path to pre-trained models.
+            feature_cache (FeatureCache, optional): Cache for the encoded
+                feature matrices of repeated project data.
+            feature_dtype (str): 'float64', or 'float32' to encode features
+                in preallocated float32 buffers reused across calls; a
+                prepared matrix is then only valid until the next call and
+                the analyzer must not be shared between threads.
         """
+        # scikit-learn is imported on first use to keep module import cheap
+        from sklearn.preprocessing import StandardScaler
+        
         self.classification_model = None
         self.regression_model = None
         self.scaler = StandardScaler()
+        self.feature_schema = None  # Feature layout learned in train()
+        self.model_version = 0  # Bumped whenever the fitted models change
+        self.manifest = None  # Manifest of the loaded artifact, if any
+        self._compiled = (None, None)  # Compiled trees for inference (see compiled_forest)
+        self._compiled_version = None
+        self.feature_cache = feature_cache
+        self.feature_dtype = validate_feature_dtype(feature_dtype)
+        self._feature_buffers = None
+        if self.feature_dtype == np.float32:
+            self._feature_buffers = {
+                'features': FeatureBuffer(self.feature_dtype),
+                'scaled': FeatureBuffer(self.feature_dtype)
+            }
         
         if model_path:
             self._load_models(model_path)
         else:
-            self.classification_model = RandomForestClassifier(
-                n_estimators=100,
-                max_depth=10,
-                random_state=42
-            )
-            self.regression_model = GradientBoostingRegressor(
-                n_estimators=100,
-                max_depth=5,
-                learning_rate=0.1,
-                random_state=42
-            )
+            self.classification_model, self.regression_model = self._default_models()
+    
+    def _default_models(self):
+        """
+        Create untrained models with the default hyperparameters.
+        
+        Returns:
+            tuple: (RandomForestClassifier, GradientBoostingRegressor)
+        """
+        from sklearn.ensemble import RandomForestClassifier, GradientBoostingRegressor
+        
+        classification_model = RandomForestClassifier(
+            n_estimators=100,
+            max_depth=10,
+            random_state=42
+        )
+        regression_model = GradientBoostingRegressor(
+            n_estimators=100,
+            max_depth=5,
+            learning_rate=0.1,
+            random_state=42
+        )
+        return classification_model, regression_model
     
     def _load_models(self, model_path):
         """
         Load pre-trained models from files.
         
         Args:
-            model_path (str): Path to the model files.
+            model_path (str): Path to the model files or artifact directory.
         """
         try:
             import joblib
+            import json
+            import os
+            
+            if is_artifact(model_path):
+                arrays, objects, self.manifest = load_artifact(
+                    model_path, model_type='ProjectAnalyzer', lazy_objects=True
+                )
+                self.classification_model = objects['classification_model']
+                self.regression_model = objects['regression_model']
+                self.scaler = scaler_from_arrays(arrays)
+                self.feature_schema = self.manifest['metadata'].get('feature_schema')
+                self.model_version += 1
+                
+                # Inference runs on the memory-mapped node arrays, so the
+                # pickled models are only unpickled if something needs them
+                self._compiled = (
+                    CompiledForest.from_arrays(arrays, 'classification_model'),
+                    CompiledForest.from_arrays(arrays, 'regression_model')
+                )
+                self._compiled_version = self.model_version if None not in self._compiled else None
+                print(f"Models loaded from {model_path}")
+                return
+            
             self.classification_model = joblib.load(f"{model_path}/classification_model.pkl")
             self.regression_model = joblib.load(f"{model_path}/regression_model.pkl")
+            
+            # Older model directories have no scaler; features are then scaled per request
+            if os.path.exists(f"{model_path}/scaler.pkl"):
+                self.scaler = joblib.load(f"{model_path}/scaler.pkl")
+            if os.path.exists(f"{model_path}/feature_schema.json"):
+                with open(f"{model_path}/feature_schema.json") as f:
+                    self.feature_schema = json.load(f)
+            self.model_version += 1
             print(f"Models loaded from {model_path}")
         except Exception as e:
             print(f"Error loading models: {e}")
-            self.classification_model = RandomForestClassifier(
-                n_estimators=100,
-                max_depth=10,
-                random_state=42
-            )
-            self.regression_model = GradientBoostingRegressor(
-                n_estimators=100,
-                max_depth=5,
-                learning_rate=0.1,
-                random_state=42
-            )
+            self.classification_model, self.regression_model = self._default_models()
+    
+    def _compiled_models(self):
+        """
+        Get the compiled forms of the fitted models, compiling them when the
+        model version has changed.
+        
+        Returns:
+            tuple: (classifier, regressor) CompiledForest instances; an entry is
+                None if that model cannot be compiled.
+        """
+        if self._compiled_version != self.model_version:
+            compiled = []
+            for model in (self.classification_model, self.regression_model):
+                try:
+                    compiled.append(CompiledForest.from_sklearn(model))
+                except ValueError:
+                    compiled.append(None)
+            self._compiled = tuple(compiled)
+            self._compiled_version = self.model_version
+        return self._compiled
+    
+    def _check_trained(self):
+        """
+        Check that both models are available for inference.
+        
+        Compiled models are checked first, so models loaded from an artifact
+        are not unpickled just to find out they exist.
+        
+        Raises:
+            ValueError: If the models are not trained.
+        """
+        if None in self._compiled_models() and (
+            self.classification_model is None or self.regression_model is None
+        ):
+            raise ValueError("Models not trained. Call train() first.")
+    
+    @timed('inference')
+    def _predict_models(self, X):
+        """
+        Run both models on a prepared feature matrix.
+        
+        Args:
+            X (np.ndarray): Prepared feature matrix.
+            
+        Returns:
+            tuple: (success probabilities, expected reductions in tons)
+        """
+        classifier, regressor = self._compiled_models()
+        if classifier is None:
+            classifier = self.classification_model
+        if regressor is None:
+            regressor = self.regression_model
+        if classifier is None or regressor is None:
+            raise ValueError("Models not trained. Call train() first.")
+        
+        return classifier.predict_proba(X)[:, 1], regressor.predict(X)
+    
+    def _fit_feature_schema(self, project_data):
+        """
+        Learn the feature layout from project data.
+        
+        Args:
+            project_data (pd.DataFrame): Project data.
+            
+        Returns:
+            dict: Numerical columns, whether project types are encoded, and the
+                vocabulary of each learned categorical column.
+        """
+        schema = {
+            'numerical': [
+                column for column in self.NUMERICAL_FEATURES if column in project_data.columns
+            ],
+            'project_type': 'project_type' in project_data.columns,
+            'categories': {}
+        }
+        
+        for column in self.LEARNED_CATEGORIES:
+            if column in project_data.columns:
+                schema['categories'][column] = [
+                    str(value) for value in pd.unique(project_data[column].dropna())
+                ]
+        
+        return schema
     
-    def _prepare_features(self, project_data):
+    @staticmethod
+    def _one_hot(values, vocabulary, out=None):
+        """
+        One-hot encode values against a fixed vocabulary.
+        
+        Values outside the vocabulary encode as all zeros.
+        
+        Args:
+            values (pd.Series): Categorical values.
+            vocabulary (list): Known categories, in column order.
+            out (np.ndarray, optional): Matrix to write the encoding into.
+            
+        Returns:
+            np.ndarray: Matrix of shape (len(values), len(vocabulary)).
+        """
+        codes = pd.Index(vocabulary).get_indexer(values.astype(str))
+        if out is None:
+            one_hot = np.zeros((len(values), len(vocabulary)))
+        else:
+            one_hot = out
+            one_hot[...] = 0
+        known = np.flatnonzero(codes >= 0)
+        one_hot[known, codes[known]] = 1
+        return one_hot
+    
+    @timed('features')
+    def _prepare_features(self, project_data, fit=False):
         """
         Prepare features for the models.
         
+        The column layout comes from the feature schema learned in train(), so
+        single projects and batches produce compatible matrices. Missing
+        numerical values are imputed with the training mean.
+        
         Args:
             project_data (pd.DataFrame): Project data.
+            fit (bool): Whether to fit the scaler and feature schema on this
+                data. Only training should fit; inference reuses them.
             
         Returns:
             np.ndarray: Prepared feature matrix.
         """
-        # Extract numerical features
-        numerical_features = []
-        
-        # Project size and duration
-        if 'size_hectares' in project_data.columns:
-            numerical_features.append(project_data['size_hectares'].values)
-        if 'duration_years' in project_data.columns:
-            numerical_features.append(project_data['duration_years'].values)
-        
-        # Financial metrics
-        if 'cost_per_ton' in project_data.columns:
-            numerical_features.append(project_data['cost_per_ton'].values)
-        if 'total_investment' in project_data.columns:
-            numerical_features.append(project_data['total_investment'].values)
-        if 'expected_roi' in project_data.columns:
-            numerical_features.append(project_data['expected_roi'].values)
-        
-        # Environmental metrics
-        if 'annual_reduction_tons' in project_data.columns:
-            numerical_features.append(project_data['annual_reduction_tons'].values)
-        if 'total_reduction_tons' in project_data.columns:
-            numerical_features.append(project_data['total_reduction_tons'].values)
-        if 'biodiversity_score' in project_data.columns:
-            numerical_features.append(project_data['biodiversity_score'].values)
-        
-        # Social metrics
-        if 'community_benefit_score' in project_data.columns:
-            numerical_features.append(project_data['community_benefit_score'].values)
-        if 'jobs_created' in project_data.columns:
-            numerical_features.append(project_data['jobs_created'].values)
-        
-        # Risk metrics
-        for risk_factor in self.RISK_FACTORS.keys():
-            if risk_factor in project_data.columns:
-                numerical_features.append(project_data[risk_factor].values)
-        
-        # One-hot encode categorical features
-        categorical_features = []
-        
-        # Project type
-        if 'project_type' in project_data.columns:
-            for project_category, project_types in self.PROJECT_TYPES.items():
-                for project_type in project_types:
-                    categorical_features.append(
-                        (project_data['project_type'] == project_type).astype(int).values
-                    )
+        if fit:
+            self.feature_schema = self._fit_feature_schema(project_data)
+        schema = self.feature_schema or self._fit_feature_schema(project_data)
         
-        # Location features
-        if 'region' in project_data.columns:
-            regions = project_data['region'].unique()
-            for region in regions:
-                categorical_features.append(
-                    (project_data['region'] == region).astype(int).values
-                )
+        if self.feature_cache is None:
+            out = None
+            if self._feature_buffers is not None:
+                out = self._feature_buffers['features'].rows(len(project_data), self._n_features(schema))
+            feature_matrix = self._build_feature_matrix(project_data, schema, out=out)
+        else:
+            # Encoded rows depend only on the schema and the schema's columns
+            columns = [
+                column for column in schema['numerical'] + ['project_type'] + list(schema['categories'])
+                if column in project_data.columns
+            ]
+            feature_matrix = self.feature_cache.get_or_compute(
+                f"ProjectAnalyzer:{np.dtype(self.feature_dtype).name}:" + json.dumps(schema, sort_keys=True),
+                project_data[columns],
+                lambda frame: self._build_feature_matrix(frame, schema),
+                context_rows=0
+            )
         
-        # Verification standard
-        if 'verification_standard' in project_data.columns:
-            standards = project_data['verification_standard'].unique()
-            for standard in standards:
-                categorical_features.append(
-                    (project_data['verification_standard'] == standard).astype(int).values
-                )
+        # Scale features (into the reused buffer on the float32 path); NaNs are
+        # ignored when fitting and imputed with the mean after
+        out = None
+        if self._feature_buffers is not None:
+            out = self._feature_buffers['scaled'].rows(*feature_matrix.shape)
+        feature_matrix = apply_scaler(self.scaler, feature_matrix, fit=fit, out=out)
+        np.nan_to_num(feature_matrix, copy=False)
+        
+        return feature_matrix
+    
+    def _project_types(self):
+        """
+        List all known project subtypes, in one-hot column order.
         
-        # Combine all features
-        all_features = numerical_features + categorical_features
+        Returns:
+            list: Project subtypes.
+        """
+        return [
+            project_type
+            for project_types in self.PROJECT_TYPES.values()
+            for project_type in project_types
+        ]
+    
+    def _n_features(self, schema):
+        """
+        Count the feature columns of a feature schema.
         
-        if not all_features:
+        Args:
+            schema (dict): Feature schema (see _fit_feature_schema).
+            
+        Returns:
+            int: Number of feature columns.
+        """
+        n_features = len(schema['numerical'])
+        if schema['project_type']:
+            n_features += len(self._project_types())
+        return n_features + sum(len(vocabulary) for vocabulary in schema['categories'].values())
+    
+    def _build_feature_matrix(self, project_data, schema, out=None):
+        """
+        Encode project data into the unscaled feature matrix.
+        
+        Args:
+            project_data (pd.DataFrame): Project data.
+            schema (dict): Feature schema (see _fit_feature_schema).
+            out (np.ndarray, optional): Matrix of shape (rows, features) to
+                write the features into, instead of allocating one.
+            
+        Returns:
+            np.ndarray: Unscaled feature matrix; missing numerical values are NaN.
+        """
+        n_features = self._n_features(schema)
+        if n_features == 0:
             raise ValueError("No valid features found in project data")
+        if out is None:
+            out = np.empty((len(project_data), n_features), dtype=self.feature_dtype)
         
-        # Convert to numpy array
-        feature_matrix = np.column_stack(all_features)
+        # Numerical features in one pass; absent columns become NaN
+        start = len(schema['numerical'])
+        if start:
+            out[:, :start] = project_data.reindex(columns=schema['numerical']).to_numpy(dtype=out.dtype)
         
-        # Scale numerical features
-        feature_matrix = self.scaler.fit_transform(feature_matrix)
+        # One-hot encode the project type over all known subtypes, then
+        # location and verification standard, each into its column block
+        categorical = list(schema['categories'].items())
+        if schema['project_type']:
+            categorical.insert(0, ('project_type', self._project_types()))
+        for column, vocabulary in categorical:
+            values = project_data[column] if column in project_data.columns \
+                else pd.Series([None] * len(project_data))
+            self._one_hot(values, vocabulary, out=out[:, start:start + len(vocabulary)])
+            start += len(vocabulary)
         
-        return feature_matrix
+        return out
     
+    @timed('ProjectAnalyzer.train')
     def train(self, training_data):
         """
         Train the project analysis models.
@@ -187,9 +399,11 @@ class ProjectAnalyzer:
         Returns:
             dict: Training results with model performance metrics.
         """
+        from sklearn.model_selection import train_test_split
+        
         try:
             # Prepare features
-            X = self._prepare_features(training_data)
+            X = self._prepare_features(training_data, fit=True)
             
             # Classification target (success/failure)
             if 'success' not in training_data.columns:
@@ -207,14 +421,17 @@ class ProjectAnalyzer:
             )
             
             # Train classification model
-            self.classification_model.fit(X_train, y_class_train)
+            with span('fit'):
+                self.classification_model.fit(X_train, y_class_train)
             class_accuracy = self.classification_model.score(X_test, y_class_test)
             
             # Train regression model
-            self.regression_model.fit(X_train, y_reg_train)
+            with span('fit'):
+                self.regression_model.fit(X_train, y_reg_train)
             reg_predictions = self.regression_model.predict(X_test)
             reg_mse = np.mean((reg_predictions - y_reg_test) ** 2)
             reg_mae = np.mean(np.abs(reg_predictions - y_reg_test))
+            self.model_version += 1
             
             return {
                 'classification_accuracy': class_accuracy,
@@ -231,6 +448,7 @@ class ProjectAnalyzer:
                 'regression_mae': float('inf')
             }
     
+    @timed('ProjectAnalyzer.analyze_project')
     def analyze_project(self, project_data):
         """
         Analyze a carbon reduction project.
@@ -241,18 +459,14 @@ class ProjectAnalyzer:
         Returns:
             dict: Analysis results including success probability and expected carbon reduction.
         """
-        if self.classification_model is None or self.regression_model is None:
-            raise ValueError("Models not trained. Call train() first.")
+        self._check_trained()
         
         try:
             # Prepare features
             X = self._prepare_features(project_data)
             
-            # Predict success probability
-            success_prob = self.classification_model.predict_proba(X)[:, 1]
-            
-            # Predict carbon reduction
-            expected_reduction = self.regression_model.predict(X)
+            # Predict success probability and carbon reduction
+            success_prob, expected_reduction = self._predict_models(X)
             
             # Calculate risk score
             risk_scores = {}
@@ -292,6 +506,105 @@ class ProjectAnalyzer:
                 'expected_reduction_tons': None
             }
     
+    @timed('ProjectAnalyzer.analyze_batch')
+    def analyze_batch(self, projects_data):
+        """
+        Analyze many carbon reduction projects in one vectorized pass.
+        
+        Features are prepared once for all rows, each model is called once on
+        the whole matrix, and risk scores are a weighted product of the risk
+        columns with RISK_FACTORS.
+        
+        If the batch fails, the projects are analyzed one by one, so a bad
+        project only fails its own row: it gets an 'error' message and no
+        scores, as from analyze_project. If no project can be analyzed, the
+        error is not specific to a project and is raised.
+        
+        Args:
+            projects_data (pd.DataFrame): Data for multiple projects with features.
+            
+        Returns:
+            pd.DataFrame: One row of analysis results per project, in input order.
+        """
+        try:
+            results = self._score_projects(projects_data)
+        except Exception as batch_error:
+            if len(projects_data) <= 1:
+                raise
+            
+            rows = []
+            errors = []
+            for i in range(len(projects_data)):
+                try:
+                    rows.append(self._score_projects(projects_data.iloc[[i]]))
+                except Exception as e:
+                    errors.append(e)
+                    rows.append(pd.DataFrame([{
+                        'error': str(e),
+                        'success_probability': None,
+                        'expected_reduction_tons': None
+                    }]))
+            if len(errors) == len(projects_data):
+                raise batch_error
+            
+            results = pd.concat(rows, ignore_index=True)
+            results['error'] = results['error'].astype(object).where(results['error'].notna(), None)
+        
+        # Add project identifiers
+        if 'project_id' in projects_data.columns:
+            results['project_id'] = projects_data['project_id'].to_numpy()
+        else:
+            results['project_id'] = [f"Project_{i}" for i in projects_data.index]
+        
+        for column in ('project_name', 'project_type'):
+            if column in projects_data.columns:
+                results[column] = projects_data[column].to_numpy()
+        
+        return results
+    
+    def _score_projects(self, projects_data):
+        """
+        Score projects with one model call per model.
+        
+        Args:
+            projects_data (pd.DataFrame): Data for one or more projects.
+            
+        Returns:
+            pd.DataFrame: One row of scores per project.
+        """
+        # Prepare features and run both models once for all projects
+        X = self._prepare_features(projects_data)
+        success_prob, expected_reduction = self._predict_models(X)
+        
+        # Risk matrix: one column per risk factor, medium risk where missing
+        n_projects = len(projects_data)
+        risk_names = list(self.RISK_FACTORS.keys())
+        risk_weights = np.array(list(self.RISK_FACTORS.values()))
+        risk_values = np.full((n_projects, len(risk_names)), 0.5)
+        for column, risk_factor in enumerate(risk_names):
+            if risk_factor in projects_data.columns:
+                risk_values[:, column] = projects_data[risk_factor].to_numpy(dtype=float)
+        
+        risk_matrix = risk_values * risk_weights
+        total_risk_score = risk_matrix.sum(axis=1)
+        
+        # Higher risk means lower adjustment
+        adjusted_reduction = expected_reduction * (1 - total_risk_score / 2)
+        
+        if 'cost_per_ton' in projects_data.columns:
+            cost_effectiveness = 1 / projects_data['cost_per_ton'].to_numpy(dtype=float)
+        else:
+            cost_effectiveness = [None] * n_projects
+        
+        return pd.DataFrame({
+            'success_probability': success_prob,
+            'expected_reduction_tons': expected_reduction,
+            'adjusted_reduction_tons': adjusted_reduction,
+            'risk_score': total_risk_score,
+            'risk_breakdown': [dict(zip(risk_names, row)) for row in risk_matrix.tolist()],
+            'cost_effectiveness': cost_effectiveness
+        })
+    
     def compare_projects(self, projects_data):
         """
         Compare multiple carbon reduction projects.
@@ -302,41 +615,14 @@ class ProjectAnalyzer:
         Returns:
             pd.DataFrame: Comparison results for all projects.
         """
-        if self.classification_model is None or self.regression_model is None:
-            raise ValueError("Models not trained. Call train() first.")
+        self._check_trained()
         
         try:
-            results = []
-            
-            for i, project in projects_data.iterrows():
-                # Create a DataFrame for the single project
-                project_df = pd.DataFrame([project])
-                
-                # Analyze the project
-                analysis = self.analyze_project(project_df)
-                
-                # Add project identifier
-                if 'project_id' in project:
-                    analysis['project_id'] = project['project_id']
-                else:
-                    analysis['project_id'] = f"Project_{i}"
-                
-                if 'project_name' in project:
-                    analysis['project_name'] = project['project_name']
-                
-                if 'project_type' in project:
-                    analysis['project_type'] = project['project_type']
-                
-                results.append(analysis)
-            
-            # Convert to DataFrame
-            results_df = pd.DataFrame(results)
+            results_df = self.analyze_batch(projects_data)
             
             # Sort by adjusted reduction (most effective first)
-            if 'adjusted_reduction_tons' in results_df.columns:
-                results_df = results_df.sort_values('adjusted_reduction_tons', ascending=False)
-            
-            return results_df
+            order = np.argsort(-results_df['adjusted_reduction_tons'].to_numpy(), kind='stable')
+            return results_df.iloc[order]
             
         except Exception as e:
             print(f"Error comparing projects: {e}")
@@ -458,29 +744,61 @@ class ProjectAnalyzer:
                 'recommendations': []
             }
     
-    def save_models(self, model_path):
+    def save_models(self, model_path, artifact_format='pickle'):
         """
         Save trained models to files.
         
         Args:
             model_path (str): Path to save the models.
+            artifact_format (str): 'pickle' for one joblib file per model, or
+                'mmap' for an artifact directory with a manifest that worker
+                processes can memory-map (see model_store).
             
         Returns:
             bool: True if saving was successful, False otherwise.
         """
         if self.classification_model is None or self.regression_model is None:
             raise ValueError("Models not trained. Call train() first.")
+        if artifact_format not in ('pickle', 'mmap'):
+            raise ValueError(f"Unknown artifact format: {artifact_format}")
         
         try:
             import joblib
+            import json
             import os
             
+            if artifact_format == 'mmap':
+                # Store the compiled trees next to the pickled models so that
+                # workers can serve predictions from the shared mapped arrays
+                arrays = scaler_arrays(self.scaler)
+                for name, compiled in zip(
+                    ('classification_model', 'regression_model'), self._compiled_models()
+                ):
+                    if compiled is not None:
+                        arrays.update(compiled.to_arrays(name))
+                self.manifest = save_artifact(
+                    model_path,
+                    'ProjectAnalyzer',
+                    arrays=arrays,
+                    objects={
+                        'classification_model': self.classification_model,
+                        'regression_model': self.regression_model
+                    },
+                    model_version=self.model_version,
+                    metadata={'feature_schema': self.feature_schema}
+                )
+                print(f"Models saved to {model_path}")
+                return True
+            
             # Create directory if it doesn't exist
             os.makedirs(model_path, exist_ok=True)
             
             # Save models
             joblib.dump(self.classification_model, f"{model_path}/classification_model.pkl")
             joblib.dump(self.regression_model, f"{model_path}/regression_model.pkl")
+            joblib.dump(self.scaler, f"{model_path}/scaler.pkl")
+            with open(f"{model_path}/feature_schema.json", 'w') as f:
+                json.dump(self.feature_schema, f, indent=4)
             
             print(f"Models saved to {model_path}")
             return True
@@ -0,0 +1,119 @@
+"""
+Feature Scaling Utilities
+
+This module provides the fit-once, transform-many scaler lifecycle shared by
+the AI models. Scalers are fitted during training and persisted with the
+model; inference only applies the precomputed affine transform.
+"""
+
+import numpy as np
+
+
+def is_fitted(scaler):
+    """
+    Check whether a StandardScaler has learned its statistics.
+
+    Args:
+        scaler (StandardScaler): The scaler to check.
+
+    Returns:
+        bool: True if the scaler has been fitted, False otherwise.
+    """
+    return getattr(scaler, "scale_", None) is not None
+
+
+def apply_scaler(scaler, feature_matrix, fit=False, out=None):
+    """
+    Scale a feature matrix, fitting the scaler only when requested.
+
+    When the scaler has not been fitted (e.g. a model artifact saved without
+    scaler statistics), the matrix is scaled by its own statistics, which is
+    the legacy behavior. This fits a throwaway copy of the scaler, so the
+    statistics of one request never leak into the next.
+
+    Args:
+        scaler (StandardScaler): The scaler holding the statistics.
+        feature_matrix (np.ndarray): Unscaled feature matrix.
+        fit (bool): Whether to fit the scaler on this matrix first.
+        out (np.ndarray, optional): Matrix of the same shape to write the
+            scaled features into (in its dtype), instead of allocating one.
+
+    Returns:
+        np.ndarray: Scaled feature matrix.
+    """
+    if not fit and not is_fitted(scaler):
+        from sklearn.base import clone
+
+        scaler = clone(scaler)
+        fit = True
+
+    if fit:
+        if out is None:
+            return scaler.fit_transform(feature_matrix)
+        scaler.fit(feature_matrix)
+
+    if feature_matrix.shape[1] != scaler.mean_.shape[0]:
+        raise ValueError(
+            f"Feature matrix has {feature_matrix.shape[1]} columns, "
+            f"but the scaler was fitted on {scaler.mean_.shape[0]}"
+        )
+
+    # Vectorized affine transform with the stored statistics
+    if out is None:
+        return (feature_matrix - scaler.mean_) / scaler.scale_
+    np.subtract(feature_matrix, scaler.mean_, out=out, casting="same_kind")
+    np.divide(out, scaler.scale_, out=out, casting="same_kind")
+    return out
+
+
+# Fitted StandardScaler attributes stored as flat arrays in model artifacts
+SCALER_ARRAYS = ["mean_", "var_", "scale_"]
+
+
+def scaler_arrays(scaler, prefix="scaler"):
+    """
+    Get the fitted statistics of a StandardScaler as flat arrays.
+
+    Args:
+        scaler (StandardScaler): The scaler to export.
+        prefix (str): Prefix for the array names.
+
+    Returns:
+        dict: Arrays keyed by name, empty if the scaler is not fitted.
+    """
+    if not is_fitted(scaler):
+        return {}
+
+    arrays = {
+        f"{prefix}.{name}": np.asarray(getattr(scaler, name)) for name in SCALER_ARRAYS
+    }
+    arrays[f"{prefix}.n_samples_seen_"] = np.asarray(scaler.n_samples_seen_)
+    return arrays
+
+
+def scaler_from_arrays(arrays, prefix="scaler"):
+    """
+    Rebuild a StandardScaler from arrays exported by scaler_arrays.
+
+    Args:
+        arrays (dict): Arrays keyed by name, e.g. memory-mapped from disk.
+        prefix (str): Prefix of the array names.
+
+    Returns:
+        StandardScaler: The fitted scaler, or an unfitted one if the arrays
+            hold no statistics.
+    """
+    from sklearn.preprocessing import StandardScaler
+
+    scaler = StandardScaler()
+    if f"{prefix}.scale_" not in arrays:
+        return scaler
+
+    for name in SCALER_ARRAYS:
+        setattr(scaler, name, arrays[f"{prefix}.{name}"])
+    n_samples_seen = arrays[f"{prefix}.n_samples_seen_"]
+    scaler.n_samples_seen_ = (
+        n_samples_seen if n_samples_seen.ndim else n_samples_seen.item()
+    )
+    scaler.n_features_in_ = scaler.mean_.shape[0]
+    return scaler
@@ -4,12 +4,15 @@ Tests for the API endpoints.
 
 import unittest
 import json
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from unittest import mock
 from flask import Flask
 import sys
 import os
 
 # Add parent directory to path to import the API
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import api
 from api import app
 
 class TestAPI(unittest.TestCase):
@@ -104,6 +107,123 @@ class TestAPI(unittest.TestCase):
         self.assertIn('error', data)
         self.assertIn('Missing required parameter', data['error'])
     
+    def test_predict_price_days_ahead_validation(self):
+        """Test that the price endpoint rejects horizons it would not serve in time."""
+        for days_ahead in [0, 2.5, '30', 10 ** 6]:
+            payload = dict(self.price_prediction_data, days_ahead=days_ahead)
+            response = self.app.post(
+                '/predict/price',
+                data=json.dumps(payload),
+                content_type='application/json'
+            )
+            data = json.loads(response.data)
+            
+            self.assertEqual(response.status_code, 400, days_ahead)
+            self.assertIn('days_ahead', data['error'])
+    
+    def test_timed_out_request_is_cancelled(self):
+        """Test that a request that times out is cancelled before its batch runs."""
+        future = Future()
+        with mock.patch.object(api, 'INFERENCE_TIMEOUT', 0.01):
+            with self.assertRaises(FutureTimeoutError):
+                api.wait_for(future)
+        self.assertTrue(future.cancelled())
+    
+    def test_predict_price_scenarios_validation(self):
+        """Test that the scenario endpoint rejects invalid requests."""
+        response = self.app.post(
+            '/predict/price/scenarios',
+            data=json.dumps({}),
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        
+        payload = dict(self.price_prediction_data, n_scenarios=10 ** 9)
+        response = self.app.post(
+            '/predict/price/scenarios',
+            data=json.dumps(payload),
+            content_type='application/json'
+        )
+        data = json.loads(response.data)
+        
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('n_scenarios', data['error'])
+        
+        for days_ahead in [0, -5, 2.5, '30', True, 10 ** 6]:
+            payload = dict(self.price_prediction_data, days_ahead=days_ahead)
+            response = self.app.post(
+                '/predict/price/scenarios',
+                data=json.dumps(payload),
+                content_type='application/json'
+            )
+            data = json.loads(response.data)
+            
+            self.assertEqual(response.status_code, 400, days_ahead)
+            self.assertIn('days_ahead', data['error'])
+    
+    def test_cache_stats(self):
+        """Test the forecast cache statistics endpoint."""
+        response = self.app.get('/cache/stats')
+        data = json.loads(response.data)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('hits', data)
+        self.assertIn('misses', data)
+        self.assertIn('size', data)
+    
+    def test_metrics(self):
+        """Test that request metrics are served in the Prometheus text format."""
+        self.app.get('/health')
+        response = self.app.get('/metrics')
+        text = response.get_data(as_text=True)
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('# TYPE carbonsol_http_request_duration_seconds histogram', text)
+        self.assertIn('carbonsol_http_requests_total{endpoint="health_check",method="GET",status="200"}', text)
+    
+    def test_predict_price_from_store(self):
+        """Test that requests without history are served from the forecast store."""
+        import tempfile
+        import pandas as pd
+        import api
+        from forecast_store import ForecastStore
+        
+        with tempfile.TemporaryDirectory() as store_dir:
+            store = ForecastStore(store_dir)
+            store.write(pd.DataFrame({
+                'credit_type': 'CST',
+                'run_at': pd.Timestamp('2023-06-01 12:00', tz='UTC'),
+                'model_version': 3,
+                'day': [1, 2, 3],
+                'date': pd.date_range('2023-06-02', periods=3),
+                'predicted_price': [20.0, 20.5, 21.0]
+            }))
+            
+            previous_store = api.forecast_store
+            api.forecast_store = store
+            try:
+                response = self.app.post(
+                    '/predict/price',
+                    data=json.dumps({'credit_type': 'CST', 'days_ahead': 2}),
+                    content_type='application/json'
+                )
+                too_long = self.app.post(
+                    '/predict/price',
+                    data=json.dumps({'credit_type': 'CST', 'days_ahead': 10}),
+                    content_type='application/json'
+                )
+            finally:
+                api.forecast_store = previous_store
+        
+        data = json.loads(response.data)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['model_version'], 3)
+        self.assertEqual(data['prediction'], [
+            {'date': '2023-06-02', 'predicted_price': 20.0},
+            {'date': '2023-06-03', 'predicted_price': 20.5}
+        ])
+        self.assertEqual(too_long.status_code, 400)
+    
     def test_calculate_footprint(self):
         """Test the carbon footprint calculation endpoint."""
         response = self.app.post(
@@ -0,0 +1,124 @@
+"""
+Tests for the walk-forward backtester.
+"""
+
+import unittest
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+
+# Import the modules to test
+from backtest import (
+    SharedHistory,
+    attach_history,
+    plan_segments,
+    run_backtest,
+    walk_forward_origins,
+)
+from price_prediction import PricePredictor
+
+
+class TestBacktest(unittest.TestCase):
+    """Test cases for the walk-forward backtester."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        rng = np.random.RandomState(3)
+        n = 120
+        self.history = pd.DataFrame(
+            {
+                "date": [datetime(2023, 1, 1) + timedelta(days=i) for i in range(n)],
+                "price": 10 + np.sin(np.arange(n) / 8) + rng.normal(0, 0.05, n),
+                "volume": 1000 + rng.normal(0, 20, n),
+                "credit_type": "VCU",
+            }
+        )
+
+    def test_origins_and_segments(self):
+        """Test that origins leave room for the horizon and segments start at refits."""
+        origins = walk_forward_origins(100, train_size=60, horizon=10, step=5)
+
+        self.assertEqual(origins, [60, 65, 70, 75, 80, 85, 90])
+        self.assertEqual(
+            plan_segments(origins, refit_every=15), [[60, 65, 70], [75, 80, 85], [90]]
+        )
+        self.assertEqual(plan_segments(origins), [origins])
+        with self.assertRaises(ValueError):
+            walk_forward_origins(100, train_size=1)
+
+    def test_shared_history_roundtrip(self):
+        """Test that attached arrays see the shared history without the text columns."""
+        with SharedHistory(self.history) as shared:
+            attached = attach_history(shared.spec)
+
+            self.assertEqual(attached["columns"], ["price", "volume"])
+            np.testing.assert_array_equal(
+                attached["values"][:, 0], self.history["price"].values
+            )
+            self.assertEqual(
+                pd.Timestamp(attached["dates"][5]), self.history["date"][5]
+            )
+
+            del attached["dates"], attached["values"]
+            for block in attached["blocks"]:
+                block.close()
+
+    def test_backtest_matches_sequential_forecasts(self):
+        """Test that the parallel backtest scores the same forecasts as fitting each segment directly."""
+        result = run_backtest(
+            self.history,
+            train_size=60,
+            horizons=(1, 5),
+            step=10,
+            window=50,
+            refit_every=20,
+            max_workers=2,
+        )
+
+        self.assertEqual(result["folds"], 6)
+        self.assertEqual(result["refits"], 3)
+        self.assertEqual(list(result["scores"]["horizon"]), [1, 5])
+        self.assertEqual(list(result["scores"]["n"]), [6, 6])
+
+        history = self.history.drop(columns=["credit_type"])
+        forecasts = result["forecasts"].set_index(["origin", "horizon"])
+        for segment in [[60, 70], [80, 90], [100, 110]]:
+            predictor = PricePredictor()
+            predictor.train(
+                history.iloc[segment[0] - 50 : segment[0]].reset_index(drop=True)
+            )
+            for origin in segment:
+                expected = predictor.predict(
+                    history.iloc[origin - 50 : origin].reset_index(drop=True),
+                    days_ahead=5,
+                )
+                for horizon in [1, 5]:
+                    row = forecasts.loc[(origin, horizon)]
+                    self.assertAlmostEqual(
+                        row["predicted"], expected["predicted_price"].iloc[horizon - 1]
+                    )
+                    self.assertAlmostEqual(
+                        row["actual"], history["price"].iloc[origin + horizon - 1]
+                    )
+
+    def test_warm_start_updates_between_refits(self):
+        """Test that warm-started folds are marked as updates."""
+        result = run_backtest(
+            self.history,
+            train_size=60,
+            horizons=(1,),
+            step=10,
+            refit_every=30,
+            warm_start=True,
+            update_params={"n_new_trees": 5},
+            max_workers=2,
+        )
+
+        fits = result["forecasts"].sort_values("origin")["fit"].tolist()
+        self.assertEqual(
+            fits, ["refit", "update", "update", "refit", "update", "update"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Tests for the micro-batching inference layer.
+"""
+
+import threading
+import unittest
+
+# Import the module to test
+from batching import MicroBatcher, QueueFullError
+
+
+class TestMicroBatcher(unittest.TestCase):
+    """Test cases for the MicroBatcher class."""
+
+    def test_concurrent_requests_are_batched(self):
+        """Test that queued requests are dispatched together."""
+        batch_sizes = []
+
+        def double(items):
+            batch_sizes.append(len(items))
+            return [item * 2 for item in items]
+
+        batcher = MicroBatcher(double, max_batch_size=8, max_wait_ms=200)
+        futures = [batcher.submit(i) for i in range(8)]
+
+        self.assertEqual(
+            [future.result(timeout=5) for future in futures], list(range(0, 16, 2))
+        )
+        self.assertEqual(batch_sizes, [8])
+        self.assertEqual(batcher.stats()["largest_batch"], 8)
+        batcher.stop()
+
+    def test_max_batch_size(self):
+        """Test that batches never exceed the maximum size."""
+        batch_sizes = []
+
+        def identity(items):
+            batch_sizes.append(len(items))
+            return items
+
+        batcher = MicroBatcher(identity, max_batch_size=3, max_wait_ms=50)
+        futures = [batcher.submit(i) for i in range(10)]
+
+        self.assertEqual(
+            [future.result(timeout=5) for future in futures], list(range(10))
+        )
+        self.assertTrue(all(size <= 3 for size in batch_sizes))
+        batcher.stop()
+
+    def test_failing_request_is_isolated(self):
+        """Test that one bad request only fails its own future."""
+
+        def invert(items):
+            return [1 / item for item in items]
+
+        batcher = MicroBatcher(invert, max_batch_size=4, max_wait_ms=200)
+        futures = [batcher.submit(item) for item in [1, 0, 2, 4]]
+
+        self.assertEqual(futures[0].result(timeout=5), 1.0)
+        with self.assertRaises(ZeroDivisionError):
+            futures[1].result(timeout=5)
+        self.assertEqual(futures[2].result(timeout=5), 0.5)
+        self.assertEqual(futures[3].result(timeout=5), 0.25)
+        batcher.stop()
+
+    def test_backpressure(self):
+        """Test that a full queue rejects new requests."""
+        release = threading.Event()
+
+        def blocking(items):
+            release.wait(5)
+            return items
+
+        batcher = MicroBatcher(
+            blocking, max_batch_size=1, max_wait_ms=0, max_queue_size=2
+        )
+        first = batcher.submit(0)
+
+        # Wait until the worker holds the first request, leaving the queue empty
+        while batcher.stats()["pending"]:
+            pass
+        batcher.submit(1)
+        batcher.submit(2)
+        with self.assertRaises(QueueFullError):
+            batcher.submit(3)
+        self.assertEqual(batcher.stats()["rejected"], 1)
+
+        release.set()
+        self.assertEqual(first.result(timeout=5), 0)
+        batcher.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
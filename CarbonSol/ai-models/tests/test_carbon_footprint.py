@@ -97,5 +97,111 @@ class TestCarbonFootprintCalculator(unittest.TestCase):
             self.assertIn('description', rec)
             self.assertIn('potential_savings', rec)
 
+    def test_batch_matches_scalar(self):
+        """Test that batch results match the scalar calculation exactly."""
+        import numpy as np
+        import pandas as pd
+        
+        rng = np.random.RandomState(0)
+        input_names = [name for name, _, _ in self.calculator.ACTIVITIES]
+        batch = pd.DataFrame(rng.uniform(0, 5000, (50, len(input_names))), columns=input_names)
+        batch = pd.concat([batch, pd.DataFrame([self.individual_data, self.business_data, {}])],
+                          ignore_index=True)
+        
+        result = self.calculator.calculate_batch(batch, detailed=True)
+        
+        self.assertEqual(len(result), len(batch))
+        for i, row in batch.iterrows():
+            expected = self.calculator.calculate_total_footprint(**row.dropna().to_dict())
+            self.assertEqual(result.loc[i, 'total_kg'], expected['total_kg'])
+            self.assertEqual(result.loc[i, 'total_tons'], expected['total_tons'])
+            for category, breakdown in expected['categories'].items():
+                self.assertEqual(result.loc[i, category], breakdown['total'])
+                for factor, value in breakdown.items():
+                    if factor != 'total':
+                        self.assertEqual(result.loc[i, factor], value)
+    
+    def test_batch_column_arrays(self):
+        """Test batch calculation from a dict of column arrays."""
+        result = self.calculator.calculate_batch({
+            'electricity_kwh': [100, 200],
+            'beef_kg': [1, 0]
+        })
+        
+        self.assertEqual(list(result['energy']), [100 * 0.233, 200 * 0.233])
+        self.assertEqual(list(result['food']), [27.0, 0.0])
+        self.assertEqual(list(result['transportation']), [0.0, 0.0])
+    
+    def test_factor_sets_are_shared(self):
+        """Test that calculators share compiled, read-only factor vectors."""
+        other = CarbonFootprintCalculator()
+        self.assertIs(self.calculator.factors, other.factors)
+        self.assertFalse(self.calculator.factors.vector.flags.writeable)
+        
+        custom = CarbonFootprintCalculator(custom_factors={'electricity': 0.5})
+        same_custom = CarbonFootprintCalculator(custom_factors={'electricity': 0.5})
+        self.assertIs(custom.factors, same_custom.factors)
+    
+    def test_custom_factor_overlay(self):
+        """Test that custom factors override only their own entries."""
+        custom = CarbonFootprintCalculator(custom_factors={'electricity': 0.5})
+        
+        self.assertEqual(custom.calculate_energy_emissions(electricity_kwh=100)['electricity'], 50.0)
+        self.assertEqual(custom.emission_factors['beef'], self.calculator.EMISSION_FACTORS['beef'])
+        self.assertEqual(self.calculator.emission_factors['electricity'], 0.233)
+        
+        batch = custom.calculate_batch({'electricity_kwh': [100]})
+        self.assertEqual(batch['energy'].iloc[0], 50.0)
+    
+    def test_named_factor_set(self):
+        """Test registering and using a named factor set."""
+        CarbonFootprintCalculator.factor_registry.register('test_country', {'electricity': 0.1})
+        
+        calculator = CarbonFootprintCalculator(factor_set='test_country')
+        self.assertEqual(calculator.emission_factors['electricity'], 0.1)
+        
+        layered = CarbonFootprintCalculator(factor_set='test_country', custom_factors={'beef': 20.0})
+        self.assertEqual(layered.emission_factors['electricity'], 0.1)
+        self.assertEqual(layered.emission_factors['beef'], 20.0)
+    
+    def test_reregistered_factor_set(self):
+        """Test that overlays of a re-registered factor set use its new factors."""
+        registry = CarbonFootprintCalculator.factor_registry
+        registry.register('test_region', {'electricity': 0.1})
+        layered = CarbonFootprintCalculator(factor_set='test_region', custom_factors={'beef': 20.0})
+        self.assertEqual(layered.emission_factors['electricity'], 0.1)
+        
+        registry.register('test_region', {'electricity': 0.3})
+        
+        layered = CarbonFootprintCalculator(factor_set='test_region', custom_factors={'beef': 20.0})
+        self.assertEqual(layered.emission_factors['electricity'], 0.3)
+        self.assertEqual(layered.emission_factors['beef'], 20.0)
+    
+    def test_assign_emission_factors(self):
+        """Test that emission factors are read-only and recompiled when assigned."""
+        with self.assertRaises(TypeError):
+            self.calculator.emission_factors['electricity'] = 0.5
+        
+        self.calculator.emission_factors = {'electricity': 0.5}
+        
+        self.assertEqual(self.calculator.emission_factors['electricity'], 0.5)
+        self.assertEqual(self.calculator.emission_factors['beef'], self.calculator.EMISSION_FACTORS['beef'])
+        self.assertEqual(self.calculator.calculate_energy_emissions(electricity_kwh=100)['electricity'], 50.0)
+        self.assertEqual(CarbonFootprintCalculator().emission_factors['electricity'], 0.233)
+        
+        # Assigned factors are overlaid on the calculator's factor set
+        CarbonFootprintCalculator.factor_registry.register('test_tenant', {'electricity': 0.1})
+        calculator = CarbonFootprintCalculator(factor_set='test_tenant')
+        calculator.emission_factors = {'beef': 20.0}
+        self.assertEqual(calculator.emission_factors['electricity'], 0.1)
+        self.assertEqual(calculator.emission_factors['beef'], 20.0)
+    
+    def test_unknown_custom_factor(self):
+        """Test that unknown factor names are rejected."""
+        with self.assertRaises(ValueError):
+            CarbonFootprintCalculator(custom_factors={'unobtainium': 1.0})
+        with self.assertRaises(ValueError):
+            CarbonFootprintCalculator(factor_set='no_such_set')
+    
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
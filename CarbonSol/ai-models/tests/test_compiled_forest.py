@@ -0,0 +1,172 @@
+"""
+Tests for compiled tree-ensemble inference.
+"""
+
+import unittest
+import os
+import tempfile
+import numpy as np
+from sklearn.ensemble import (
+    GradientBoostingRegressor,
+    RandomForestClassifier,
+    RandomForestRegressor,
+)
+
+# Import the modules to test
+from compiled_forest import CompiledForest
+from model_store import Deferred, load_artifact, save_artifact
+from price_prediction import PricePredictor
+
+
+class TestCompiledForest(unittest.TestCase):
+    """Test cases for parity between compiled and sklearn predictions."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        rng = np.random.RandomState(0)
+        self.X = rng.normal(size=(500, 6))
+        self.y = 2 * self.X[:, 0] + np.sin(3 * self.X[:, 1]) + rng.normal(0, 0.1, 500)
+        self.X_test = rng.normal(size=(200, 6))
+
+    def test_random_forest_regressor(self):
+        """Test parity with RandomForestRegressor.predict."""
+        model = RandomForestRegressor(
+            n_estimators=30, max_depth=8, random_state=42
+        ).fit(self.X, self.y)
+        compiled = CompiledForest.from_sklearn(model)
+
+        np.testing.assert_allclose(
+            compiled.predict(self.X_test), model.predict(self.X_test), rtol=1e-12
+        )
+        np.testing.assert_allclose(
+            compiled.predict(self.X_test[:1]),
+            model.predict(self.X_test[:1]),
+            rtol=1e-12,
+        )
+
+    def test_per_tree_predictions(self):
+        """Test that per-tree predictions match the individual sklearn trees."""
+        model = RandomForestRegressor(
+            n_estimators=20, max_depth=8, random_state=42
+        ).fit(self.X, self.y)
+        compiled = CompiledForest.from_sklearn(model)
+        expected = np.column_stack(
+            [tree.predict(self.X_test) for tree in model.estimators_]
+        )
+        trees = np.arange(len(self.X_test)) % 20
+
+        np.testing.assert_allclose(
+            compiled.predict_trees(self.X_test), expected, rtol=1e-12
+        )
+        np.testing.assert_allclose(
+            compiled.predict_trees(self.X_test, trees),
+            expected[np.arange(len(self.X_test)), trees],
+            rtol=1e-12,
+        )
+        with self.assertRaises(ValueError):
+            boosting = GradientBoostingRegressor(n_estimators=5).fit(self.X, self.y)
+            CompiledForest.from_sklearn(boosting).predict_trees(self.X_test)
+
+    def test_gradient_boosting_regressor(self):
+        """Test parity with GradientBoostingRegressor.predict."""
+        model = GradientBoostingRegressor(
+            n_estimators=40, max_depth=4, random_state=42
+        ).fit(self.X, self.y)
+        compiled = CompiledForest.from_sklearn(model)
+
+        np.testing.assert_allclose(
+            compiled.predict(self.X_test), model.predict(self.X_test), rtol=1e-12
+        )
+
+    def test_random_forest_classifier(self):
+        """Test parity with RandomForestClassifier.predict_proba and predict."""
+        labels = (self.y > 0).astype(int)
+        model = RandomForestClassifier(
+            n_estimators=30, max_depth=8, random_state=42
+        ).fit(self.X, labels)
+        compiled = CompiledForest.from_sklearn(model)
+
+        np.testing.assert_allclose(
+            compiled.predict_proba(self.X_test),
+            model.predict_proba(self.X_test),
+            atol=1e-12,
+        )
+        np.testing.assert_array_equal(
+            compiled.predict(self.X_test), model.predict(self.X_test)
+        )
+
+    def test_unfitted_model(self):
+        """Test that unfitted models are rejected."""
+        with self.assertRaises(ValueError):
+            CompiledForest.from_sklearn(RandomForestRegressor())
+
+    def test_feature_width(self):
+        """Test that inputs must be as wide as the fitting data, as in sklearn."""
+        # A constant last column is never split on
+        X = np.column_stack([self.X, np.ones(len(self.X))])
+        model = RandomForestRegressor(n_estimators=5, max_depth=4, random_state=42).fit(
+            X, self.y
+        )
+        compiled = CompiledForest.from_sklearn(model)
+        self.assertEqual(compiled.n_features, 7)
+
+        for width in [6, 8]:
+            with self.assertRaises(ValueError):
+                compiled.predict(np.ones((3, width)))
+
+        restored = CompiledForest.from_arrays(compiled.to_arrays("model"), "model")
+        self.assertEqual(restored.n_features, 7)
+        with self.assertRaises(ValueError):
+            restored.predict(self.X_test)
+
+    def test_arrays_roundtrip(self):
+        """Test that compiled trees evaluate from memory-mapped artifact arrays."""
+        model = RandomForestRegressor(
+            n_estimators=10, max_depth=6, random_state=42
+        ).fit(self.X, self.y)
+        compiled = CompiledForest.from_sklearn(model)
+
+        with tempfile.TemporaryDirectory() as artifact_dir:
+            save_artifact(artifact_dir, "Example", compiled.to_arrays("model"))
+            arrays, _, _ = load_artifact(artifact_dir)
+            restored = CompiledForest.from_arrays(arrays, "model")
+
+            self.assertIsInstance(restored.threshold, np.memmap)
+            np.testing.assert_array_equal(
+                restored.predict(self.X_test), compiled.predict(self.X_test)
+            )
+
+        self.assertIsNone(CompiledForest.from_arrays({}, "model"))
+
+    def test_predictor_serves_from_artifact(self):
+        """Test that a loaded artifact predicts without unpickling the forest."""
+        import pandas as pd
+        from datetime import datetime, timedelta
+
+        n = 80
+        history = pd.DataFrame(
+            {
+                "date": [datetime(2023, 1, 1) + timedelta(days=i) for i in range(n)],
+                "price": 10 + np.sin(np.arange(n) / 5) + np.arange(n) * 0.02,
+                "volume": 1000 + np.arange(n) % 7 * 10,
+            }
+        )
+        predictor = PricePredictor()
+        predictor.train(history)
+        expected = predictor.predict(history, days_ahead=5)["predicted_price"].values
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model_dir = os.path.join(tmp_dir, "price_model")
+            predictor.save_model(model_dir, artifact_format="mmap")
+            loaded = PricePredictor(model_path=model_dir)
+            result = loaded.predict(history, days_ahead=5)["predicted_price"].values
+
+            self.assertIsInstance(loaded.__dict__["_model"], Deferred)
+            np.testing.assert_array_equal(result, expected)
+
+            # The sklearn model is still available on first access
+            self.assertIsInstance(loaded.model, RandomForestRegressor)
+
+
+if __name__ == "__main__":
+    unittest.main()
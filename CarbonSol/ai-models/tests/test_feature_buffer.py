@@ -0,0 +1,90 @@
+"""
+Tests for the reusable feature buffers and the float32 feature path.
+"""
+
+import unittest
+import numpy as np
+import pandas as pd
+
+# Import the modules to test
+from feature_buffer import FeatureBuffer, feature_dtype
+from price_prediction import PricePredictor
+from project_analyzer import ProjectAnalyzer
+
+
+class TestFeatureBuffer(unittest.TestCase):
+    """Test cases for the FeatureBuffer class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        rng = np.random.RandomState(3)
+        n = 200
+        self.history = pd.DataFrame(
+            {
+                "date": pd.date_range("2023-01-01", periods=n),
+                "price": 10 + np.cumsum(rng.normal(0, 0.2, n)),
+                "volume": rng.randint(500, 5000, n).astype(float),
+            }
+        )
+
+    def test_feature_dtype(self):
+        """Test that only float64 and float32 are accepted."""
+        self.assertEqual(feature_dtype("float32"), np.float32)
+        self.assertEqual(feature_dtype(np.float64), np.float64)
+        with self.assertRaises(ValueError):
+            feature_dtype("int32")
+        with self.assertRaises(ValueError):
+            PricePredictor(feature_dtype="float16")
+
+    def test_rows_reuses_allocation(self):
+        """Test that smaller matrices reuse the buffer and larger ones grow it."""
+        buffer = FeatureBuffer(growth=2)
+        first = buffer.rows(100, 4)
+        smaller = buffer.rows(50, 4)
+
+        self.assertEqual(first.dtype, np.float32)
+        self.assertTrue(smaller.flags.c_contiguous)
+        self.assertEqual(smaller.shape, (50, 4))
+        self.assertTrue(np.shares_memory(first, smaller))
+
+        buffer.rows(120, 4)
+        self.assertEqual(buffer.nbytes, 200 * 4 * 4)
+        buffer.rows(10, 3)
+        self.assertEqual(buffer.nbytes, 10 * 3 * 4)
+
+    def test_price_predictor_float32(self):
+        """Test that the float32 path trains on float32 features and matches float64."""
+        single = PricePredictor(feature_dtype="float32")
+        double = PricePredictor()
+        self.assertTrue(single.train(self.history.iloc[:150]))
+        self.assertTrue(double.train(self.history.iloc[:150]))
+
+        X, _ = single._training_arrays(self.history.iloc[:150])
+        self.assertEqual(X.dtype, np.float32)
+        self.assertTrue(X.flags.c_contiguous)
+        np.testing.assert_allclose(
+            single.predict(self.history, days_ahead=5)["predicted_price"].values,
+            double.predict(self.history, days_ahead=5)["predicted_price"].values,
+            rtol=1e-3,
+        )
+
+    def test_project_analyzer_float32(self):
+        """Test that the analyzer's float32 features match float64."""
+        projects = pd.DataFrame(
+            {
+                "project_type": ["solar", "wind", "reforestation"],
+                "region": ["Asia", "Europe", "Asia"],
+                "size_hectares": [100.0, None, 300.0],
+            }
+        )
+        single = ProjectAnalyzer(feature_dtype="float32")._prepare_features(
+            projects, fit=True
+        )
+        double = ProjectAnalyzer()._prepare_features(projects, fit=True)
+
+        self.assertEqual(single.dtype, np.float32)
+        np.testing.assert_allclose(single, double, rtol=1e-5, atol=1e-6)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+"""
+Tests for the feature matrix cache.
+"""
+
+import unittest
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Import the modules to test
+from feature_cache import FeatureCache, frame_fingerprint
+from price_prediction import PricePredictor
+from project_analyzer import ProjectAnalyzer
+
+
+class TestFeatureCache(unittest.TestCase):
+    """Test cases for the FeatureCache class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        rng = np.random.RandomState(11)
+        n = 200
+        self.history = pd.DataFrame(
+            {
+                "date": pd.date_range("2023-01-01", periods=n),
+                "price": 10 + np.cumsum(rng.normal(0, 0.2, n)),
+                "volume": rng.randint(500, 5000, n).astype(float),
+            }
+        )
+        self.cache = FeatureCache(max_entries=2)
+        self.calls = []
+
+    def compute(self, frame):
+        """Feature builder that records the rows it was called with."""
+        self.calls.append(len(frame))
+        return np.column_stack(
+            [frame["price"].values, frame["price"].rolling(3).mean().fillna(0).values]
+        )
+
+    def test_fingerprint_depends_on_content(self):
+        """Test that fingerprints ignore the index but not values or columns."""
+        frame = self.history[["price", "volume"]]
+        changed = frame.copy()
+        changed.loc[5, "price"] += 1
+
+        self.assertEqual(
+            frame_fingerprint(frame), frame_fingerprint(frame.reset_index(drop=True))
+        )
+        self.assertNotEqual(frame_fingerprint(frame), frame_fingerprint(changed))
+        self.assertNotEqual(
+            frame_fingerprint(frame), frame_fingerprint(frame[["price"]])
+        )
+
+    def test_hit_returns_cached_matrix(self):
+        """Test that a repeated frame is served from memory as a read-only matrix."""
+        first = self.cache.get_or_compute("test", self.history[["price"]], self.compute)
+        second = self.cache.get_or_compute(
+            "test", self.history[["price"]].copy(), self.compute
+        )
+
+        self.assertIs(first, second)
+        self.assertFalse(second.flags.writeable)
+        self.assertEqual(self.calls, [200])
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+        self.cache.get_or_compute("other", self.history[["price"]], self.compute)
+        self.assertEqual(self.calls, [200, 200])
+
+    def test_appended_rows_extend_matrix(self):
+        """Test that appending rows only computes the new rows and their context."""
+        self.cache.get_or_compute(
+            "test", self.history[["price"]].iloc[:150], self.compute, context_rows=2
+        )
+        extended = self.cache.get_or_compute(
+            "test", self.history[["price"]], self.compute, context_rows=2
+        )
+
+        self.assertEqual(self.calls, [150, 52])
+        np.testing.assert_allclose(extended, self.compute(self.history[["price"]]))
+        stats = self.cache.stats()
+        self.assertEqual(stats["extensions"], 1)
+        self.assertEqual(stats["size"], 1)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used matrix is evicted."""
+        frames = [self.history[["price"]].iloc[i : i + 50] for i in range(3)]
+        for frame in frames:
+            self.cache.get_or_compute("test", frame, self.compute)
+        self.cache.get_or_compute("test", frames[0], self.compute)
+
+        self.assertEqual(self.calls, [50, 50, 50, 50])
+        self.assertEqual(self.cache.stats()["evictions"], 2)
+
+    def test_disk_cache(self):
+        """Test that matrices written to disk are reused by a new cache."""
+        with tempfile.TemporaryDirectory() as cache_dir:
+            FeatureCache(cache_dir=cache_dir).get_or_compute(
+                "test", self.history[["price"]], self.compute
+            )
+            cache = FeatureCache(cache_dir=cache_dir)
+            matrix = cache.get_or_compute("test", self.history[["price"]], self.compute)
+
+            self.assertEqual(self.calls, [200])
+            self.assertEqual(cache.stats()["disk_hits"], 1)
+            np.testing.assert_array_equal(matrix, self.compute(self.history[["price"]]))
+
+    def test_predictors_match_uncached(self):
+        """Test that models using the cache compute the same features and forecasts."""
+        cached = PricePredictor(feature_cache=FeatureCache())
+        plain = PricePredictor()
+        self.assertTrue(cached.train(self.history.iloc[:150]))
+        self.assertTrue(plain.train(self.history.iloc[:150]))
+
+        np.testing.assert_allclose(
+            cached.predict(self.history, days_ahead=5)["predicted_price"].values,
+            plain.predict(self.history, days_ahead=5)["predicted_price"].values,
+        )
+        self.assertEqual(cached.feature_cache.stats()["extensions"], 1)
+
+        projects = pd.DataFrame(
+            {
+                "project_type": ["solar", "wind", "reforestation"],
+                "region": ["Asia", "Europe", "Asia"],
+                "size_hectares": [100.0, None, 300.0],
+            }
+        )
+        cached_analyzer = ProjectAnalyzer(feature_cache=FeatureCache())
+        plain_analyzer = ProjectAnalyzer()
+        np.testing.assert_array_equal(
+            cached_analyzer._prepare_features(projects, fit=True),
+            plain_analyzer._prepare_features(projects, fit=True),
+        )
+
+    def test_dtypes_do_not_share_entries(self):
+        """Test that float32 and float64 models sharing a cache each get their own matrices."""
+        cache = FeatureCache()
+        single = PricePredictor(feature_cache=cache, feature_dtype="float32")
+        double = PricePredictor(feature_cache=cache)
+        self.assertEqual(single._build_feature_matrix(self.history).dtype, np.float32)
+        self.assertEqual(double._build_feature_matrix(self.history).dtype, np.float64)
+        self.assertEqual(single._build_feature_matrix(self.history).dtype, np.float32)
+
+        projects = pd.DataFrame(
+            {"project_type": ["solar", "wind"], "size_hectares": [100.0, 200.0]}
+        )
+        single = ProjectAnalyzer(feature_cache=cache, feature_dtype="float32")
+        double = ProjectAnalyzer(feature_cache=cache)
+        single.feature_schema = double.feature_schema = single._fit_feature_schema(
+            projects
+        )
+        self.assertEqual(single._prepare_features(projects).dtype, np.float32)
+        self.assertEqual(double._prepare_features(projects).dtype, np.float64)
+
+
+if __name__ == "__main__":
+    unittest.main()
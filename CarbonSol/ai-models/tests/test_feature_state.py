@@ -0,0 +1,177 @@
+"""
+Tests for the streaming feature state.
+"""
+
+import unittest
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from sklearn.preprocessing import StandardScaler
+
+# Import the modules to test
+from feature_state import RollingWindow, PriceFeatureState
+from price_prediction import PricePredictor
+
+
+class TestRollingWindow(unittest.TestCase):
+    """Test cases for the RollingWindow class."""
+
+    def test_matches_pandas_rolling(self):
+        """Test that the running statistics match pandas rolling windows."""
+        values = 1000 + np.cumsum(np.random.RandomState(0).normal(0, 1, 200))
+        series = pd.Series(values)
+        window = RollingWindow(7)
+
+        expected_mean = series.rolling(7).mean().values
+        expected_std = series.rolling(7).std().values
+        for i, value in enumerate(values):
+            window.push(value)
+            if i < 6:
+                self.assertTrue(np.isnan(window.mean()))
+                self.assertTrue(np.isnan(window.std()))
+            else:
+                self.assertAlmostEqual(window.mean(), expected_mean[i], places=9)
+                self.assertAlmostEqual(window.std(), expected_std[i], places=9)
+
+    def test_recovers_from_nan(self):
+        """Test that a NaN, also the first value, only affects the windows holding it."""
+        values = 1000 + np.cumsum(np.random.RandomState(1).normal(0, 1, 40))
+        values[[0, 12, 13]] = np.nan
+        series = pd.Series(values)
+        window = RollingWindow(7)
+
+        expected_mean = series.rolling(7).mean().values
+        expected_std = series.rolling(7).std().values
+        for i, value in enumerate(values):
+            window.push(value)
+            np.testing.assert_allclose(window.mean(), expected_mean[i], rtol=1e-12)
+            np.testing.assert_allclose(window.std(), expected_std[i], rtol=1e-9)
+        self.assertFalse(np.isnan(window.mean()))
+
+
+class TestPriceFeatureState(unittest.TestCase):
+    """Test cases for the PriceFeatureState class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        rng = np.random.RandomState(42)
+        n = 120
+        self.sample_data = pd.DataFrame(
+            {
+                "date": [datetime(2023, 1, 1) + timedelta(days=i) for i in range(n)],
+                "price": 10
+                + np.arange(n) * 0.05
+                + np.sin(np.arange(n) / 10)
+                + rng.normal(0, 0.1, n),
+                "volume": 1000 + rng.normal(0, 50, n),
+                "sentiment": rng.uniform(-1, 1, n),
+            }
+        )
+        self.predictor = PricePredictor()
+        self.predictor.train(self.sample_data)
+
+    def _reference_predict(self, historical_data, days_ahead):
+        """Forecast by re-preparing features on the full history every step."""
+        data = historical_data.copy()
+        X = self.predictor._prepare_features(data)
+        last_date = data["date"].iloc[-1]
+        predictions = []
+        for i in range(days_ahead):
+            next_price = self.predictor.model.predict([X[-1]])[0]
+            predictions.append(next_price)
+            new_row = pd.DataFrame(
+                {
+                    "date": [last_date + timedelta(days=i + 1)],
+                    "price": [next_price],
+                    "volume": [data["volume"].mean()],
+                    "sentiment": [data["sentiment"].mean()],
+                }
+            )
+            data = pd.concat([data, new_row], ignore_index=True)
+            X = self.predictor._prepare_features(data)
+        return np.array(predictions)
+
+    def test_feature_rows_match_full_recompute(self):
+        """Test that appended feature rows match recomputing the whole frame."""
+        data = self.sample_data.copy()
+        state = PriceFeatureState(
+            data,
+            self.predictor._build_feature_matrix(data),
+            scaler=self.predictor.scaler,
+        )
+
+        for price in [11.0, 11.5, 10.8]:
+            state.append(price)
+            data = pd.concat(
+                [
+                    data,
+                    pd.DataFrame(
+                        {
+                            "date": [data["date"].iloc[-1] + timedelta(days=1)],
+                            "price": [price],
+                            "volume": [data["volume"].mean()],
+                            "sentiment": [data["sentiment"].mean()],
+                        }
+                    ),
+                ],
+                ignore_index=True,
+            )
+            expected = self.predictor._prepare_features(data)[-1]
+            np.testing.assert_allclose(
+                state.current_features()[0], expected, rtol=1e-9, atol=1e-9
+            )
+
+    def test_running_stats_match_refit(self):
+        """Test that without a fitted scaler the rows match refitting every step."""
+        data = self.sample_data.copy()
+        state = PriceFeatureState(data, self.predictor._build_feature_matrix(data))
+
+        for price in [11.0, 11.5, 10.8]:
+            state.append(price)
+            data = pd.concat(
+                [
+                    data,
+                    pd.DataFrame(
+                        {
+                            "date": [data["date"].iloc[-1] + timedelta(days=1)],
+                            "price": [price],
+                            "volume": [data["volume"].mean()],
+                            "sentiment": [data["sentiment"].mean()],
+                        }
+                    ),
+                ],
+                ignore_index=True,
+            )
+            expected = StandardScaler().fit_transform(
+                self.predictor._build_feature_matrix(data)
+            )[-1]
+            np.testing.assert_allclose(
+                state.current_features()[0], expected, rtol=1e-9, atol=1e-9
+            )
+
+    def test_predict_matches_reference(self):
+        """Test that predict produces the same forecast as the full recompute."""
+        result = self.predictor.predict(self.sample_data, days_ahead=40)
+        expected = self._reference_predict(self.sample_data, 40)
+
+        self.assertEqual(len(result), 40)
+        np.testing.assert_allclose(
+            result["predicted_price"].values, expected, rtol=1e-9
+        )
+
+    def test_predict_with_missing_values_matches_reference(self):
+        """Test that a missing price and volume in the last rows do not derail the forecast."""
+        data = self.sample_data.copy()
+        data.loc[len(data) - 5, "price"] = np.nan
+        data.loc[len(data) - 3, "volume"] = np.nan
+
+        result = self.predictor.predict(data, days_ahead=40)
+        expected = self._reference_predict(data, 40)
+
+        np.testing.assert_allclose(
+            result["predicted_price"].values, expected, rtol=1e-9
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
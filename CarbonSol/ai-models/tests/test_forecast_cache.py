@@ -0,0 +1,105 @@
+"""
+Tests for the forecast result cache.
+"""
+
+import unittest
+
+# Import the module to test
+from forecast_cache import ForecastCache
+
+
+class FakeClock:
+    """Manually advanced clock for TTL tests."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestForecastCache(unittest.TestCase):
+    """Test cases for the ForecastCache class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.clock = FakeClock()
+        self.cache = ForecastCache(max_entries=2, ttl_seconds=60, clock=self.clock)
+        self.forecast = {
+            "dates": [f"2024-01-{day:02d}" for day in range(1, 31)],
+            "prices": [10.0 + day for day in range(30)],
+            "token": "CST",
+        }
+        self.key = ForecastCache.make_key(
+            token="CST", last_date="2023-12-31", model_version=1
+        )
+
+    def test_key_depends_on_inputs(self):
+        """Test that keys are stable and differ when any input changes."""
+        self.assertEqual(
+            self.key,
+            ForecastCache.make_key(
+                model_version=1, last_date="2023-12-31", token="CST"
+            ),
+        )
+        self.assertNotEqual(
+            self.key,
+            ForecastCache.make_key(
+                token="CST", last_date="2023-12-31", model_version=2
+            ),
+        )
+
+    def test_prefix_reuse(self):
+        """Test that a longer cached forecast answers shorter requests."""
+        self.assertIsNone(self.cache.get(self.key, 30))
+        self.cache.put(self.key, 30, self.forecast)
+
+        result = self.cache.get(self.key, 7)
+        self.assertEqual(result["prices"], self.forecast["prices"][:7])
+        self.assertEqual(result["dates"], self.forecast["dates"][:7])
+        self.assertEqual(result["token"], "CST")
+
+        # A longer horizon than cached is a miss
+        self.assertIsNone(self.cache.get(self.key, 31))
+        self.assertEqual(self.cache.stats()["hits"], 1)
+        self.assertEqual(self.cache.stats()["misses"], 2)
+
+    def test_shorter_put_keeps_longer_forecast(self):
+        """Test that storing a shorter forecast does not shrink the entry."""
+        self.cache.put(self.key, 30, self.forecast)
+        self.cache.put(self.key, 5, self.forecast)
+
+        self.assertEqual(len(self.cache.get(self.key, 30)["prices"]), 30)
+
+    def test_ttl_expiry(self):
+        """Test that entries expire after the TTL."""
+        self.cache.put(self.key, 30, self.forecast)
+        self.clock.now = 59
+        self.assertIsNotNone(self.cache.get(self.key, 30))
+        self.clock.now = 61
+        self.assertIsNone(self.cache.get(self.key, 30))
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted."""
+        keys = [ForecastCache.make_key(token="CST", model_version=v) for v in range(3)]
+        self.cache.put(keys[0], 30, self.forecast)
+        self.cache.put(keys[1], 30, self.forecast)
+        self.cache.get(keys[0], 30)
+        self.cache.put(keys[2], 30, self.forecast)
+
+        self.assertIsNotNone(self.cache.get(keys[0], 30))
+        self.assertIsNone(self.cache.get(keys[1], 30))
+        self.assertEqual(self.cache.stats()["evictions"], 1)
+
+    def test_invalidate(self):
+        """Test that invalidation drops every entry."""
+        self.cache.put(self.key, 30, self.forecast)
+        self.cache.invalidate()
+
+        self.assertIsNone(self.cache.get(self.key, 30))
+        self.assertEqual(self.cache.stats()["size"], 0)
+        self.assertEqual(self.cache.stats()["invalidations"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+"""
+Tests for the multi-credit-type forecasting job.
+"""
+
+import unittest
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+
+# Import the modules to test
+from forecast_job import forecast_series, run_forecast_job, split_series
+from forecast_store import ForecastStore
+from price_prediction import PricePredictor
+
+
+class TestForecastJob(unittest.TestCase):
+    """Test cases for the forecasting job."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        rng = np.random.RandomState(7)
+        frames = []
+        for credit_type, vintage, base in [
+            ("VCU", None, 10.0),
+            ("VCU", 2021, 8.0),
+            ("CST", None, 20.0),
+        ]:
+            n = 60
+            frames.append(
+                pd.DataFrame(
+                    {
+                        "date": [
+                            datetime(2023, 1, 1) + timedelta(days=i) for i in range(n)
+                        ],
+                        "price": base
+                        + np.sin(np.arange(n) / 6)
+                        + rng.normal(0, 0.05, n),
+                        "volume": 1000 + rng.normal(0, 20, n),
+                        "credit_type": credit_type,
+                        "vintage": vintage,
+                    }
+                )
+            )
+        self.price_data = pd.concat(frames, ignore_index=True).sample(
+            frac=1, random_state=0
+        )
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Remove the job output."""
+        self.tmp_dir.cleanup()
+
+    def test_split_series(self):
+        """Test that histories are split per credit type and vintage."""
+        series = split_series(self.price_data)
+
+        self.assertEqual(sorted(series), ["CST", "VCU", "VCU-2021"])
+        self.assertTrue(series["VCU"]["date"].is_monotonic_increasing)
+        self.assertNotIn("credit_type", series["VCU"].columns)
+
+    def test_job_matches_direct_forecast(self):
+        """Test that the parallel job stores the same forecasts as running each model directly."""
+        store_path = os.path.join(self.tmp_dir.name, "forecasts")
+        summary = run_forecast_job(
+            self.price_data, store_path, horizon=14, max_workers=2
+        )
+
+        self.assertEqual(summary["failed"], {})
+        self.assertEqual(sorted(summary["credit_types"]), ["CST", "VCU", "VCU-2021"])
+
+        store = ForecastStore(store_path)
+        for credit_type, history in split_series(self.price_data).items():
+            predictor = PricePredictor()
+            predictor.train(history)
+            expected = predictor.predict(history, days_ahead=14)[
+                "predicted_price"
+            ].values
+            np.testing.assert_allclose(
+                store.read(credit_type)["predicted_price"].values, expected
+            )
+
+    def test_models_reused_between_runs(self):
+        """Test that saved models are loaded instead of retrained, and retraining bumps the version."""
+        history = split_series(self.price_data)["CST"]
+        model_path = os.path.join(self.tmp_dir.name, "models", "CST")
+
+        first = forecast_series("CST", history, horizon=5, model_path=model_path)
+        second = forecast_series("CST", history, horizon=5, model_path=model_path)
+        retrained = forecast_series(
+            "CST", history, horizon=5, model_path=model_path, retrain=True
+        )
+
+        self.assertEqual(first["model_version"].iloc[0], 1)
+        self.assertEqual(second["model_version"].iloc[0], 1)
+        self.assertEqual(retrained["model_version"].iloc[0], 2)
+        np.testing.assert_array_equal(
+            first["predicted_price"].values, second["predicted_price"].values
+        )
+
+    def test_update_bumps_version(self):
+        """Test that updating with new prices grows the saved model and bumps its version."""
+        history = split_series(self.price_data)["CST"]
+        model_path = os.path.join(self.tmp_dir.name, "models", "CST")
+
+        forecast_series("CST", history.iloc[:50], horizon=5, model_path=model_path)
+        unchanged = forecast_series(
+            "CST", history.iloc[:50], horizon=5, model_path=model_path, update=True
+        )
+        updated = forecast_series(
+            "CST", history, horizon=5, model_path=model_path, update=True
+        )
+
+        self.assertEqual(unchanged["model_version"].iloc[0], 1)
+        self.assertEqual(updated["model_version"].iloc[0], 2)
+        reloaded = PricePredictor(model_path=model_path)
+        self.assertEqual(len(reloaded.model.estimators_), 110)
+
+        # The update is saved over the artifact it was loaded from; the saved
+        # model must forecast exactly what the updated model did
+        forecast = reloaded.predict(history, days_ahead=5)["predicted_price"].values
+        np.testing.assert_allclose(forecast, updated["predicted_price"].values)
+        self.assertGreater(np.ptp(forecast), 0)
+        self.assertTrue((reloaded.scaler.scale_ > 0).all())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+Tests for the precomputed forecast store.
+"""
+
+import unittest
+import os
+import tempfile
+import pandas as pd
+
+# Import the module to test
+from forecast_store import ForecastStore
+
+
+def make_forecast(credit_type, days, price=10.0, model_version=1):
+    """Build a stored-forecast frame for one credit type."""
+    return pd.DataFrame(
+        {
+            "credit_type": credit_type,
+            "run_at": pd.Timestamp("2023-06-01 12:00", tz="UTC"),
+            "model_version": model_version,
+            "day": range(1, days + 1),
+            "date": pd.date_range("2023-06-02", periods=days),
+            "predicted_price": [price + i for i in range(days)],
+        }
+    )
+
+
+class TestForecastStore(unittest.TestCase):
+    """Test cases for the ForecastStore class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = ForecastStore(os.path.join(self.tmp_dir.name, "forecasts"))
+
+    def tearDown(self):
+        """Remove the store directory."""
+        self.tmp_dir.cleanup()
+
+    def test_write_and_read(self):
+        """Test that forecasts are stored per credit type and truncated on read."""
+        self.store.write(
+            pd.concat(
+                [make_forecast("VCU", 30), make_forecast("VCU-2021", 10, price=5.0)]
+            )
+        )
+
+        self.assertEqual(self.store.credit_types(), ["VCU", "VCU-2021"])
+        forecast = self.store.read("VCU", days=7)
+        self.assertEqual(len(forecast), 7)
+        self.assertEqual(
+            forecast["predicted_price"].tolist(), [10.0 + i for i in range(7)]
+        )
+        self.assertEqual(len(self.store.read("VCU-2021")), 10)
+
+    def test_missing_or_short_forecast(self):
+        """Test that absent or too-short forecasts are not returned."""
+        self.store.write(make_forecast("CST", 10))
+
+        self.assertIsNone(self.store.read("VCU", days=5))
+        self.assertIsNone(self.store.read("CST", days=30))
+
+    def test_rewrite_replaces_forecast(self):
+        """Test that a new run replaces the cached forecast."""
+        self.store.write(make_forecast("VCU", 5, model_version=1))
+        self.assertEqual(self.store.read("VCU")["model_version"].iloc[0], 1)
+
+        self.store.write(make_forecast("VCU", 5, price=20.0, model_version=2))
+        forecast = self.store.read("VCU")
+        self.assertEqual(forecast["model_version"].iloc[0], 2)
+        self.assertEqual(forecast["predicted_price"].iloc[0], 20.0)
+
+    def test_missing_columns(self):
+        """Test that forecasts without the required columns are rejected."""
+        with self.assertRaises(ValueError):
+            self.store.write(make_forecast("VCU", 5).drop(columns=["day"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+"""
+Tests for the import-time budget of the AI model modules.
+
+Heavy dependencies must not be imported eagerly, and importing a module in a
+fresh interpreter must stay within IMPORT_TIME_BUDGET seconds. The default
+budget is generous because shared CI machines are slow and busy; set a
+tighter one (e.g. IMPORT_TIME_BUDGET=1.0) to check cold starts on a quiet
+machine.
+
+pandas is deliberately still imported eagerly, and accounts for most of the
+remaining import time (about 0.5s). Every endpoint builds DataFrames on its
+first request, and the models call pandas in nearly every method, so
+deferring it would only move that cost to the first request.
+"""
+
+import unittest
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+MODELS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds allowed for importing a module in a fresh interpreter
+IMPORT_TIME_BUDGET = float(os.environ.get("IMPORT_TIME_BUDGET", 3.0))
+
+# Dependencies that must only be loaded when a model is first used (pandas
+# stays eager, see above)
+HEAVY_MODULES = ["sklearn", "tensorflow", "matplotlib"]
+
+MEASURE_SCRIPT = """
+import json, sys, time
+sys.path.insert(0, {models_dir!r})
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    'seconds': elapsed,
+    'loaded': [name for name in {heavy!r} if name in sys.modules]
+}}))
+"""
+
+
+def measure_import(module):
+    """Import a module in a fresh interpreter and report time and heavy imports."""
+    script = MEASURE_SCRIPT.format(
+        models_dir=MODELS_DIR, module=module, heavy=HEAVY_MODULES
+    )
+    # Run from a scratch directory so the API's log file is not left behind
+    with tempfile.TemporaryDirectory() as cwd:
+        output = subprocess.run(
+            [sys.executable, "-c", script],
+            cwd=cwd,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+class TestImportTime(unittest.TestCase):
+    """Test cases for deferred heavy imports."""
+
+    def _check(self, module):
+        result = measure_import(module)
+        self.assertEqual(
+            result["loaded"], [], f"{module} imported {result['loaded']} eagerly"
+        )
+        self.assertLess(
+            result["seconds"],
+            IMPORT_TIME_BUDGET,
+            f"importing {module} took {result['seconds']:.2f}s",
+        )
+
+    def test_price_prediction(self):
+        """Test that importing the price predictor is cheap."""
+        self._check("price_prediction")
+
+    def test_carbon_footprint(self):
+        """Test that importing the footprint calculator is cheap."""
+        self._check("carbon_footprint")
+
+    def test_project_analyzer(self):
+        """Test that importing the project analyzer is cheap."""
+        self._check("project_analyzer")
+
+    def test_api(self):
+        """Test that importing the API (and creating the app) is cheap."""
+        self._check("api")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,161 @@
+"""
+Tests for the request and model timing metrics.
+"""
+
+import unittest
+from flask import Flask, jsonify
+
+# Import the module to test
+from metrics import MetricsRegistry, SPAN_DURATION, instrument_app, span, timed
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    """Test cases for the metric types and text rendering."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.registry = MetricsRegistry()
+
+    def test_counter_and_gauge(self):
+        """Test that counters and gauges render one line per label set."""
+        counter = self.registry.counter("requests_total", "Requests", ["status"])
+        gauge = self.registry.gauge("in_flight", "In flight")
+        counter.inc(status=200)
+        counter.inc(2, status=200)
+        counter.inc(status=500)
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+
+        text = self.registry.render()
+
+        self.assertIn("# TYPE requests_total counter", text)
+        self.assertIn('requests_total{status="200"} 3', text)
+        self.assertIn('requests_total{status="500"} 1', text)
+        self.assertIn("in_flight 1", text)
+        with self.assertRaises(ValueError):
+            counter.inc(-1, status=200)
+        with self.assertRaises(ValueError):
+            counter.inc(endpoint="health")
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test that histogram buckets count observations at or below each bound."""
+        histogram = self.registry.histogram(
+            "latency_seconds", "Latency", ["endpoint"], buckets=(0.1, 1.0)
+        )
+        for value in [0.05, 0.1, 0.5, 2.0]:
+            histogram.observe(value, endpoint="predict")
+
+        text = self.registry.render()
+
+        self.assertIn('latency_seconds_bucket{endpoint="predict",le="0.1"} 2', text)
+        self.assertIn('latency_seconds_bucket{endpoint="predict",le="1.0"} 3', text)
+        self.assertIn('latency_seconds_bucket{endpoint="predict",le="+Inf"} 4', text)
+        self.assertIn('latency_seconds_sum{endpoint="predict"} 2.65', text)
+        self.assertIn('latency_seconds_count{endpoint="predict"} 4', text)
+
+    def test_label_values_are_escaped(self):
+        """Test that quotes, backslashes and newlines in label values are escaped."""
+        counter = self.registry.counter("events_total", "Events", ["name"])
+        counter.inc(name='a"b\\c\nd')
+
+        self.assertIn('events_total{name="a\\"b\\\\c\\nd"} 1', self.registry.render())
+
+
+class TestSpans(unittest.TestCase):
+    """Test cases for the span timing API."""
+
+    def test_nested_spans(self):
+        """Test that nested spans are recorded under the joined path."""
+        before = SPAN_DURATION.count(span="test.outer/inner")
+
+        with span("test.outer") as outer:
+            with span("inner") as inner:
+                pass
+
+        self.assertEqual(inner.path, "test.outer/inner")
+        self.assertEqual(SPAN_DURATION.count(span="test.outer/inner"), before + 1)
+        self.assertGreaterEqual(outer.duration, inner.duration)
+
+    def test_timed_decorator(self):
+        """Test that decorated functions are timed on every call and keep their result."""
+
+        @timed("test.decorated")
+        def add(a, b):
+            return a + b
+
+        before = SPAN_DURATION.count(span="test.decorated")
+
+        self.assertEqual(add(1, 2), 3)
+        self.assertEqual(add(2, 3), 5)
+        self.assertEqual(SPAN_DURATION.count(span="test.decorated"), before + 2)
+
+
+class TestInstrumentApp(unittest.TestCase):
+    """Test cases for the Flask middleware."""
+
+    def setUp(self):
+        """Set up a small instrumented app."""
+        self.registry = MetricsRegistry()
+        app = Flask(__name__)
+
+        @app.route("/echo", methods=["POST"])
+        def echo():
+            with span("parse"):
+                return jsonify({"ok": True})
+
+        @app.route("/fail")
+        def fail():
+            raise RuntimeError("boom")
+
+        instrument_app(app, registry=self.registry)
+        self.client = app.test_client()
+
+    def test_request_metrics(self):
+        """Test that requests are counted, timed and sized per endpoint."""
+        before = SPAN_DURATION.count(span="echo/parse")
+
+        self.client.post("/echo", data='{"a": 1}', content_type="application/json")
+        self.client.get("/fail")
+
+        requests_total = self.registry.counter(
+            "carbonsol_http_requests_total", "", ["endpoint", "method", "status"]
+        )
+        duration = self.registry.histogram(
+            "carbonsol_http_request_duration_seconds", "", ["endpoint", "method"]
+        )
+        in_flight = self.registry.gauge(
+            "carbonsol_http_requests_in_flight", "", ["endpoint"]
+        )
+        self.assertEqual(
+            requests_total.value(endpoint="echo", method="POST", status=200), 1
+        )
+        self.assertEqual(
+            requests_total.value(endpoint="fail", method="GET", status=500), 1
+        )
+        self.assertEqual(duration.count(endpoint="echo", method="POST"), 1)
+        self.assertEqual(in_flight.value(endpoint="echo"), 0)
+        self.assertEqual(in_flight.value(endpoint="fail"), 0)
+        self.assertEqual(SPAN_DURATION.count(span="echo/parse"), before + 1)
+
+    def test_metrics_endpoint(self):
+        """Test that /metrics serves the registry in the text format."""
+        self.client.post("/echo", data='{"a": 1}', content_type="application/json")
+
+        response = self.client.get("/metrics")
+        text = response.get_data(as_text=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith("text/plain; version=0.0.4"))
+        self.assertIn(
+            'carbonsol_http_request_size_bytes_bucket{endpoint="echo",le="100.0"} 1',
+            text,
+        )
+        self.assertIn(
+            'carbonsol_http_requests_total{endpoint="echo",method="POST",status="200"} 1',
+            text,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+"""
+Tests for the memory-mapped model artifact store.
+"""
+
+import unittest
+import json
+import os
+import tempfile
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+# Import the modules to test
+from model_store import (
+    ArtifactError,
+    is_artifact,
+    load_artifact,
+    save_artifact,
+    verify_artifact,
+)
+from scaling import scaler_arrays, scaler_from_arrays
+
+
+class TestModelStore(unittest.TestCase):
+    """Test cases for saving and loading model artifacts."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.artifact_dir = os.path.join(self.tmp_dir.name, "artifact")
+        self.arrays = {
+            "weights": np.arange(12, dtype=np.float64).reshape(3, 4),
+            "empty": np.zeros(0),
+        }
+        self.objects = {"config": {"depth": 3, "offsets": np.arange(5)}}
+
+    def tearDown(self):
+        """Remove the artifact directory."""
+        self.tmp_dir.cleanup()
+
+    def test_roundtrip(self):
+        """Test that arrays come back memory-mapped and objects unchanged."""
+        manifest = save_artifact(
+            self.artifact_dir, "Example", self.arrays, self.objects, model_version=7
+        )
+        self.assertTrue(is_artifact(self.artifact_dir))
+        self.assertEqual(manifest["model_version"], 7)
+        self.assertEqual(len(manifest["files"]), 3)
+
+        arrays, objects, loaded_manifest = load_artifact(
+            self.artifact_dir, model_type="Example"
+        )
+
+        self.assertEqual(loaded_manifest["files"], manifest["files"])
+        self.assertIsInstance(arrays["weights"], np.memmap)
+        self.assertFalse(arrays["weights"].flags.writeable)
+        np.testing.assert_array_equal(arrays["weights"], self.arrays["weights"])
+        self.assertEqual(arrays["empty"].shape, (0,))
+        self.assertEqual(objects["config"]["depth"], 3)
+        np.testing.assert_array_equal(objects["config"]["offsets"], np.arange(5))
+
+    def test_checksum_mismatch(self):
+        """Test that a modified file is rejected."""
+        manifest = save_artifact(
+            self.artifact_dir, "Example", self.arrays, self.objects
+        )
+        weights_file = manifest["arrays"]["weights"]["file"]
+        with open(os.path.join(self.artifact_dir, weights_file), "r+b") as f:
+            f.seek(-1, os.SEEK_END)
+            f.write(b"\x01")
+
+        with self.assertRaises(ArtifactError):
+            load_artifact(self.artifact_dir, verify=True)
+        with self.assertRaises(ArtifactError):
+            verify_artifact(self.artifact_dir)
+        # Loading does not hash the files unless asked to
+        load_artifact(self.artifact_dir)
+
+    def test_resave_over_mapped_artifact(self):
+        """Test that saving over an artifact leaves mapped readers of the old one intact."""
+        save_artifact(
+            self.artifact_dir, "Example", self.arrays, self.objects, model_version=1
+        )
+        old_arrays, old_objects, _ = load_artifact(self.artifact_dir, lazy_objects=True)
+
+        new_arrays = {"weights": -self.arrays["weights"], "empty": np.zeros(0)}
+        save_artifact(
+            self.artifact_dir,
+            "Example",
+            new_arrays,
+            {"config": {"depth": 4}},
+            model_version=2,
+        )
+
+        np.testing.assert_array_equal(old_arrays["weights"], self.arrays["weights"])
+        self.assertEqual(old_objects["config"].loader()["depth"], 3)
+        arrays, objects, manifest = load_artifact(self.artifact_dir)
+        self.assertEqual(manifest["model_version"], 2)
+        np.testing.assert_array_equal(arrays["weights"], new_arrays["weights"])
+        self.assertEqual(objects["config"]["depth"], 4)
+
+        # A third save deletes the first save's files and keeps the second's
+        first_files = set(manifest["previous_files"])
+        second_files = set(manifest["files"])
+        save_artifact(self.artifact_dir, "Example", self.arrays, model_version=3)
+        remaining = set(os.listdir(self.artifact_dir))
+        self.assertFalse(first_files & remaining)
+        self.assertTrue(second_files <= remaining)
+
+    def test_lazy_object_after_files_deleted(self):
+        """Test that a lazily loaded object can be unpickled after later saves deleted its file."""
+        save_artifact(
+            self.artifact_dir, "Example", self.arrays, self.objects, model_version=1
+        )
+        _, old_objects, old_manifest = load_artifact(
+            self.artifact_dir, lazy_objects=True
+        )
+
+        save_artifact(
+            self.artifact_dir,
+            "Example",
+            self.arrays,
+            {"config": {"depth": 4}},
+            model_version=2,
+        )
+        save_artifact(
+            self.artifact_dir,
+            "Example",
+            self.arrays,
+            {"config": {"depth": 5}},
+            model_version=3,
+        )
+        self.assertFalse(
+            os.path.exists(
+                os.path.join(
+                    self.artifact_dir, old_manifest["objects"]["config"]["file"]
+                )
+            )
+        )
+
+        config = old_objects["config"].loader()
+        self.assertEqual(config["depth"], 3)
+        np.testing.assert_array_equal(config["offsets"], np.arange(5))
+
+    def test_wrong_model_type(self):
+        """Test that an artifact for another model type is rejected."""
+        save_artifact(self.artifact_dir, "Example", self.arrays)
+        with self.assertRaises(ArtifactError):
+            load_artifact(self.artifact_dir, model_type="Other")
+
+    def test_missing_manifest(self):
+        """Test that a directory without a manifest is not an artifact."""
+        os.makedirs(self.artifact_dir)
+        self.assertFalse(is_artifact(self.artifact_dir))
+        with self.assertRaises(ArtifactError):
+            load_artifact(self.artifact_dir)
+
+    def test_unsupported_format_version(self):
+        """Test that manifests from a newer format are rejected."""
+        save_artifact(self.artifact_dir, "Example", self.arrays)
+        manifest_path = os.path.join(self.artifact_dir, "manifest.json")
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        manifest["format_version"] = 99
+        with open(manifest_path, "w") as f:
+            json.dump(manifest, f)
+
+        with self.assertRaises(ArtifactError):
+            load_artifact(self.artifact_dir)
+
+    def test_scaler_arrays_roundtrip(self):
+        """Test that scaler statistics survive export as flat arrays."""
+        rng = np.random.RandomState(0)
+        scaler = StandardScaler().fit(rng.normal(3, 2, (50, 4)))
+        X = rng.normal(3, 2, (5, 4))
+
+        save_artifact(self.artifact_dir, "Example", scaler_arrays(scaler))
+        arrays, _, _ = load_artifact(self.artifact_dir)
+        restored = scaler_from_arrays(arrays)
+
+        np.testing.assert_allclose(restored.transform(X), scaler.transform(X))
+        self.assertEqual(scaler_arrays(StandardScaler()), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
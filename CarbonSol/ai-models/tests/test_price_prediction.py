@@ -78,5 +78,121 @@ class TestPricePredictor(unittest.TestCase):
         # Different credit types should yield different predictions
         self.assertNotEqual(vcu_predictions, cst_predictions)
 
+    def test_scaler_persisted_with_model(self):
+        """Test that the fitted scaler is saved and restored with the model."""
+        import os
+        import tempfile
+        
+        self.assertTrue(self.predictor.train(self.sample_data))
+        mean_after_train = self.predictor.scaler.mean_.copy()
+        
+        # Inference must not refit the scaler
+        self.predictor.predict(self.sample_data.iloc[:50], days_ahead=5)
+        np.testing.assert_array_equal(self.predictor.scaler.mean_, mean_after_train)
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model_path = os.path.join(tmp_dir, 'price_model.pkl')
+            self.assertTrue(self.predictor.save_model(model_path))
+            loaded = PricePredictor(model_path=model_path)
+        
+        np.testing.assert_array_equal(loaded.scaler.mean_, mean_after_train)
+        np.testing.assert_allclose(
+            loaded.predict(self.sample_data, days_ahead=5)['predicted_price'].values,
+            self.predictor.predict(self.sample_data, days_ahead=5)['predicted_price'].values
+        )
+
+    def test_mmap_artifact_roundtrip(self):
+        """Test that a memory-mapped artifact restores the model and scaler."""
+        import os
+        import tempfile
+        
+        self.assertTrue(self.predictor.train(self.sample_data))
+        expected = self.predictor.predict(self.sample_data, days_ahead=5)['predicted_price'].values
+        
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            model_dir = os.path.join(tmp_dir, 'price_model')
+            self.assertTrue(self.predictor.save_model(model_dir, artifact_format='mmap'))
+            loaded = PricePredictor(model_path=model_dir)
+            
+            self.assertEqual(loaded.manifest['model_version'], self.predictor.model_version)
+            self.assertIsInstance(loaded.scaler.mean_, np.memmap)
+            np.testing.assert_allclose(
+                loaded.predict(self.sample_data, days_ahead=5)['predicted_price'].values, expected
+            )
+
+    def test_update_grows_forest(self):
+        """Test that new prices add trees instead of retraining from scratch."""
+        self.assertTrue(self.predictor.train(self.sample_data.iloc[:80]))
+        first_trees = list(self.predictor.model.estimators_)
+        scaler_mean = self.predictor.scaler.mean_.copy()
+        version = self.predictor.model_version
+        
+        self.assertTrue(self.predictor.update(self.sample_data, n_new_trees=10, recent_days=30))
+        
+        self.assertEqual(len(self.predictor.model.estimators_), 110)
+        self.assertEqual(self.predictor.model.estimators_[:100], first_trees)
+        np.testing.assert_array_equal(self.predictor.scaler.mean_, scaler_mean)
+        self.assertEqual(self.predictor.model_version, version + 1)
+        self.assertEqual(self.predictor.trained_through, self.sample_data['date'].iloc[-1])
+        
+        # Nothing new: the model is left as it is
+        self.assertTrue(self.predictor.update(self.sample_data))
+        self.assertEqual(self.predictor.model_version, version + 1)
+    
+    def test_update_drops_oldest_trees(self):
+        """Test that max_trees keeps the forest size bounded."""
+        self.assertTrue(self.predictor.train(self.sample_data.iloc[:80]))
+        newest_trees = self.predictor.model.estimators_[20:]
+        
+        self.assertTrue(self.predictor.update(self.sample_data, n_new_trees=20, max_trees=100))
+        
+        self.assertEqual(len(self.predictor.model.estimators_), 100)
+        self.assertEqual(self.predictor.model.estimators_[:80], newest_trees)
+        self.assertEqual(len(self.predictor.predict(self.sample_data, days_ahead=3)), 3)
+    
+    def test_predict_batch_matches_predict(self):
+        """Test that batched forecasts match forecasting each history alone."""
+        self.assertTrue(self.predictor.train(self.sample_data))
+        histories = [self.sample_data, self.sample_data.iloc[:60], self.sample_data.iloc[20:]]
+        
+        forecasts = self.predictor.predict_batch(histories, days_ahead=[10, 5, 20])
+        
+        for history, days, forecast in zip(histories, [10, 5, 20], forecasts):
+            expected = self.predictor.predict(history, days_ahead=days)
+            self.assertEqual(len(forecast), days)
+            np.testing.assert_allclose(forecast['predicted_price'].values, expected['predicted_price'].values)
+            self.assertEqual(list(forecast['date']), list(expected['date']))
+    
+    def test_predict_scenarios_matches_predict_without_noise(self):
+        """Test that noiseless scenarios on the forest mean reproduce predict."""
+        # With a constant volume, resampled volumes equal the mean fill of predict
+        history = self.sample_data.assign(volume=1000)
+        self.assertTrue(self.predictor.train(history))
+        
+        bands = self.predictor.predict_scenarios(
+            history, days_ahead=10, n_scenarios=4, price_noise=0.0, sample_trees=False
+        )
+        expected = self.predictor.predict(history, days_ahead=10)
+        
+        np.testing.assert_allclose(bands['mean'].values, expected['predicted_price'].values)
+        self.assertEqual(list(bands['date']), list(expected['date']))
+    
+    def test_predict_scenarios_bands(self):
+        """Test the shape, ordering and reproducibility of scenario bands."""
+        self.assertTrue(self.predictor.train(self.sample_data))
+        
+        bands, paths = self.predictor.predict_scenarios(
+            self.sample_data, days_ahead=15, n_scenarios=200, seed=7, return_paths=True
+        )
+        
+        self.assertEqual(paths.shape, (200, 15))
+        self.assertEqual(list(bands.columns), ['date', 'mean', 'p10', 'p50', 'p90'])
+        self.assertTrue((bands['p10'] <= bands['p50']).all())
+        self.assertTrue((bands['p50'] <= bands['p90']).all())
+        self.assertTrue((bands['p90'] > bands['p10']).any())
+        
+        again = self.predictor.predict_scenarios(self.sample_data, days_ahead=15, n_scenarios=200, seed=7)
+        pd.testing.assert_frame_equal(bands, again)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
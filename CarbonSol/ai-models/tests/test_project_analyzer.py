@@ -7,6 +7,7 @@ import json
 
 # Import the model to test
 from project_analyzer import ProjectAnalyzer
+from model_store import Deferred
 
 class TestProjectAnalyzer(unittest.TestCase):
     """Test cases for the ProjectAnalyzer class."""
@@ -126,5 +127,152 @@ class TestProjectAnalyzer(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.analyzer.analyze(incomplete_project)
 
+    def _make_projects(self, n, seed=0):
+        """Create a synthetic project frame for model-based tests."""
+        import numpy as np
+        import pandas as pd
+        
+        rng = np.random.RandomState(seed)
+        frame = pd.DataFrame({
+            'project_id': [f'P{i:04d}' for i in range(n)],
+            'project_type': rng.choice(['solar', 'wind', 'reforestation', 'composting'], n),
+            'size_hectares': rng.uniform(10, 5000, n),
+            'duration_years': rng.randint(5, 40, n),
+            'cost_per_ton': rng.uniform(5, 30, n),
+            'annual_reduction_tons': rng.uniform(100, 100000, n),
+            'region': rng.choice(['Amazon', 'Tamil Nadu', 'Borneo', 'Bavaria'], n),
+            'verification_standard': rng.choice(['VCS', 'Gold Standard'], n),
+        })
+        for risk_factor in self.analyzer.RISK_FACTORS:
+            frame[risk_factor] = rng.uniform(0, 1, n)
+        frame['success'] = (frame['permanence'] < 0.6).astype(int)
+        frame['actual_reduction_tons'] = frame['annual_reduction_tons'] * (1 - frame['leakage'] / 2)
+        return frame
+    
+    def test_analyze_batch_matches_single(self):
+        """Test that batch analysis matches analyzing projects one at a time."""
+        import numpy as np
+        
+        self.analyzer.train(self._make_projects(200))
+        projects = self._make_projects(20, seed=1)
+        
+        batch = self.analyzer.analyze_batch(projects)
+        
+        self.assertEqual(len(batch), 20)
+        for i in range(len(projects)):
+            single = self.analyzer.analyze_project(projects.iloc[[i]])
+            self.assertAlmostEqual(batch['success_probability'].iloc[i], single['success_probability'])
+            self.assertAlmostEqual(batch['expected_reduction_tons'].iloc[i], single['expected_reduction_tons'])
+            self.assertAlmostEqual(batch['adjusted_reduction_tons'].iloc[i], single['adjusted_reduction_tons'])
+            self.assertAlmostEqual(batch['risk_score'].iloc[i], single['risk_score'])
+            self.assertAlmostEqual(batch['cost_effectiveness'].iloc[i], single['cost_effectiveness'])
+            self.assertEqual(batch['project_id'].iloc[i], projects['project_id'].iloc[i])
+    
+    def test_analyze_batch_isolates_bad_project(self):
+        """Test that a project that cannot be analyzed does not fail the rest of the batch."""
+        self.analyzer.train(self._make_projects(200))
+        projects = self._make_projects(5, seed=1)
+        expected = self.analyzer.analyze_batch(projects)
+        projects['permanence'] = projects['permanence'].astype(object)
+        projects.loc[2, 'permanence'] = 'unknown'
+        
+        batch = self.analyzer.analyze_batch(projects)
+        
+        self.assertEqual(len(batch), 5)
+        self.assertIsNotNone(batch['error'].iloc[2])
+        self.assertTrue(batch[['success_probability', 'expected_reduction_tons']].iloc[2].isna().all())
+        self.assertEqual(batch['project_id'].tolist(), projects['project_id'].tolist())
+        for i in [0, 1, 3, 4]:
+            self.assertIsNone(batch['error'].iloc[i])
+            self.assertAlmostEqual(batch['success_probability'].iloc[i], expected['success_probability'].iloc[i])
+            self.assertAlmostEqual(batch['risk_score'].iloc[i], expected['risk_score'].iloc[i])
+        
+        with self.assertRaises(ValueError):
+            self.analyzer.analyze_batch(projects.iloc[[2]])
+    
+    def test_compare_projects_sorted(self):
+        """Test that compared projects are ranked by adjusted reduction."""
+        self.analyzer.train(self._make_projects(200))
+        
+        comparison = self.analyzer.compare_projects(self._make_projects(30, seed=2))
+        
+        adjusted = comparison['adjusted_reduction_tons'].tolist()
+        self.assertEqual(adjusted, sorted(adjusted, reverse=True))
+        self.assertEqual(len(comparison), 30)
+    
+    def test_feature_layout_is_stable(self):
+        """Test that single projects and batches share the trained feature layout."""
+        import numpy as np
+        
+        training_data = self._make_projects(200)
+        self.analyzer.train(training_data)
+        width = self.analyzer._prepare_features(training_data).shape[1]
+        
+        projects = self._make_projects(10, seed=3)
+        self.assertEqual(self.analyzer._prepare_features(projects).shape[1], width)
+        self.assertEqual(self.analyzer._prepare_features(projects.iloc[[0]]).shape[1], width)
+        
+        # Unseen categories and missing columns still produce the same layout
+        unseen = projects.iloc[[0]].copy()
+        unseen['region'] = 'Patagonia'
+        unseen = unseen.drop(columns=['verification_standard', 'cost_per_ton'])
+        X = self.analyzer._prepare_features(unseen)
+        self.assertEqual(X.shape[1], width)
+        self.assertFalse(np.isnan(X).any())
+    
+    def test_one_hot_encoding(self):
+        """Test one-hot encoding against a fixed vocabulary."""
+        import numpy as np
+        import pandas as pd
+        
+        import warnings
+        
+        # Unseen values encode as zeros without a deprecation warning
+        with warnings.catch_warnings():
+            warnings.simplefilter('error')
+            encoded = ProjectAnalyzer._one_hot(pd.Series(['b', 'a', 'z', None, 'b']), ['a', 'b'])
+        np.testing.assert_array_equal(encoded, [[0, 1], [1, 0], [0, 0], [0, 0], [0, 1]])
+    
+    def test_feature_schema_persisted(self):
+        """Test that the learned feature schema is saved and restored."""
+        import tempfile
+        
+        self.analyzer.train(self._make_projects(100))
+        with tempfile.TemporaryDirectory() as model_dir:
+            self.assertTrue(self.analyzer.save_models(model_dir))
+            loaded = ProjectAnalyzer(model_path=model_dir)
+        
+        self.assertEqual(loaded.feature_schema, self.analyzer.feature_schema)
+        projects = self._make_projects(5, seed=4)
+        self.assertEqual(
+            loaded.analyze_batch(projects)['success_probability'].tolist(),
+            self.analyzer.analyze_batch(projects)['success_probability'].tolist()
+        )
+    
+    def test_mmap_artifact_roundtrip(self):
+        """Test that a memory-mapped artifact restores models, scaler and schema."""
+        import tempfile
+        
+        self.analyzer.train(self._make_projects(100))
+        projects = self._make_projects(5, seed=4)
+        expected = self.analyzer.analyze_batch(projects)
+        
+        with tempfile.TemporaryDirectory() as model_dir:
+            self.assertTrue(self.analyzer.save_models(model_dir, artifact_format='mmap'))
+            loaded = ProjectAnalyzer(model_path=model_dir)
+            
+            self.assertEqual(loaded.feature_schema, self.analyzer.feature_schema)
+            self.assertEqual(loaded.model_version, 1)
+            result = loaded.analyze_batch(projects)
+            loaded.analyze_project(projects.iloc[[0]])
+            loaded.compare_projects(projects)
+            
+            # Inference ran on the mapped arrays without unpickling the models
+            for attr in ('_classification_model', '_regression_model'):
+                self.assertIsInstance(loaded.__dict__[attr], Deferred)
+        
+        self.assertEqual(result['success_probability'].tolist(), expected['success_probability'].tolist())
+        self.assertEqual(result['expected_reduction_tons'].tolist(), expected['expected_reduction_tons'].tolist())
+    
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
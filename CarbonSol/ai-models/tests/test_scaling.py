@@ -0,0 +1,59 @@
+"""
+Tests for the feature scaling utilities.
+"""
+
+import unittest
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+# Import the module to test
+from scaling import apply_scaler, is_fitted
+
+
+class TestScaling(unittest.TestCase):
+    """Test cases for the scaler lifecycle helpers."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        rng = np.random.RandomState(0)
+        self.train_matrix = rng.normal(5, 2, (200, 4))
+        self.test_matrix = rng.normal(5, 2, (10, 4))
+
+    def test_fit_then_transform(self):
+        """Test that inference applies the statistics learned at fit time."""
+        scaler = StandardScaler()
+        apply_scaler(scaler, self.train_matrix, fit=True)
+        mean_before = scaler.mean_.copy()
+
+        scaled = apply_scaler(scaler, self.test_matrix)
+
+        np.testing.assert_array_equal(scaler.mean_, mean_before)
+        np.testing.assert_allclose(
+            scaled, StandardScaler().fit(self.train_matrix).transform(self.test_matrix)
+        )
+
+    def test_unfitted_scaler_scales_each_call(self):
+        """Test the legacy behavior for scalers without statistics, which stay unfitted."""
+        scaler = StandardScaler()
+        self.assertFalse(is_fitted(scaler))
+
+        scaled = apply_scaler(scaler, self.test_matrix)
+        shifted = apply_scaler(
+            scaler, self.test_matrix + 100, out=np.empty_like(self.test_matrix)
+        )
+
+        self.assertFalse(is_fitted(scaler))
+        np.testing.assert_allclose(scaled.mean(axis=0), 0, atol=1e-12)
+        np.testing.assert_allclose(shifted, scaled, atol=1e-12)
+
+    def test_width_mismatch(self):
+        """Test that a matrix with a different layout is rejected."""
+        scaler = StandardScaler()
+        apply_scaler(scaler, self.train_matrix, fit=True)
+
+        with self.assertRaises(ValueError):
+            apply_scaler(scaler, self.test_matrix[:, :3])
+
+
+if __name__ == "__main__":
+    unittest.main()
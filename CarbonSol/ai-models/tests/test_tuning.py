@@ -0,0 +1,77 @@
+"""
+Tests for the hyperparameter search.
+"""
+
+import unittest
+import numpy as np
+import pandas as pd
+
+# Import the module to test
+from tuning import pareto_front, rung_budgets, sample_configs, select_config, tune
+
+
+class TestTuning(unittest.TestCase):
+    """Test cases for the hyperparameter search."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        rng = np.random.RandomState(5)
+        n = 300
+        self.history = pd.DataFrame(
+            {
+                "date": pd.date_range("2022-01-01", periods=n),
+                "price": 10 + np.cumsum(rng.normal(0, 0.2, n)),
+                "volume": rng.randint(500, 5000, n),
+            }
+        )
+
+    def test_pareto_front(self):
+        """Test that only configurations no other one beats on both objectives are kept."""
+        errors = [0.5, 0.3, 0.4, 0.1, 0.3]
+        latencies = [10, 20, 30, 40, 25]
+
+        np.testing.assert_array_equal(
+            pareto_front(errors, latencies), [True, True, False, True, False]
+        )
+
+    def test_rung_budgets(self):
+        """Test that rows grow by eta per rung and the last rung uses all rows."""
+        self.assertEqual(rung_budgets(900, 27, eta=3), [33, 99, 297, 900])
+        self.assertEqual(rung_budgets(900, 27, eta=3, min_rows=400), [400, 900])
+        self.assertEqual(rung_budgets(900, 1), [900])
+
+    def test_sample_configs_includes_defaults(self):
+        """Test that sampled configurations are distinct and include the defaults."""
+        space = {"n_estimators": [10, 50, 100], "max_depth": [4, 8, None]}
+        defaults = {"n_estimators": 100, "max_depth": 10}
+
+        configs = sample_configs(space, 5, seed=1, include=defaults)
+
+        self.assertEqual(len(configs), 5)
+        self.assertIn(defaults, configs)
+        self.assertEqual(len({tuple(config.items()) for config in configs}), 5)
+        self.assertEqual(len(sample_configs(space, 20)), 9)
+
+    def test_tune_price(self):
+        """Test that the search keeps the defaults to the end and reports a Pareto front."""
+        space = {"n_estimators": [5, 20], "max_depth": [3, 10]}
+        result = tune(
+            "price", self.history, n_configs=4, eta=2, space=space, max_workers=2
+        )
+
+        trials = result["trials"]
+        report = result["report"]
+        self.assertEqual(result["defaults"], {"n_estimators": 100, "max_depth": 10})
+        self.assertEqual(trials["rung"].max(), 2)
+        self.assertEqual(len(trials[trials["rung"] == 0]), 4)
+        self.assertEqual(report["baseline"].sum(), 1)
+        self.assertTrue(report["pareto"].any())
+        self.assertTrue((report["latency_us"] > 0).all())
+
+        best = report.loc[report["error"].idxmin()]
+        self.assertEqual(select_config(report), best["params"])
+        self.assertIsNone(select_config(report, max_error=-1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,526 @@
+"""
+Hyperparameter Search
+
+This module tunes the tree ensembles of PricePredictor and ProjectAnalyzer
+with successive halving: many sampled configurations are trained on a small
+share of the training rows, and only the best (plus those on the
+error/latency Pareto front) advance to rungs with eta times more rows, until
+the survivors are trained on all of them.
+
+Features are prepared once per search and handed to every worker process
+when it starts, so trials only slice the cached matrices. Each trial records
+the validation error and the single-row latency of the compiled model, and
+the report marks the Pareto front of error against latency, from which the
+fastest model meeting an error target can be picked:
+
+    python tuning.py --task price --data prices.csv --configs 81 --max-error 0.25
+"""
+
+import argparse
+import itertools
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from compiled_forest import CompiledForest
+from forecast_job import limit_threads
+
+# Hyperparameter values explored per task
+SEARCH_SPACES = {
+    "price": {
+        "n_estimators": [10, 25, 50, 100, 200],
+        "max_depth": [4, 6, 8, 10, None],
+        "min_samples_leaf": [1, 2, 5, 10],
+        "max_features": [1.0, 0.5, "sqrt"],
+    },
+    "project_classifier": {
+        "n_estimators": [10, 25, 50, 100, 200],
+        "max_depth": [4, 6, 8, 10, None],
+        "min_samples_leaf": [1, 2, 5, 10],
+        "max_features": ["sqrt", 0.5, 1.0],
+    },
+    "project_regressor": {
+        "n_estimators": [25, 50, 100, 200],
+        "max_depth": [2, 3, 5, 7],
+        "learning_rate": [0.03, 0.1, 0.3],
+        "subsample": [0.7, 1.0],
+    },
+}
+
+# Validation metric per task: mean absolute error or misclassification rate
+TASK_METRICS = {
+    "price": "mae",
+    "project_classifier": "error_rate",
+    "project_regressor": "mae",
+}
+
+# Prepared task of the current worker process
+_task = {}
+
+
+def prepare_task(task, data, validation_fraction=0.2):
+    """
+    Prepare the training and validation matrices of a tuning task.
+
+    Args:
+        task (str): 'price', 'project_classifier' or 'project_regressor'.
+        data (pd.DataFrame): Price history for 'price' (see PricePredictor.train),
+            project training data for the project tasks (see ProjectAnalyzer.train).
+        validation_fraction (float): Share of the rows held out for validation.
+
+    Returns:
+        dict: The untrained default 'model', 'X_train', 'y_train', 'X_val',
+            'y_val', the 'metric' and whether training rows are taken from
+            the end of the training set ('recent_rows').
+    """
+    if task not in SEARCH_SPACES:
+        raise ValueError(f"Unknown tuning task: {task}")
+    if not 0 < validation_fraction < 1:
+        raise ValueError("validation_fraction must be between 0 and 1")
+
+    if task == "price":
+        from price_prediction import PricePredictor
+
+        history = data.sort_values("date").reset_index(drop=True)
+        predictor = PricePredictor()
+
+        # Fit the scaler on the training days only, then build the next-day
+        # pairs of the whole history; the last pairs are the validation days
+        n_train = int((len(history) - 1) * (1 - validation_fraction))
+        predictor._training_arrays(history.iloc[: n_train + 1], fit=True)
+        X, y = predictor._training_arrays(history)
+        split = n_train
+        model = predictor._default_model()
+        recent_rows = True
+    else:
+        from project_analyzer import ProjectAnalyzer
+        from sklearn.model_selection import train_test_split
+
+        analyzer = ProjectAnalyzer()
+        X = analyzer._prepare_features(data, fit=True)
+        target = "success" if task == "project_classifier" else "actual_reduction_tons"
+        if target not in data.columns:
+            raise ValueError(f"Training data must include '{target}' column")
+
+        # Shuffled like ProjectAnalyzer.train, so a prefix is a random subset
+        X_train, X_val, y_train, y_val = train_test_split(
+            X, data[target].to_numpy(), test_size=validation_fraction, random_state=42
+        )
+        X, y = np.vstack([X_train, X_val]), np.concatenate([y_train, y_val])
+        split = len(y_train)
+        classifier, regressor = analyzer._default_models()
+        model = classifier if task == "project_classifier" else regressor
+        recent_rows = False
+
+    if split < 2 or split >= len(y):
+        raise ValueError("Not enough rows for the validation split")
+
+    return {
+        "task": task,
+        "model": model,
+        "X_train": X[:split],
+        "y_train": y[:split],
+        "X_val": X[split:],
+        "y_val": y[split:],
+        "metric": TASK_METRICS[task],
+        "recent_rows": recent_rows,
+    }
+
+
+def sample_configs(space, n_configs, seed=0, include=None):
+    """
+    Sample distinct configurations from a grid of hyperparameter values.
+
+    Args:
+        space (dict): Candidate values per hyperparameter.
+        n_configs (int): Number of configurations; the whole grid if it is smaller.
+        seed (int): Random seed.
+        include (dict, optional): Configuration that is always part of the
+            sample, e.g. the current defaults.
+
+    Returns:
+        list: Configurations as dicts of hyperparameter values.
+    """
+    names = list(space)
+    grid = [dict(zip(names, values)) for values in itertools.product(*space.values())]
+    if len(grid) > n_configs:
+        rng = np.random.default_rng(seed)
+        grid = [
+            grid[i] for i in sorted(rng.choice(len(grid), n_configs, replace=False))
+        ]
+
+    if include is not None and include not in grid:
+        grid = [include] + grid[: n_configs - 1]
+    return grid
+
+
+def measure_latency(model, X, repeat=50):
+    """
+    Measure the single-row prediction latency of a fitted model.
+
+    Models that CompiledForest supports are timed in their compiled form, as
+    they are served.
+
+    Args:
+        model: Fitted scikit-learn estimator.
+        X (np.ndarray): Feature rows; the first one is predicted.
+        repeat (int): Number of timed predictions.
+
+    Returns:
+        float: Median latency in microseconds.
+    """
+    try:
+        predictor = CompiledForest.from_sklearn(model)
+    except ValueError:
+        predictor = model
+    predict = (
+        predictor.predict_proba
+        if hasattr(model, "predict_proba")
+        else predictor.predict
+    )
+
+    row = X[:1]
+    predict(row)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        predict(row)
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1e6
+
+
+def _init_worker(task, n_threads):
+    """Process pool initializer: limit threads and cache the prepared task."""
+    limit_threads(n_threads)
+    _task.clear()
+    _task.update(task)
+
+
+def run_trial(params, n_rows, n_threads=1):
+    """
+    Train one configuration on n_rows training rows and score it.
+
+    Runs in a worker process on the task cached by the pool initializer.
+
+    Args:
+        params (dict): Hyperparameters set on the task's default model.
+        n_rows (int): Number of training rows to fit on.
+        n_threads (int): Threads the model may use for training.
+
+    Returns:
+        dict: The 'params', 'rows', validation 'error', 'fit_seconds' and
+            single-row 'latency_us'.
+    """
+    from sklearn.base import clone
+
+    model = clone(_task["model"]).set_params(**params)
+    if "n_jobs" in model.get_params():
+        model.set_params(n_jobs=n_threads)
+
+    rows = slice(-n_rows, None) if _task["recent_rows"] else slice(0, n_rows)
+    start = time.perf_counter()
+    model.fit(_task["X_train"][rows], _task["y_train"][rows])
+    fit_seconds = time.perf_counter() - start
+
+    predictions = model.predict(_task["X_val"])
+    if _task["metric"] == "error_rate":
+        error = float(np.mean(predictions != _task["y_val"]))
+    else:
+        error = float(np.mean(np.abs(predictions - _task["y_val"])))
+
+    return {
+        "params": params,
+        "rows": n_rows,
+        "error": error,
+        "fit_seconds": fit_seconds,
+        "latency_us": measure_latency(model, _task["X_val"]),
+    }
+
+
+def pareto_front(errors, latencies):
+    """
+    Find the configurations no other configuration beats on both objectives.
+
+    Args:
+        errors (array-like): Validation errors.
+        latencies (array-like): Prediction latencies.
+
+    Returns:
+        np.ndarray: Boolean mask of the Pareto-optimal entries.
+    """
+    errors = np.asarray(errors, dtype=float)
+    latencies = np.asarray(latencies, dtype=float)
+
+    # Walk from the fastest to the slowest; an entry is on the front if it
+    # is more accurate than everything faster
+    mask = np.zeros(len(errors), dtype=bool)
+    best_error = np.inf
+    for i in np.lexsort((errors, latencies)):
+        if errors[i] < best_error:
+            mask[i] = True
+            best_error = errors[i]
+    return mask
+
+
+def rung_budgets(n_train, n_configs, eta=3, min_rows=None):
+    """
+    Plan the training rows of each successive halving rung.
+
+    Args:
+        n_train (int): Training rows available.
+        n_configs (int): Configurations in the first rung.
+        eta (int): Factor by which rows grow and configurations shrink per rung.
+        min_rows (int, optional): Rows of the first rung. Defaults to the
+            rows that reach n_train after one rung per factor of eta in
+            n_configs.
+
+    Returns:
+        list: Increasing row counts, ending with n_train.
+    """
+    if eta < 2:
+        raise ValueError("eta must be at least 2")
+
+    n_rungs = 1 + int(math.log(max(n_configs, 1)) / math.log(eta) + 1e-9)
+    if min_rows is None:
+        min_rows = max(min(n_train, 30), n_train // eta ** (n_rungs - 1))
+
+    budgets = []
+    rows = min_rows
+    while rows < n_train and len(budgets) < n_rungs - 1:
+        budgets.append(rows)
+        rows *= eta
+    budgets.append(n_train)
+    return budgets
+
+
+def successive_halving(
+    task,
+    configs,
+    eta=3,
+    min_rows=None,
+    max_workers=None,
+    threads_per_worker=1,
+    baseline=None,
+):
+    """
+    Search configurations with successive halving, running trials in parallel.
+
+    After each rung the best 1/eta of the configurations by validation error
+    advance, together with every configuration on the error/latency Pareto
+    front, so small fast models are not discarded only for being less
+    accurate than large ones.
+
+    Args:
+        task (dict): Prepared task (see prepare_task).
+        configs (list): Configurations to search (see sample_configs).
+        eta (int): Factor by which rows grow and configurations shrink per rung.
+        min_rows (int, optional): Training rows of the first rung.
+        max_workers (int, optional): Worker processes; defaults to the number
+            of CPUs divided by threads_per_worker.
+        threads_per_worker (int): Native threads allowed per worker.
+        baseline (dict, optional): Configuration that advances through every
+            rung regardless of its scores, so it can be compared at the end.
+
+    Returns:
+        pd.DataFrame: One row per trial with the 'rung', 'rows', 'params',
+            'error', 'fit_seconds' and 'latency_us'.
+    """
+    budgets = rung_budgets(len(task["y_train"]), len(configs), eta, min_rows)
+    if max_workers is None:
+        max_workers = max(1, (os.cpu_count() or 1) // threads_per_worker)
+
+    trials = []
+    survivors = list(configs)
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_worker,
+        initargs=(task, threads_per_worker),
+    ) as pool:
+        for rung, n_rows in enumerate(budgets):
+            futures = [
+                pool.submit(run_trial, params, n_rows, threads_per_worker)
+                for params in survivors
+            ]
+            results = [dict(future.result(), rung=rung) for future in futures]
+            trials.extend(results)
+
+            if rung < len(budgets) - 1:
+                errors = np.array([result["error"] for result in results])
+                keep = pareto_front(
+                    errors, [result["latency_us"] for result in results]
+                )
+                keep[
+                    np.argsort(errors, kind="stable")[
+                        : max(1, math.ceil(len(results) / eta))
+                    ]
+                ] = True
+                keep |= np.array([result["params"] == baseline for result in results])
+                survivors = [
+                    result["params"] for result, kept in zip(results, keep) if kept
+                ]
+
+    return pd.DataFrame(
+        trials, columns=["rung", "rows", "params", "error", "fit_seconds", "latency_us"]
+    )
+
+
+def pareto_report(trials, baseline=None):
+    """
+    Summarize the configurations trained on all rows.
+
+    Args:
+        trials (pd.DataFrame): Trials as returned by successive_halving.
+        baseline (dict, optional): Configuration flagged in the 'baseline' column.
+
+    Returns:
+        pd.DataFrame: The final-rung trials sorted by latency, with one column
+            per hyperparameter and 'pareto' and 'baseline' flags.
+    """
+    final = trials[trials["rung"] == trials["rung"].max()].reset_index(drop=True)
+    params = pd.DataFrame(list(final["params"]), index=final.index)
+    report = pd.concat([params, final[["error", "latency_us", "fit_seconds"]]], axis=1)
+    report["pareto"] = pareto_front(report["error"], report["latency_us"])
+    report["baseline"] = [params == baseline for params in final["params"]]
+    report["params"] = final["params"]
+    return report.sort_values(["latency_us", "error"]).reset_index(drop=True)
+
+
+def select_config(report, max_error=None):
+    """
+    Pick the fastest configuration that meets an error target.
+
+    Args:
+        report (pd.DataFrame): Report as returned by pareto_report.
+        max_error (float, optional): Largest acceptable validation error.
+            Without it, the most accurate configuration is picked.
+
+    Returns:
+        dict: Hyperparameters of the picked configuration, or None if none
+            meets the target.
+    """
+    if max_error is None:
+        return report.loc[report["error"].idxmin(), "params"]
+
+    meeting = report[report["error"] <= max_error]
+    if meeting.empty:
+        return None
+    return meeting.loc[meeting["latency_us"].idxmin(), "params"]
+
+
+def tune(
+    task_name,
+    data,
+    n_configs=27,
+    eta=3,
+    space=None,
+    seed=0,
+    validation_fraction=0.2,
+    min_rows=None,
+    max_workers=None,
+    threads_per_worker=1,
+):
+    """
+    Tune the hyperparameters of one model.
+
+    Args:
+        task_name (str): 'price', 'project_classifier' or 'project_regressor'.
+        data (pd.DataFrame): Training data of the task (see prepare_task).
+        n_configs (int): Configurations to sample, including the defaults.
+        eta (int): Successive halving factor.
+        space (dict, optional): Candidate values per hyperparameter; defaults
+            to SEARCH_SPACES[task_name].
+        seed (int): Random seed for sampling configurations.
+        validation_fraction (float): Share of the rows held out for validation.
+        min_rows (int, optional): Training rows of the first rung.
+        max_workers (int, optional): Worker processes.
+        threads_per_worker (int): Native threads allowed per worker.
+
+    Returns:
+        dict: All 'trials', the Pareto 'report' of the final rung and the
+            current 'defaults' of the model, which are kept to the final rung
+            as the baseline.
+    """
+    task = prepare_task(task_name, data, validation_fraction)
+    space = space or SEARCH_SPACES[task_name]
+
+    model_params = task["model"].get_params()
+    defaults = {name: model_params[name] for name in space}
+    configs = sample_configs(space, n_configs, seed, include=defaults)
+
+    trials = successive_halving(
+        task, configs, eta, min_rows, max_workers, threads_per_worker, baseline=defaults
+    )
+    return {
+        "trials": trials,
+        "report": pareto_report(trials, baseline=defaults),
+        "defaults": defaults,
+    }
+
+
+def main():
+    """Run a hyperparameter search from the command line."""
+    parser = argparse.ArgumentParser(
+        description="Tune the hyperparameters of the AI models"
+    )
+    parser.add_argument(
+        "--task", required=True, choices=sorted(SEARCH_SPACES), help="Model to tune"
+    )
+    parser.add_argument(
+        "--data",
+        required=True,
+        help="CSV file with price history or project training data",
+    )
+    parser.add_argument(
+        "--credit-type", help="Tune on this credit type only (price task)"
+    )
+    parser.add_argument(
+        "--configs", type=int, default=27, help="Configurations to sample"
+    )
+    parser.add_argument("--eta", type=int, default=3, help="Successive halving factor")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument(
+        "--max-error", type=float, help="Error target for picking the fastest model"
+    )
+    parser.add_argument("--workers", type=int, help="Worker processes")
+    parser.add_argument(
+        "--threads-per-worker", type=int, default=1, help="Native threads per worker"
+    )
+    parser.add_argument("--output", help="CSV file for the report")
+    args = parser.parse_args()
+
+    if args.task == "price":
+        data = pd.read_csv(args.data, parse_dates=["date"])
+        if args.credit_type:
+            data = data[data["credit_type"] == args.credit_type].drop(
+                columns=["credit_type"]
+            )
+    else:
+        data = pd.read_csv(args.data)
+
+    result = tune(
+        args.task,
+        data,
+        n_configs=args.configs,
+        eta=args.eta,
+        seed=args.seed,
+        max_workers=args.workers,
+        threads_per_worker=args.threads_per_worker,
+    )
+    report = result["report"]
+
+    print(f"{len(result['trials'])} trials, {len(report)} trained on all rows")
+    print(report.drop(columns=["params"]).to_string(index=False))
+    print(f"Defaults: {result['defaults']}")
+    print(f"Selected: {select_config(report, args.max_error)}")
+    if args.output:
+        report.to_csv(args.output, index=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
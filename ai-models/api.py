@@ -12,7 +12,13 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 import os
 import json
+import math
+import threading
+import time
+import pandas as pd
 from price_prediction import CarbonPricePredictor
+from forecast_cache import ForecastCache
+from metrics import instrument_app, span
 import logging
 
 # Configure logging
@@ -29,6 +35,7 @@ logger = logging.getLogger(__name__)
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
+instrument_app(app)  # Request metrics, served at /metrics
 
 # Model paths
 MODEL_DIR = 'models'
@@ -37,38 +44,159 @@ PRICE_MODEL_PATH = os.path.join(MODEL_DIR, 'carbon_price_model.h5')
 # Ensure model directory exists
 os.makedirs(MODEL_DIR, exist_ok=True)
 
+# Model warm-up mode: 'background' loads in a thread at startup, 'eager'
+# loads before serving, 'lazy' starts the background load on first request
+MODEL_WARMUP = os.environ.get('MODEL_WARMUP', 'background')
+RETRY_AFTER_SECONDS = int(os.environ.get('MODEL_RETRY_AFTER', 10))
+
+# After a failed load, requests only start a new attempt once a backoff has
+# passed, doubling with every consecutive failure up to the maximum
+RETRY_BACKOFF_SECONDS = float(os.environ.get('MODEL_RETRY_BACKOFF', 30))
+RETRY_BACKOFF_MAX_SECONDS = float(os.environ.get('MODEL_RETRY_BACKOFF_MAX', 600))
+
 # Initialize price predictor
 price_predictor = None
+model_version = 0
+
+# Background loading state, guarded by model_lock
+model_lock = threading.Lock()
+model_status = 'not_loaded'  # not_loaded, loading, ready or failed
+model_error = None
+model_failures = 0  # Consecutive failed loads
+model_retry_at = 0.0  # time.monotonic() before which a failed load is not retried
+
+# Fine-tuning settings for new prices posted to /api/prices. Updates are
+# serialized so two batches of prices never train concurrently, and each one
+# fine-tunes a copy of the predictor that is swapped in when done, so
+# forecasts never run on weights that are being trained
+UPDATE_EPOCHS = int(os.environ.get('MODEL_UPDATE_EPOCHS', 5))
+update_lock = threading.Lock()
+
+# Cache of recent forecasts, cleared whenever data or the model is (re)loaded
+forecast_cache = ForecastCache(
+    max_entries=int(os.environ.get('FORECAST_CACHE_SIZE', 256)),
+    ttl_seconds=float(os.environ.get('FORECAST_CACHE_TTL', 300))
+)
 
 def load_price_predictor():
     """
     Load the price prediction model.
+    
+    The predictor is fully loaded (or trained) before it is published to
+    request handlers, so requests never see a half-initialized model.
     """
-    global price_predictor
+    global price_predictor, model_version, model_status, model_error, model_failures, model_retry_at
     
     try:
-        price_predictor = CarbonPricePredictor(model_path=PRICE_MODEL_PATH)
-        price_predictor.load_data()
+        predictor = CarbonPricePredictor(model_path=PRICE_MODEL_PATH)
+        predictor.load_data()
         
         # Check if model exists, if not, train a new one
         if not os.path.exists(PRICE_MODEL_PATH):
             logger.info("No price prediction model found. Training a new model...")
-            price_predictor.build_model()
-            price_predictor.train(epochs=20)  # Reduced epochs for faster startup
-            metrics = price_predictor.evaluate()
+            predictor.build_model()
+            predictor.train(epochs=20)  # Reduced epochs for faster startup
+            metrics = predictor.evaluate()
             logger.info(f"Model trained with metrics: {metrics}")
         else:
             # Load existing model
             from tensorflow.keras.models import load_model
-            price_predictor.build_model()
-            price_predictor.model = load_model(PRICE_MODEL_PATH)
+            predictor.build_model()
+            predictor.model = load_model(PRICE_MODEL_PATH)
             logger.info(f"Loaded price prediction model from {PRICE_MODEL_PATH}")
+        
+        with model_lock:
+            price_predictor = predictor
+            
+            # New data and model: earlier forecasts no longer apply
+            model_version += 1
+            forecast_cache.invalidate()
+            
+            model_status = 'ready'
+            model_error = None
+            model_failures = 0
             
         return True
     except Exception as e:
         logger.error(f"Error loading price predictor: {str(e)}")
+        with model_lock:
+            model_status = 'failed'
+            model_error = str(e)
+            model_failures += 1
+            backoff = min(RETRY_BACKOFF_MAX_SECONDS, RETRY_BACKOFF_SECONDS * 2 ** (model_failures - 1))
+            model_retry_at = time.monotonic() + backoff
         return False
 
+def start_model_loading(force=False):
+    """
+    Start loading the price predictor in a background thread.
+    
+    Single-flight: while a load is running or after it succeeded, further
+    calls do nothing. After a failed load, calls start a new attempt only
+    once the retry backoff has passed.
+    
+    Args:
+        force (bool): Whether to retry a failed load before its backoff ends.
+    
+    Returns:
+        bool: True if a new load was started, False otherwise.
+    """
+    global model_status
+    
+    with model_lock:
+        if model_status in ('loading', 'ready'):
+            return False
+        if model_status == 'failed' and not force and time.monotonic() < model_retry_at:
+            return False
+        model_status = 'loading'
+    
+    thread = threading.Thread(target=load_price_predictor, name='model-loader', daemon=True)
+    thread.start()
+    return True
+
+def warm_up(mode=None):
+    """
+    Prepare the models according to the warm-up mode.
+    
+    Args:
+        mode (str, optional): 'background', 'eager' or 'lazy'. Defaults to
+            the MODEL_WARMUP environment variable.
+    """
+    global model_status
+    
+    mode = mode or MODEL_WARMUP
+    if mode == 'eager':
+        with model_lock:
+            model_status = 'loading'
+        load_price_predictor()
+    elif mode == 'background':
+        start_model_loading()
+
+def not_ready_response():
+    """
+    Build the 503 response returned while the model is loading.
+    
+    After a failed load, Retry-After is the time left until requests start
+    a new attempt.
+    """
+    with model_lock:
+        status, error = model_status, model_error
+        retry_after = RETRY_AFTER_SECONDS
+        if status == 'failed':
+            retry_after = max(1, math.ceil(model_retry_at - time.monotonic()))
+    
+    body = {
+        'status': 'error',
+        'message': 'Price prediction model is not ready yet',
+        'model_status': status
+    }
+    if error:
+        body['error'] = error
+    
+    response = jsonify(body)
+    response.headers['Retry-After'] = str(retry_after)
+    return response, 503
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """
@@ -79,6 +207,23 @@ def health_check():
         'message': 'CarbonSol AI API is running'
     })
 
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    """
+    Readiness endpoint: 200 once the models can serve predictions, 503 before.
+    """
+    with model_lock:
+        status = model_status
+    
+    if status != 'ready':
+        return not_ready_response()
+    
+    return jsonify({
+        'status': 'ok',
+        'model_status': status,
+        'model_version': model_version
+    })
+
 @app.route('/api/predict/price', methods=['GET'])
 def predict_price():
     """
@@ -106,33 +251,120 @@ def predict_price():
                 'message': 'Token parameter must be either CST or VCU'
             }), 400
         
-        # Ensure price predictor is loaded
-        if price_predictor is None:
-            success = load_price_predictor()
-            if not success:
-                return jsonify({
-                    'status': 'error',
-                    'message': 'Failed to load price prediction model'
-                }), 500
+        # Serve only once the price predictor is loaded; start loading it in
+        # the background if that has not happened yet (or failed)
+        with model_lock:
+            predictor, version = price_predictor, model_version
+        if predictor is None:
+            start_model_loading()
+            return not_ready_response()
         
-        # Get predictions
-        predictions = price_predictor.predict_future(days=days)
+        # Reuse a cached forecast for the same inputs covering at least `days`
+        cache_key = forecast_cache.make_key(
+            token=token,
+            last_date=predictor.data['Date'].iloc[-1],
+            model_version=version
+        )
+        predictions = forecast_cache.get(cache_key, days)
+        
+        if predictions is None:
+            # Get predictions
+            with span('inference'):
+                predictions = predictor.predict_future(days=days)
+            forecast_cache.put(cache_key, days, predictions)
         
         # Add token information
         predictions['token'] = token
         
+        with span('serialize'):
+            response = jsonify({
+                'status': 'success',
+                'data': predictions
+            })
+        return response
+        
+    except Exception as e:
+        logger.error(f"Error in price prediction: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        }), 500
+
+@app.route('/api/prices', methods=['POST'])
+def add_prices():
+    """
+    Add newly arrived prices and fine-tune the model on them.
+    
+    Request body:
+    - prices: List of {"date": "YYYY-MM-DD", "price": float}
+    """
+    global price_predictor, model_version
+    
+    try:
+        with span('parse'):
+            data = request.json
+        if not data or 'prices' not in data:
+            return jsonify({
+                'status': 'error',
+                'message': 'Missing required parameter: prices'
+            }), 400
+        
+        with model_lock:
+            predictor = price_predictor
+        if predictor is None:
+            start_model_loading()
+            return not_ready_response()
+        
+        new_prices = pd.DataFrame(data['prices']).rename(columns={'date': 'Date', 'price': 'Price'})
+        
+        with update_lock, span('update'):
+            # Fine-tune a copy of the latest predictor; the published one
+            # keeps serving forecasts until the copy replaces it
+            with model_lock:
+                predictor = price_predictor
+            candidate = predictor.copy()
+            added = candidate.update(new_prices, epochs=UPDATE_EPOCHS)
+            
+            with model_lock:
+                if price_predictor is not predictor:
+                    return jsonify({
+                        'status': 'error',
+                        'message': 'The model was reloaded during the update; retry'
+                    }), 409
+                
+                # New prices and weights: earlier forecasts no longer apply
+                if added:
+                    price_predictor = candidate
+                    model_version += 1
+                    forecast_cache.invalidate()
+                    # Checkpoint only the published weights, before a reload can read them
+                    if candidate.model_path:
+                        candidate.save_model()
+                version = model_version
+        
         return jsonify({
             'status': 'success',
-            'data': predictions
+            'added': added,
+            'model_version': version
         })
         
     except Exception as e:
-        logger.error(f"Error in price prediction: {str(e)}")
+        logger.error(f"Error adding prices: {str(e)}")
         return jsonify({
             'status': 'error',
             'message': str(e)
         }), 500
 
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """
+    Forecast cache hit/miss counters.
+    """
+    return jsonify({
+        'status': 'success',
+        'data': forecast_cache.stats()
+    })
+
 @app.route('/api/analyze/project', methods=['POST'])
 def analyze_project():
     """
@@ -339,8 +571,8 @@ def calculate_footprint():
         }), 500
 
 if __name__ == '__main__':
-    # Load price predictor on startup
-    load_price_predictor()
+    # Load price predictor according to MODEL_WARMUP
+    warm_up()
     
     # Run the Flask app
     app.run(host='0.0.0.0', port=5000, debug=True) 
\ No newline at end of file
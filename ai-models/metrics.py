@@ -0,0 +1,542 @@
+"""
+Request and Model Timing Metrics
+
+This module keeps in-process counters, gauges and histograms and renders
+them in the Prometheus text exposition format, so an API can serve them at
+/metrics for scraping. It provides:
+
+- instrument_app(app): Flask middleware recording per-endpoint request
+  latency, request and response sizes, status codes and in-flight requests,
+  and adding the /metrics endpoint.
+- span(name) and timed(name): a perf_counter based timer for phases of work
+  (parsing, feature preparation, inference, serialization), as a context
+  manager or a function decorator. Spans nest: a span opened inside another
+  is recorded as 'outer/inner'.
+
+Only the standard library is used, so models can time themselves without
+adding an import cost or a dependency.
+"""
+
+import bisect
+import contextvars
+import functools
+import threading
+import time
+
+# Latency buckets in seconds, from 1 ms to 10 s
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+# Payload size buckets in bytes, from 100 B to 10 MB
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    """
+    Escape a label value for the text exposition format.
+
+    Args:
+        value: Label value.
+
+    Returns:
+        str: The escaped value.
+    """
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels):
+    """
+    Format label pairs as '{name="value",...}'.
+
+    Args:
+        labels (list): (name, value) pairs.
+
+    Returns:
+        str: The formatted labels, or '' without labels.
+    """
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value):
+    """
+    Format a sample value.
+
+    Args:
+        value (float): Sample value.
+
+    Returns:
+        str: The formatted value.
+    """
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    """Base class for metrics with a fixed set of label names."""
+
+    metric_type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        """
+        Initialize the metric.
+
+        Args:
+            name (str): Metric name.
+            documentation (str): Help text.
+            labelnames (tuple): Names of the labels every sample has.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._labelset = frozenset(self.labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        """
+        Turn keyword labels into the key of a labelled series.
+
+        Args:
+            labels (dict): Label values keyed by label name.
+
+        Returns:
+            tuple: Label values in labelnames order.
+        """
+        if labels.keys() != self._labelset:
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self):
+        """
+        Get the metric's samples.
+
+        Returns:
+            list: (sample name, label pairs, value) tuples.
+        """
+        raise NotImplementedError
+
+    def render(self):
+        """
+        Render the metric in the text exposition format.
+
+        Returns:
+            str: HELP and TYPE lines followed by one line per sample.
+        """
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        for sample_name, labels, value in self.samples():
+            lines.append(
+                f"{sample_name}{_format_labels(labels)} {_format_value(value)}"
+            )
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """A monotonically increasing count."""
+
+    metric_type = "counter"
+
+    def inc(self, amount=1, **labels):
+        """
+        Increase the counter.
+
+        Args:
+            amount (float): Amount to add; must not be negative.
+            **labels: Label values.
+        """
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        """
+        Get the current count.
+
+        Args:
+            **labels: Label values.
+
+        Returns:
+            float: The count, 0 for a series never increased.
+        """
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            (self.name, list(zip(self.labelnames, key)), value) for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """A value that can go up and down."""
+
+    metric_type = "gauge"
+
+    def inc(self, amount=1, **labels):
+        """
+        Increase the gauge.
+
+        Args:
+            amount (float): Amount to add.
+            **labels: Label values.
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        """
+        Decrease the gauge.
+
+        Args:
+            amount (float): Amount to subtract.
+            **labels: Label values.
+        """
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        """
+        Set the gauge.
+
+        Args:
+            value (float): New value.
+            **labels: Label values.
+        """
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels):
+        """
+        Get the current value.
+
+        Args:
+            **labels: Label values.
+
+        Returns:
+            float: The value, 0 for a series never set.
+        """
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            (self.name, list(zip(self.labelnames, key)), value) for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    """Observations counted into cumulative buckets, with their sum and count."""
+
+    metric_type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """
+        Initialize the histogram.
+
+        Args:
+            name (str): Metric name.
+            documentation (str): Help text.
+            labelnames (tuple): Names of the labels every sample has.
+            buckets (tuple): Increasing upper bounds; +Inf is added.
+        """
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        """
+        Record an observation.
+
+        Args:
+            value (float): Observed value, e.g. a duration in seconds.
+            **labels: Label values.
+        """
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                # Per-bucket counts (last is +Inf), sum of observations
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, **labels):
+        """
+        Get the number of observations.
+
+        Args:
+            **labels: Label values.
+
+        Returns:
+            int: The number of observations.
+        """
+        series = self._values.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def samples(self):
+        with self._lock:
+            items = sorted(
+                (key, (list(counts), total))
+                for key, (counts, total) in self._values.items()
+            )
+
+        samples = []
+        for key, (counts, total) in items:
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                samples.append(
+                    (
+                        f"{self.name}_bucket",
+                        labels + [("le", _format_value(float(bound)))],
+                        cumulative,
+                    )
+                )
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    """A named collection of metrics rendered together."""
+
+    def __init__(self):
+        """Initialize an empty registry."""
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric_class, name, *args, **kwargs):
+        """
+        Get a registered metric, or create and register it.
+
+        Args:
+            metric_class (type): Counter, Gauge or Histogram.
+            name (str): Metric name.
+            *args: Further constructor arguments.
+            **kwargs: Further constructor keyword arguments.
+
+        Returns:
+            _Metric: The metric.
+        """
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = metric_class(name, *args, **kwargs)
+            elif not isinstance(metric, metric_class):
+                raise ValueError(
+                    f"Metric {name} is already registered as a {metric.metric_type}"
+                )
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        """Get or create a Counter."""
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        """Get or create a Gauge."""
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        """Get or create a Histogram."""
+        return self._register(
+            Histogram, name, documentation, labelnames, buckets=buckets
+        )
+
+    def render(self):
+        """
+        Render all metrics in the text exposition format.
+
+        Returns:
+            str: The exposition text.
+        """
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+# Registry shared by the API and the models of this process
+REGISTRY = MetricsRegistry()
+
+SPAN_DURATION = REGISTRY.histogram(
+    "carbonsol_span_duration_seconds",
+    "Duration of timed phases of work, nested spans joined by /",
+    ["span"],
+)
+
+# Path of the innermost open span in the current thread or task
+_current_span = contextvars.ContextVar("carbonsol_span", default=None)
+
+
+class span:
+    """
+    Time a phase of work with time.perf_counter.
+
+    Use as a context manager; the duration is recorded in
+    carbonsol_span_duration_seconds under the span's path:
+
+        with span('PricePredictor.predict'):
+            with span('features'):      # recorded as 'PricePredictor.predict/features'
+                ...
+    """
+
+    __slots__ = ("name", "path", "duration", "_start", "_token")
+
+    def __init__(self, name):
+        """
+        Initialize the span.
+
+        Args:
+            name (str): Name of the phase.
+        """
+        self.name = name
+        self.path = None
+        self.duration = None
+
+    def __enter__(self):
+        parent = _current_span.get()
+        self.path = f"{parent}/{self.name}" if parent else self.name
+        self._token = _current_span.set(self.path)
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.duration = time.perf_counter() - self._start
+        _current_span.reset(self._token)
+        SPAN_DURATION.observe(self.duration, span=self.path)
+        return False
+
+
+def timed(name):
+    """
+    Decorate a function so every call is timed as a span.
+
+    Args:
+        name (str): Name of the span.
+
+    Returns:
+        callable: The decorator.
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def instrument_app(app, registry=REGISTRY, prefix="carbonsol_http"):
+    """
+    Record request metrics for a Flask app and serve them at /metrics.
+
+    Request durations, sizes and status codes are recorded per endpoint
+    (the view function name), so URLs with parameters do not create new
+    series. Spans opened while handling a request are nested under the
+    endpoint name.
+
+    Args:
+        app (flask.Flask): The app to instrument.
+        registry (MetricsRegistry): Registry to record into and render.
+        prefix (str): Prefix of the request metric names.
+
+    Returns:
+        flask.Flask: The instrumented app.
+    """
+    from flask import Response, g, request
+
+    requests_total = registry.counter(
+        f"{prefix}_requests_total",
+        "HTTP requests by endpoint, method and status",
+        ["endpoint", "method", "status"],
+    )
+    duration = registry.histogram(
+        f"{prefix}_request_duration_seconds",
+        "HTTP request latency",
+        ["endpoint", "method"],
+    )
+    request_size = registry.histogram(
+        f"{prefix}_request_size_bytes",
+        "HTTP request body size",
+        ["endpoint"],
+        buckets=SIZE_BUCKETS,
+    )
+    response_size = registry.histogram(
+        f"{prefix}_response_size_bytes",
+        "HTTP response body size",
+        ["endpoint"],
+        buckets=SIZE_BUCKETS,
+    )
+    in_flight = registry.gauge(
+        f"{prefix}_requests_in_flight", "HTTP requests being handled", ["endpoint"]
+    )
+
+    @app.before_request
+    def _start_request_metrics():
+        endpoint = request.endpoint or "unmatched"
+        g._metrics_endpoint = endpoint
+        g._metrics_start = time.perf_counter()
+        g._metrics_span_token = _current_span.set(endpoint)
+        in_flight.inc(endpoint=endpoint)
+        request_size.observe(request.content_length or 0, endpoint=endpoint)
+
+    @app.after_request
+    def _record_request_metrics(response):
+        endpoint = g.get("_metrics_endpoint")
+        if endpoint is not None:
+            duration.observe(
+                time.perf_counter() - g._metrics_start,
+                endpoint=endpoint,
+                method=request.method,
+            )
+            requests_total.inc(
+                endpoint=endpoint, method=request.method, status=response.status_code
+            )
+            response_size.observe(
+                response.calculate_content_length() or 0, endpoint=endpoint
+            )
+        return response
+
+    @app.teardown_request
+    def _finish_request_metrics(exc=None):
+        endpoint = g.pop("_metrics_endpoint", None)
+        if endpoint is not None:
+            in_flight.dec(endpoint=endpoint)
+            _current_span.reset(g.pop("_metrics_span_token"))
+
+    @app.route("/metrics", methods=["GET"])
+    def metrics():
+        """Metrics in the Prometheus text exposition format"""
+        return Response(registry.render(), content_type=CONTENT_TYPE)
+
+    return app
@@ -10,16 +10,14 @@ It uses historical price data to forecast future price movements.
 
 import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
-from sklearn.preprocessing import MinMaxScaler
-from sklearn.metrics import mean_squared_error, mean_absolute_error
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Dense, LSTM, Dropout
+import copy
 import json
 import os
 import argparse
 from datetime import datetime, timedelta
 
+from price_store import PriceStore, read_prices
+
 # Set random seed for reproducibility
 np.random.seed(42)
 
@@ -28,31 +26,74 @@ class CarbonPricePredictor:
     A class for predicting carbon credit prices using LSTM neural networks.
     """
     
-    def __init__(self, data_path=None, model_path=None):
+    def __init__(self, data_path=None, model_path=None, feature_dtype='float64'):
         """
         Initialize the predictor with data and model paths.
         
         Args:
             data_path (str): Path to historical price data CSV file
             model_path (str): Path to save/load the trained model
+            feature_dtype (str): 'float64', or 'float32' to keep the scaled
+                series in the dtype the LSTM computes in, which halves its
+                memory and spares Keras the float64 to float32 conversion
+                of the training windows
         """
+        if np.dtype(feature_dtype).name not in ('float64', 'float32'):
+            raise ValueError(f"feature_dtype must be 'float64' or 'float32', not {feature_dtype}")
+        
         self.data_path = data_path
         self.model_path = model_path
         self.model = None
+        # Heavy dependencies (scikit-learn, TensorFlow, matplotlib) are imported
+        # in the methods that need them, so importing this module stays cheap
+        from sklearn.preprocessing import MinMaxScaler
+        
         self.scaler = MinMaxScaler(feature_range=(0, 1))
         self.data = None
         self.scaled_data = None
         self.train_data = None
         self.test_data = None
         self.look_back = 60  # Number of previous days to use for prediction
+        self.model_version = 0  # Bumped whenever the model weights change
+        self.feature_dtype = np.dtype(feature_dtype)
+        self._inference_fns = {}
+        self._inference_model = None
         
-    def load_data(self):
+    def load_data(self, store_path=None, chunksize=100000, history_days=None):
         """
         Load and preprocess historical price data.
+        
+        Args:
+            store_path (str, optional): Directory of a PriceStore. When given,
+                the data file is ingested into the store in chunks, only rows
+                appended since the previous load are read from it, and the
+                scaler is set from the store's min/max.
+            chunksize (int): Rows per chunk when ingesting CSV files.
+            history_days (int, optional): With a store, only read the most
+                recent days of history, e.g. enough to cover the look-back
+                window when only forecasting. The scaler still covers the
+                whole stored history.
         """
-        if self.data_path and os.path.exists(self.data_path):
-            # Load real data if available
-            self.data = pd.read_csv(self.data_path)
+        use_store = bool(store_path and self.data_path and os.path.exists(self.data_path))
+        
+        if use_store:
+            # Ingest new rows (CSV or Parquet) and read the date-sorted store
+            store = PriceStore(store_path)
+            added = store.ingest(self.data_path, chunksize=chunksize)
+            print(f"Ingested {added} new records into {store_path}")
+            since = None
+            if history_days is not None and store.last_date() is not None:
+                since = store.last_date() - pd.Timedelta(days=history_days)
+            self.data = store.read(since=since)
+            
+            # A MinMaxScaler depends only on the min and max, and the store
+            # keeps the range of its deduplicated history, so fitting on it
+            # matches fitting on the whole history
+            price_min, price_max = store.price_range()
+            self.scaler.fit(np.array([[price_min], [price_max]]))
+        elif self.data_path and os.path.exists(self.data_path):
+            # Load real data if available (CSV or Parquet, date and price only)
+            self.data = read_prices(self.data_path)
         else:
             # Generate synthetic data for demonstration
             print("No data file found. Generating synthetic data...")
@@ -72,17 +113,21 @@ class CarbonPricePredictor:
                 'Price': prices
             })
             
-            # Save synthetic data
-            if not os.path.exists('data'):
-                os.makedirs('data')
-            self.data.to_csv('data/synthetic_carbon_prices.csv', index=False)
+            # Save synthetic data once, as an example input file
+            if not os.path.exists('data/synthetic_carbon_prices.csv'):
+                os.makedirs('data', exist_ok=True)
+                self.data.to_csv('data/synthetic_carbon_prices.csv', index=False)
             
-        # Ensure data is sorted by date
-        self.data['Date'] = pd.to_datetime(self.data['Date'])
-        self.data = self.data.sort_values('Date')
-        
-        # Scale the data
-        self.scaled_data = self.scaler.fit_transform(self.data['Price'].values.reshape(-1, 1))
+        if use_store:
+            # The store is already date-sorted and the scaler fitted
+            self.scaled_data = self.scaler.transform(self._price_column(self.data))
+        else:
+            # Ensure data is sorted by date
+            self.data['Date'] = pd.to_datetime(self.data['Date'])
+            self.data = self.data.sort_values('Date')
+            
+            # Scale the data
+            self.scaled_data = self.scaler.fit_transform(self._price_column(self.data))
         
         # Split into training and testing sets (80% train, 20% test)
         train_size = int(len(self.scaled_data) * 0.8)
@@ -93,6 +138,21 @@ class CarbonPricePredictor:
         print(f"Training data: {len(self.train_data)} records")
         print(f"Testing data: {len(self.test_data)} records")
         
+    def _price_column(self, data):
+        """
+        Get the prices as a column in the feature dtype.
+        
+        The scaler keeps float32 input in float32, so the scaled series and
+        the windows built from it stay in the feature dtype.
+        
+        Args:
+            data (pd.DataFrame): Data with a Price column
+            
+        Returns:
+            numpy.array: Prices of shape (n, 1)
+        """
+        return data['Price'].to_numpy(dtype=self.feature_dtype).reshape(-1, 1)
+    
     def create_dataset(self, data, look_back=60):
         """
         Create a dataset with look_back time steps.
@@ -104,16 +164,56 @@ class CarbonPricePredictor:
         Returns:
             tuple: (X, y) where X is the input features and y is the target values
         """
-        X, y = [], []
-        for i in range(len(data) - look_back):
-            X.append(data[i:(i + look_back), 0])
-            y.append(data[i + look_back, 0])
-        return np.array(X), np.array(y)
+        series = np.asarray(data)[:, 0]
+        if len(series) <= look_back:
+            return np.empty((0, look_back), dtype=series.dtype), np.empty(0, dtype=series.dtype)
+        
+        # Strided read-only view: row i is series[i:i + look_back], no copy
+        X = np.lib.stride_tricks.sliding_window_view(series[:-1], look_back)
+        y = series[look_back:]
+        return X, y
+    
+    def create_streaming_dataset(self, data, look_back=60, batch_size=32, shuffle=False):
+        """
+        Create a tf.data dataset that builds look_back windows batch by batch.
+        
+        Unlike create_dataset followed by Model.fit, the full window matrix is
+        never materialized, so memory stays proportional to the series length.
+        
+        Args:
+            data (numpy.array): The scaled price data
+            look_back (int): Number of previous time steps to use as input features
+            batch_size (int): Number of windows per batch
+            shuffle (bool): Whether to shuffle the window order
+            
+        Returns:
+            tf.data.Dataset: Batches of (X, y) with X shaped (batch, look_back, 1)
+        """
+        import tensorflow as tf
+        
+        # Exported under keras.utils from TensorFlow 2.9; older releases (such
+        # as the 2.6 the CarbonSol models pin) only have the preprocessing one
+        timeseries_dataset_from_array = getattr(tf.keras.utils, 'timeseries_dataset_from_array', None)
+        if timeseries_dataset_from_array is None:
+            timeseries_dataset_from_array = tf.keras.preprocessing.timeseries_dataset_from_array
+        
+        series = np.asarray(data, dtype=np.float32)[:, :1]
+        return timeseries_dataset_from_array(
+            series[:-1],
+            targets=series[look_back:, 0],
+            sequence_length=look_back,
+            batch_size=batch_size,
+            shuffle=shuffle,
+            seed=42
+        )
     
     def build_model(self):
         """
         Build and compile the LSTM model.
         """
+        from tensorflow.keras.models import Sequential
+        from tensorflow.keras.layers import Dense, LSTM, Dropout
+        
         # Create and compile the LSTM model
         model = Sequential()
         model.add(LSTM(units=50, return_sequences=True, input_shape=(self.look_back, 1)))
@@ -127,40 +227,154 @@ class CarbonPricePredictor:
         
         print("LSTM model built and compiled")
         
-    def train(self, epochs=50, batch_size=32):
+    def train(self, epochs=50, batch_size=32, streaming=False):
         """
         Train the LSTM model.
         
         Args:
             epochs (int): Number of training epochs
             batch_size (int): Batch size for training
+            streaming (bool): Build training windows on the fly with tf.data
+                instead of materializing the full window matrix
         """
         if self.model is None:
             self.build_model()
             
-        # Prepare the training data
-        X_train, y_train = self.create_dataset(self.train_data, self.look_back)
-        X_train = np.reshape(X_train, (X_train.shape[0], X_train.shape[1], 1))
-        
-        # Train the model
-        history = self.model.fit(
-            X_train, y_train,
-            epochs=epochs,
-            batch_size=batch_size,
-            validation_split=0.1,
-            verbose=1
-        )
+        if streaming:
+            # Hold out the last 10% of windows for validation, as validation_split does
+            n_windows = len(self.train_data) - self.look_back
+            split = int(np.floor(n_windows * 0.9))
+            train_dataset = self.create_streaming_dataset(
+                self.train_data[:split + self.look_back],
+                self.look_back, batch_size, shuffle=True
+            )
+            validation_dataset = self.create_streaming_dataset(
+                self.train_data[split:], self.look_back, batch_size
+            )
+            
+            # Train the model
+            history = self.model.fit(
+                train_dataset,
+                epochs=epochs,
+                validation_data=validation_dataset,
+                verbose=1
+            )
+        else:
+            # Prepare the training data
+            X_train, y_train = self.create_dataset(self.train_data, self.look_back)
+            X_train = X_train[:, :, np.newaxis]
+            
+            # Train the model
+            history = self.model.fit(
+                X_train, y_train,
+                epochs=epochs,
+                batch_size=batch_size,
+                validation_split=0.1,
+                verbose=1
+            )
         
         # Save the model
         if self.model_path:
-            model_dir = os.path.dirname(self.model_path)
-            if not os.path.exists(model_dir):
-                os.makedirs(model_dir)
-            self.model.save(self.model_path)
+            self.save_model()
             print(f"Model saved to {self.model_path}")
-            
+        
+        self.model_version += 1
         return history
     
+    def save_model(self):
+        """
+        Save the model to model_path, the checkpoint later runs start from.
+        """
+        model_dir = os.path.dirname(self.model_path)
+        if model_dir and not os.path.exists(model_dir):
+            os.makedirs(model_dir)
+        self.model.save(self.model_path)
+    
+    def copy(self):
+        """
+        Copy the predictor so that the copy can be fine-tuned while the
+        original keeps serving forecasts.
+        
+        The model is cloned with its current weights and a fresh optimizer of
+        the same configuration. Data and scaler are shared, since update()
+        replaces rather than modifies them.
+        
+        Returns:
+            CarbonPricePredictor: The copy.
+        """
+        clone = copy.copy(self)
+        clone._inference_fns = {}
+        clone._inference_model = None
+        
+        if self.model is not None:
+            import tensorflow as tf
+            
+            model = tf.keras.models.clone_model(self.model)
+            model.set_weights(self.model.get_weights())
+            optimizer = self.model.optimizer
+            model.compile(
+                optimizer=optimizer.__class__.from_config(optimizer.get_config()),
+                loss=self.model.loss
+            )
+            clone.model = model
+        
+        return clone
+    
+    def update(self, new_data, epochs=5, batch_size=32):
+        """
+        Fine-tune the model on newly arrived prices.
+        
+        Instead of retraining on the full history, training continues from the
+        current weights (e.g. the last saved checkpoint) on the windows whose
+        target is a new price, plus the most recent earlier windows to fill at
+        least one batch, so a single new price is not fitted on its own. The
+        scaler is kept as fitted, so the new prices are scaled like the data
+        the model was trained on.
+        
+        The model is trained in place; to keep serving forecasts meanwhile,
+        update a copy() and swap it in. The fine-tuned weights are not saved:
+        call save_model() once the updated predictor is the one in use.
+        
+        Args:
+            new_data (pd.DataFrame): New prices with Date and Price columns;
+                rows not later than the loaded data are ignored.
+            epochs (int): Number of fine-tuning epochs
+            batch_size (int): Batch size for fine-tuning
+            
+        Returns:
+            int: Number of new prices added.
+        """
+        if self.model is None:
+            raise ValueError("Model not built. Train or load a model first.")
+        
+        new_data = new_data[['Date', 'Price']].copy()
+        new_data['Date'] = pd.to_datetime(new_data['Date'])
+        new_data = new_data[new_data['Date'] > self.data['Date'].iloc[-1]].sort_values('Date')
+        if new_data.empty:
+            return 0
+        
+        scaled_new = self.scaler.transform(self._price_column(new_data))
+        scaled_data = np.vstack([self.scaled_data, scaled_new])
+        
+        # Windows ending in a new price, topped up with the latest earlier
+        # windows, each with its look_back history
+        n_windows = min(len(scaled_data) - self.look_back, max(len(new_data), batch_size))
+        recent = scaled_data[-(n_windows + self.look_back):]
+        X_new, y_new = self.create_dataset(recent, self.look_back)
+        self.model.fit(
+            X_new[:, :, np.newaxis], y_new,
+            epochs=epochs,
+            batch_size=batch_size,
+            verbose=0
+        )
+        
+        # Publish the new prices only once the model has learned them
+        self.data = pd.concat([self.data, new_data], ignore_index=True)
+        self.scaled_data = scaled_data
+        
+        self.model_version += 1
+        return len(new_data)
+    
     def evaluate(self):
         """
         Evaluate the model on the test data.
@@ -168,6 +382,8 @@ class CarbonPricePredictor:
         Returns:
             dict: Evaluation metrics
         """
+        from sklearn.metrics import mean_squared_error, mean_absolute_error
+        
         # Prepare the test data
         X_test, y_test = self.create_dataset(self.test_data, self.look_back)
         X_test = np.reshape(X_test, (X_test.shape[0], X_test.shape[1], 1))
@@ -197,6 +413,75 @@ class CarbonPricePredictor:
         
         return metrics
     
+    def _get_inference_fn(self, dropout=False):
+        """
+        Get a compiled forward pass for the current model.
+        
+        Calling the model through a tf.function avoids the per-call overhead
+        of Model.predict (batching, callbacks, data adapters), which dominates
+        when forecasting one step at a time. The function is traced once for
+        any batch size and rebuilt if the model is replaced.
+        
+        Args:
+            dropout (bool): Whether to keep the dropout layers active (Monte
+                Carlo dropout), so every call samples a thinned network.
+        
+        Returns:
+            tf.function: Function mapping a (batch, look_back, 1) window to
+                a (batch, 1) prediction.
+        """
+        if self._inference_model is not self.model:
+            self._inference_fns = {}
+            self._inference_model = self.model
+            
+        if dropout not in self._inference_fns:
+            import tensorflow as tf
+            
+            model = self.model
+            
+            @tf.function(input_signature=[
+                tf.TensorSpec(shape=[None, self.look_back, 1], dtype=tf.float32)
+            ])
+            def infer(window):
+                return model(window, training=dropout)
+            
+            self._inference_fns[dropout] = infer
+            
+        return self._inference_fns[dropout]
+    
+    def _forecast_scaled(self, windows, days, noise=None, dropout=False):
+        """
+        Forecast several scaled series at once.
+        
+        All series are advanced together, one model call per day. The windows
+        live in a preallocated buffer that the forecast is written into, so
+        sliding a window forward is just a view offset.
+        
+        Args:
+            windows (numpy.array): Scaled input windows of shape (n_series, look_back)
+            days (int): Number of days to predict into the future
+            noise (numpy.array, optional): Scaled noise of shape (n_series, days)
+                added to each day's prediction before it is fed back
+            dropout (bool): Whether to sample the network with Monte Carlo dropout
+            
+        Returns:
+            numpy.array: Scaled predictions of shape (n_series, days)
+        """
+        windows = np.asarray(windows, dtype=np.float32).reshape(-1, self.look_back)
+        n_series = windows.shape[0]
+        
+        buffer = np.empty((n_series, self.look_back + days, 1), dtype=np.float32)
+        buffer[:, :self.look_back, 0] = windows
+        
+        infer = self._get_inference_fn(dropout)
+        for step in range(days):
+            next_values = infer(buffer[:, step:step + self.look_back]).numpy()
+            if noise is not None:
+                next_values = next_values + noise[:, step:step + 1]
+            buffer[:, self.look_back + step] = next_values
+            
+        return buffer[:, self.look_back:, 0]
+    
     def predict_future(self, days=30):
         """
         Predict future prices for the specified number of days.
@@ -207,25 +492,12 @@ class CarbonPricePredictor:
         Returns:
             dict: Predicted prices with dates
         """
-        # Get the last sequence of known prices
-        last_sequence = self.scaled_data[-self.look_back:].reshape(1, self.look_back, 1)
-        
-        # Initialize the list of predictions
-        future_predictions = []
-        current_sequence = last_sequence[0].tolist()
-        
-        # Predict prices for the next 'days'
-        for _ in range(days):
-            # Get the prediction for the next day
-            next_pred = self.model.predict(np.array([current_sequence]))
-            future_predictions.append(next_pred[0, 0])
-            
-            # Update the sequence by removing the first value and adding the new prediction
-            current_sequence.pop(0)
-            current_sequence.append([next_pred[0, 0]])
+        # Forecast from the last sequence of known prices
+        last_sequence = self.scaled_data[-self.look_back:].reshape(1, self.look_back)
+        future_predictions = self._forecast_scaled(last_sequence, days)
         
         # Inverse transform the predictions
-        future_predictions = self.scaler.inverse_transform(np.array(future_predictions).reshape(-1, 1))
+        future_predictions = self.scaler.inverse_transform(future_predictions.reshape(-1, 1))
         
         # Generate future dates
         last_date = self.data['Date'].iloc[-1]
@@ -239,6 +511,101 @@ class CarbonPricePredictor:
         
         return predictions
     
+    def predict_future_batch(self, price_series, days=30):
+        """
+        Predict future prices for many independent series in one batched run.
+        
+        Useful for forecasting several tokens (e.g. CST and VCU) or scenarios
+        at once: each day costs one model call regardless of the number of series.
+        
+        Args:
+            price_series (list): Price histories (unscaled), each with at least
+                look_back values. Only the last look_back values are used.
+            days (int): Number of days to predict into the future
+            
+        Returns:
+            numpy.array: Predicted prices of shape (n_series, days)
+        """
+        windows = []
+        for prices in price_series:
+            prices = np.asarray(prices, dtype=float)
+            if len(prices) < self.look_back:
+                raise ValueError(
+                    f"Each series needs at least {self.look_back} prices, got {len(prices)}"
+                )
+            windows.append(prices[-self.look_back:])
+            
+        # Scale all windows with the fitted scaler in one call
+        windows = np.array(windows)
+        scaled_windows = self.scaler.transform(windows.reshape(-1, 1)).reshape(windows.shape)
+        
+        scaled_predictions = self._forecast_scaled(scaled_windows, days)
+        predictions = self.scaler.inverse_transform(scaled_predictions.reshape(-1, 1))
+        
+        return predictions.reshape(scaled_predictions.shape)
+    
+    def predict_future_scenarios(self, days=30, n_scenarios=1000, quantiles=(0.1, 0.5, 0.9),
+                                 noise=None, dropout=True, seed=None):
+        """
+        Predict price bands over many sampled future paths.
+        
+        Every path starts from the last look_back known prices. Each day's
+        prediction gets Gaussian noise before it is fed back, and with
+        dropout the network is sampled with Monte Carlo dropout, so paths also
+        differ by model uncertainty. All paths run as one batch through the
+        compiled forward pass: each day is one model call.
+        
+        Args:
+            days (int): Number of days to predict into the future
+            n_scenarios (int): Number of sampled paths
+            quantiles (tuple): Quantiles of the price distribution to return
+            noise (float, optional): Standard deviation of the daily noise in
+                price units. Defaults to the standard deviation of the model's
+                one-step errors on the test data.
+            dropout (bool): Whether to sample the network with Monte Carlo dropout
+            seed (int, optional): Random seed for the noise
+            
+        Returns:
+            dict: Dates with the mean and one list per quantile (e.g. p10,
+                p50, p90) of the predicted prices
+        """
+        if n_scenarios < 1:
+            raise ValueError("n_scenarios must be at least 1")
+        
+        # Noise and errors are added in the scaled space the model works in
+        price_scale = self.scaler.scale_[0]
+        if noise is None:
+            X_test, y_test = self.create_dataset(self.test_data, self.look_back)
+            if len(y_test):
+                predictions = self._get_inference_fn()(
+                    np.asarray(X_test, dtype=np.float32)[:, :, np.newaxis]
+                ).numpy()[:, 0]
+                scaled_noise = float(np.std(y_test - predictions))
+            else:
+                scaled_noise = 0.0
+        else:
+            scaled_noise = noise * price_scale
+        
+        rng = np.random.default_rng(seed)
+        last_sequence = self.scaled_data[-self.look_back:].reshape(1, self.look_back)
+        windows = np.repeat(last_sequence, n_scenarios, axis=0)
+        scaled_paths = self._forecast_scaled(
+            windows, days,
+            noise=rng.normal(0.0, scaled_noise, size=(n_scenarios, days)).astype(np.float32),
+            dropout=dropout
+        )
+        paths = self.scaler.inverse_transform(scaled_paths.reshape(-1, 1)).reshape(scaled_paths.shape)
+        
+        last_date = self.data['Date'].iloc[-1]
+        bands = {
+            'dates': [(last_date + timedelta(days=i+1)).strftime('%Y-%m-%d') for i in range(days)],
+            'mean': paths.mean(axis=0).tolist()
+        }
+        for q, values in zip(quantiles, np.quantile(paths, quantiles, axis=0)):
+            bands[f"p{q * 100:g}"] = values.tolist()
+        
+        return bands
+    
     def plot_predictions(self, future_days=30):
         """
         Plot historical prices and future predictions.
@@ -246,6 +613,8 @@ class CarbonPricePredictor:
         Args:
             future_days (int): Number of days to predict into the future
         """
+        import matplotlib.pyplot as plt
+        
         # Get future predictions
         future_preds = self.predict_future(days=future_days)
         
@@ -275,7 +644,11 @@ def main():
     Main function to run the price prediction model.
     """
     parser = argparse.ArgumentParser(description='Carbon Credit Price Prediction')
-    parser.add_argument('--data', type=str, help='Path to historical price data CSV')
+    parser.add_argument('--data', type=str, help='Path to historical price data CSV or Parquet file')
+    parser.add_argument('--store', type=str,
+                        help='Price store directory for incremental ingestion of --data')
+    parser.add_argument('--history-days', type=int,
+                        help='With --store, only load this many recent days of history')
     parser.add_argument('--model', type=str, default='models/carbon_price_model.h5', 
                         help='Path to save/load the model')
     parser.add_argument('--train', action='store_true', help='Train the model')
@@ -289,7 +662,7 @@ def main():
     predictor = CarbonPricePredictor(data_path=args.data, model_path=args.model)
     
     # Load the data
-    predictor.load_data()
+    predictor.load_data(store_path=args.store, history_days=args.history_days)
     
     if args.train:
         # Build and train the model
@@ -0,0 +1,450 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+CarbonSol Price Store
+
+This module ingests historical price files (CSV or Parquet) in chunks into a
+persisted, date-indexed store of Parquet parts. It remembers how far each
+source file has been read, so a restart only reads rows appended since the
+last run, and it keeps the price minimum and maximum of the stored history so
+the MinMaxScaler can be set without rescanning it.
+"""
+
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+STATE_NAME = 'state.json'
+
+# Number of parts above which ingestion merges them into one
+MAX_PARTS = 32
+
+# Bytes hashed at the start of a CSV source and before its ingested offset to
+# detect rewrites
+CHECK_BYTES = 4096
+
+
+def _digest(data):
+    """Hex SHA-256 digest of a byte string."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def read_prices(path, date_column='Date', price_column='Price'):
+    """
+    Read a price file with only the date and price columns, typed.
+
+    Args:
+        path (str): Path to a CSV or Parquet file.
+        date_column (str): Name of the date column.
+        price_column (str): Name of the price column.
+
+    Returns:
+        pd.DataFrame: Prices with a datetime date column and float prices.
+    """
+    columns = [date_column, price_column]
+    if os.path.splitext(path)[1].lower() == '.parquet':
+        data = pd.read_parquet(path, columns=columns)
+        data[date_column] = pd.to_datetime(data[date_column])
+    else:
+        data = pd.read_csv(path, usecols=columns, parse_dates=[date_column])
+    data[price_column] = data[price_column].astype(np.float64)
+    return data
+
+
+class _BoundedReader(io.RawIOBase):
+    """A read-only view of a byte range of a binary file."""
+
+    def __init__(self, f, end):
+        self._f = f
+        self._end = end
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        remaining = self._end - self._f.tell()
+        if remaining <= 0:
+            return 0
+        view = memoryview(buffer)[:remaining]
+        return self._f.readinto(view)
+
+
+class PriceStore:
+    """
+    A directory of Parquet parts holding ingested prices, plus a state file
+    recording the ingested sources, parts, row count and price range.
+    """
+
+    def __init__(self, path, date_column='Date', price_column='Price'):
+        """
+        Initialize the price store, creating the directory if needed.
+
+        Args:
+            path (str): Directory of the store.
+            date_column (str): Name of the date column in the sources.
+            price_column (str): Name of the price column in the sources.
+        """
+        self.path = path
+        self.date_column = date_column
+        self.price_column = price_column
+        os.makedirs(path, exist_ok=True)
+        self.state = self._read_state()
+        self._replaced = False  # Whether ingestion replaced stored dates
+
+    def _read_state(self):
+        """
+        Read the store state, or an empty state for a new store.
+
+        Returns:
+            dict: The store state.
+        """
+        state_path = os.path.join(self.path, STATE_NAME)
+        if not os.path.exists(state_path):
+            return {
+                'sources': {},
+                'parts': [],
+                'part_dates': {},
+                'next_part': 0,
+                'rows': 0,
+                'min': None,
+                'max': None,
+                'last_date': None
+            }
+        with open(state_path) as f:
+            return json.load(f)
+
+    def _write_state(self):
+        """Write the store state atomically."""
+        state_path = os.path.join(self.path, STATE_NAME)
+        with open(f"{state_path}.tmp", 'w') as f:
+            json.dump(self.state, f, indent=4)
+        os.replace(f"{state_path}.tmp", state_path)
+
+    def _append_chunk(self, chunk):
+        """
+        Write a chunk of prices as a new part and update the running state.
+
+        Rows with a date that is already stored replace the stored row; the
+        price range is then stale until the next compaction, which ingest()
+        runs right away.
+
+        Args:
+            chunk (pd.DataFrame): Prices with the date and price columns.
+
+        Returns:
+            int: Number of rows stored.
+        """
+        chunk = chunk[[self.date_column, self.price_column]].dropna()
+        if chunk.empty:
+            return 0
+        chunk = chunk.sort_values(self.date_column, kind='stable')
+
+        part = f"part-{self.state['next_part']:06d}.parquet"
+        chunk.to_parquet(os.path.join(self.path, part), index=False)
+
+        prices = chunk[self.price_column].to_numpy()
+        first_date = chunk[self.date_column].iloc[0].isoformat()
+        last_date = chunk[self.date_column].iloc[-1].isoformat()
+        if ((self.state['last_date'] is not None and first_date <= self.state['last_date'])
+                or chunk[self.date_column].duplicated().any()):
+            self._replaced = True
+        self.state.setdefault('part_dates', {})[part] = [first_date, last_date]
+        self.state['parts'].append(part)
+        self.state['next_part'] += 1
+        self.state['rows'] += len(chunk)
+        chunk_min, chunk_max = float(prices.min()), float(prices.max())
+        self.state['min'] = chunk_min if self.state['min'] is None else min(self.state['min'], chunk_min)
+        self.state['max'] = chunk_max if self.state['max'] is None else max(self.state['max'], chunk_max)
+        if self.state['last_date'] is None or last_date > self.state['last_date']:
+            self.state['last_date'] = last_date
+        return len(chunk)
+
+    def ingest(self, source, chunksize=100000):
+        """
+        Ingest the rows of a source file that have not been ingested yet.
+
+        CSV files are read from the byte offset where the previous ingestion
+        stopped; Parquet files from the first row group not yet ingested. A
+        source whose already ingested content changed is treated as rewritten
+        and read from the start. Rows with a date already in the store replace
+        the earlier ones, and the store is then compacted so that the price
+        range matches the deduplicated history again.
+
+        Args:
+            source (str): Path to a CSV or Parquet price file.
+            chunksize (int): Rows per chunk for CSV files.
+
+        Returns:
+            int: Number of rows added.
+        """
+        key = os.path.abspath(source)
+        self._replaced = False
+        if os.path.splitext(source)[1].lower() == '.parquet':
+            added = self._ingest_parquet(source, key)
+        else:
+            added = self._ingest_csv(source, key, chunksize)
+
+        if self._replaced or len(self.state['parts']) > MAX_PARTS:
+            self.compact()
+        return added
+
+    @staticmethod
+    def _csv_rewritten(f, info, size):
+        """
+        Check whether the ingested part of a CSV source has changed.
+
+        An appended file keeps every byte before the ingested offset, so the
+        first block and the block before the offset are compared with their
+        hashes from the previous ingestion.
+
+        Args:
+            f (file): The source, opened in binary mode.
+            info (dict): Source state of the previous ingestion.
+            size (int): Current size of the source.
+
+        Returns:
+            bool: True if the source has to be read from the start.
+        """
+        offset = info['offset']
+        if 'head' not in info or size < offset:
+            return True
+
+        f.seek(0)
+        if _digest(f.read(info['head']['bytes'])) != info['head']['sha256']:
+            return True
+        start = max(0, offset - CHECK_BYTES)
+        f.seek(start)
+        return _digest(f.read(offset - start)) != info['before_offset']
+
+    def _ingest_csv(self, source, key, chunksize):
+        """
+        Ingest the rows appended to a CSV file since the last ingestion.
+
+        A final line without a newline is ingested too. If it was still being
+        written, the next ingestion finds it changed and reads it again, so
+        its completed row replaces the partial one.
+
+        Args:
+            source (str): Path to the CSV file.
+            key (str): Source key in the state.
+            chunksize (int): Rows per chunk.
+
+        Returns:
+            int: Number of rows added.
+        """
+        info = self.state['sources'].get(key)
+        stat = os.stat(source)
+        size = stat.st_size
+        if info and info.get('size') == size and info.get('mtime_ns') == stat.st_mtime_ns:
+            return 0
+
+        with open(source, 'rb') as f:
+            header = f.readline()
+            names = pd.read_csv(io.BytesIO(header), nrows=0).columns.tolist()
+
+            offset = len(header)
+            partial = None
+            if info and not self._csv_rewritten(f, info, size):
+                offset = info['offset']
+                partial = info.get('partial')
+
+            # Skip the final line of the previous ingestion if it is unchanged
+            start = offset
+            if partial:
+                f.seek(offset)
+                line = f.read(partial['bytes'] + 1)
+                if _digest(line[:partial['bytes']]) == partial['sha256']:
+                    if len(line) == partial['bytes']:
+                        start = size
+                    elif line.endswith(b'\n'):
+                        start = offset = offset + len(line)
+                        partial = None
+                    else:
+                        partial = None  # The line was still being written
+                else:
+                    partial = None
+
+            # Complete lines end at the last newline; the rest is the final line
+            end = start
+            position = size
+            while position > start:
+                block_start = max(start, position - 65536)
+                f.seek(block_start)
+                newline = f.read(position - block_start).rfind(b'\n')
+                if newline >= 0:
+                    end = block_start + newline + 1
+                    break
+                position = block_start
+
+            read_options = {
+                'header': None,
+                'names': names,
+                'usecols': [self.date_column, self.price_column]
+            }
+            added = 0
+            if end > start:
+                f.seek(start)
+                reader = pd.read_csv(
+                    io.BufferedReader(_BoundedReader(f, end)),
+                    parse_dates=[self.date_column],
+                    dtype={self.price_column: np.float64},
+                    chunksize=chunksize,
+                    **read_options
+                )
+                for chunk in reader:
+                    added += self._append_chunk(chunk)
+                offset = end
+
+            if start < size and end < size:
+                f.seek(end)
+                line = f.read(size - end)
+                partial = {'bytes': len(line), 'sha256': _digest(line)}
+                if line.strip():
+                    try:
+                        row = pd.read_csv(io.BytesIO(line), **read_options)
+                    except (ValueError, pd.errors.ParserError):
+                        row = None  # Unparseable until the line is complete
+                    if row is not None:
+                        row[self.date_column] = pd.to_datetime(row[self.date_column], errors='coerce')
+                        row[self.price_column] = pd.to_numeric(row[self.price_column], errors='coerce')
+                        added += self._append_chunk(row)
+
+            f.seek(0)
+            head = f.read(CHECK_BYTES)
+            check_start = max(0, offset - CHECK_BYTES)
+            f.seek(check_start)
+            before_offset = _digest(f.read(offset - check_start))
+
+        self.state['sources'][key] = {
+            'offset': offset,
+            'size': size,
+            'mtime_ns': stat.st_mtime_ns,
+            'head': {'bytes': len(head), 'sha256': _digest(head)},
+            'before_offset': before_offset,
+            'partial': partial
+        }
+        self._write_state()
+        return added
+
+    def _ingest_parquet(self, source, key):
+        """
+        Ingest the row groups added to a Parquet file since the last ingestion.
+
+        Args:
+            source (str): Path to the Parquet file.
+            key (str): Source key in the state.
+
+        Returns:
+            int: Number of rows added.
+        """
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(source)
+        row_group_rows = [
+            parquet_file.metadata.row_group(i).num_rows for i in range(parquet_file.num_row_groups)
+        ]
+        info = self.state['sources'].get(key, {'row_groups': 0})
+        start = info['row_groups']
+
+        # Appending row groups keeps the ingested ones; anything else is a rewrite
+        if start > len(row_group_rows) or info.get('row_group_rows') != row_group_rows[:start]:
+            start = 0
+
+        added = 0
+        for i in range(start, parquet_file.num_row_groups):
+            chunk = parquet_file.read_row_group(i, columns=[self.date_column, self.price_column]).to_pandas()
+            chunk[self.date_column] = pd.to_datetime(chunk[self.date_column])
+            chunk[self.price_column] = chunk[self.price_column].astype(np.float64)
+            added += self._append_chunk(chunk)
+
+        self.state['sources'][key] = {
+            'row_groups': parquet_file.num_row_groups,
+            'row_group_rows': row_group_rows
+        }
+        self._write_state()
+        return added
+
+    def read(self, since=None):
+        """
+        Read the stored prices.
+
+        Args:
+            since (datetime, optional): First date to read. Parts whose dates
+                all lie before it are not read at all.
+
+        Returns:
+            pd.DataFrame: Prices sorted by date, one row per date (the most
+                recently ingested row wins).
+        """
+        if since is not None:
+            since = pd.Timestamp(since)
+        part_dates = self.state.get('part_dates', {})
+        parts = []
+        for part in self.state['parts']:
+            if since is not None and part in part_dates and pd.Timestamp(part_dates[part][1]) < since:
+                continue
+            frame = pd.read_parquet(os.path.join(self.path, part))
+            if since is not None:
+                frame = frame[frame[self.date_column] >= since]
+            parts.append(frame)
+        if not parts:
+            return pd.DataFrame({
+                self.date_column: pd.Series(dtype='datetime64[ns]'),
+                self.price_column: pd.Series(dtype=np.float64)
+            })
+
+        data = pd.concat(parts, ignore_index=True)
+        data = data.drop_duplicates(self.date_column, keep='last')
+        return data.sort_values(self.date_column, kind='stable').reset_index(drop=True)
+
+    def last_date(self):
+        """
+        Get the date of the newest stored price.
+
+        Returns:
+            pd.Timestamp: The newest date, or None for an empty store.
+        """
+        if self.state['last_date'] is None:
+            return None
+        return pd.Timestamp(self.state['last_date'])
+
+    def price_range(self):
+        """
+        Get the minimum and maximum of the stored prices.
+
+        Only the latest row of each date counts, as in read().
+
+        Returns:
+            tuple: (min, max), or (None, None) for an empty store.
+        """
+        return self.state['min'], self.state['max']
+
+    def compact(self):
+        """
+        Merge all parts into a single date-sorted part without replaced rows,
+        and recompute the price range and last date from it.
+        """
+        data = self.read()
+        old_parts = self.state['parts']
+
+        part = f"part-{self.state['next_part']:06d}.parquet"
+        data.to_parquet(os.path.join(self.path, part), index=False)
+        self.state['parts'] = [part]
+        self.state['part_dates'] = {}
+        self.state['next_part'] += 1
+        self.state['rows'] = len(data)
+        self.state['min'] = self.state['max'] = self.state['last_date'] = None
+        if len(data):
+            prices = data[self.price_column].to_numpy()
+            self.state['min'], self.state['max'] = float(prices.min()), float(prices.max())
+            self.state['last_date'] = data[self.date_column].iloc[-1].isoformat()
+            self.state['part_dates'][part] = [data[self.date_column].iloc[0].isoformat(), self.state['last_date']]
+        self._write_state()
+
+        for old_part in old_parts:
+            os.remove(os.path.join(self.path, old_part))
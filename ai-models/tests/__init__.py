@@ -0,0 +1,6 @@
+"""
+Test package for the CarbonSol LSTM price model.
+
+This package contains unit tests for the price store, the LSTM predictor
+and the API that serves it.
+"""
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""
+Test runner for the CarbonSol LSTM price model.
+
+This script discovers and runs all tests in the tests directory.
+"""
+
+import unittest
+import sys
+import os
+
+# Add parent directory to path to import the modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+if __name__ == '__main__':
+    # Discover and run all tests
+    test_loader = unittest.TestLoader()
+    test_suite = test_loader.discover(os.path.dirname(os.path.abspath(__file__)))
+    
+    # Run the tests
+    test_runner = unittest.TextTestRunner(verbosity=2)
+    result = test_runner.run(test_suite)
+    
+    # Exit with non-zero code if tests failed
+    sys.exit(not result.wasSuccessful()) 
\ No newline at end of file
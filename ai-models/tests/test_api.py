@@ -0,0 +1,239 @@
+"""
+Tests for the price prediction API.
+"""
+
+import unittest
+import os
+import tempfile
+import threading
+import time
+from unittest import mock
+import numpy as np
+import pandas as pd
+
+# Import the modules to test
+import api
+from price_prediction import CarbonPricePredictor
+
+class TestAPI(unittest.TestCase):
+    """Test cases for the API endpoints."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Train one small predictor shared by the tests; tests serve copies."""
+        days = 120
+        prices = pd.DataFrame({
+            'Date': pd.date_range('2023-01-01', periods=days).strftime('%Y-%m-%d'),
+            'Price': 10 + 2 * np.sin(np.arange(days) / 8)
+        })
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            data_path = os.path.join(tmp_dir, 'prices.csv')
+            prices.to_csv(data_path, index=False)
+            cls.trained = CarbonPricePredictor(data_path=data_path)
+            cls.trained.look_back = 10
+            cls.trained.load_data()
+        cls.trained.build_model()
+        cls.trained.train(epochs=1)
+
+    def setUp(self):
+        """Publish a fresh copy of the trained predictor."""
+        self.client = api.app.test_client()
+        self.predictor = self.trained.copy()
+        with api.model_lock:
+            api.price_predictor = self.predictor
+            api.model_status = 'ready'
+            api.model_error = None
+        api.forecast_cache.invalidate()
+        last_date = self.predictor.data['Date'].iloc[-1]
+        self.new_prices = {'prices': [
+            {'date': (last_date + pd.Timedelta(days=1)).strftime('%Y-%m-%d'), 'price': 11.5}
+        ]}
+
+    def tearDown(self):
+        """Unpublish the predictor."""
+        with api.model_lock:
+            api.price_predictor = None
+            api.model_status = 'not_loaded'
+            api.model_error = None
+
+    def test_add_prices_swaps_in_updated_copy(self):
+        """Test that new prices are learned by a copy that replaces the served predictor."""
+        n_rows = len(self.predictor.data)
+        version = api.model_version
+        self.predictor.model_path = 'model.h5'
+
+        with mock.patch.object(CarbonPricePredictor, 'save_model', autospec=True) as save_model:
+            response = self.client.post('/api/prices', json=self.new_prices)
+
+        self.assertEqual(response.status_code, 200)
+        save_model.assert_called_once_with(api.price_predictor)
+        self.assertEqual(response.get_json()['added'], 1)
+        self.assertEqual(response.get_json()['model_version'], version + 1)
+        self.assertIsNot(api.price_predictor, self.predictor)
+        self.assertEqual(len(api.price_predictor.data), n_rows + 1)
+        # The previously served predictor was never modified
+        self.assertEqual(len(self.predictor.data), n_rows)
+
+        forecast = self.client.get('/api/predict/price?days=3').get_json()
+        self.assertEqual(forecast['data']['dates'][0], '2023-05-02')
+
+    def test_add_prices_conflicts_with_reload(self):
+        """Test that an update is dropped if the model was reloaded meanwhile."""
+        reloaded = self.trained.copy()
+        self.predictor.model_path = 'model.h5'
+
+        def reload_during_update(candidate, *args, **kwargs):
+            api.price_predictor = reloaded
+            return 1
+
+        with mock.patch.object(CarbonPricePredictor, 'update', autospec=True, side_effect=reload_during_update), \
+                mock.patch.object(CarbonPricePredictor, 'save_model', autospec=True) as save_model:
+            response = self.client.post('/api/prices', json=self.new_prices)
+
+        self.assertEqual(response.status_code, 409)
+        self.assertIs(api.price_predictor, reloaded)
+        # The discarded update did not overwrite the served model's checkpoint
+        save_model.assert_not_called()
+
+    def test_add_prices_requires_prices(self):
+        """Test that a body without prices is rejected."""
+        response = self.client.post('/api/prices', json={})
+        self.assertEqual(response.status_code, 400)
+
+class FakePredictor:
+    """Stands in for CarbonPricePredictor to control how model loading goes."""
+
+    instances = 0
+    release = None  # Event a load waits for, if set
+    error = None  # Exception a load raises, if set
+
+    def __init__(self, model_path=None):
+        FakePredictor.instances += 1
+        self.data = pd.DataFrame({'Date': pd.to_datetime(['2023-01-01']), 'Price': [10.0]})
+
+    def load_data(self):
+        if FakePredictor.release is not None:
+            FakePredictor.release.wait(5)
+        if FakePredictor.error is not None:
+            raise FakePredictor.error
+
+    def build_model(self):
+        pass
+
+    def train(self, epochs=50):
+        pass
+
+    def evaluate(self):
+        return {}
+
+    def predict_future(self, days=30):
+        return {'dates': ['2023-01-02'] * days, 'prices': [10.0] * days}
+
+class TestModelLoading(unittest.TestCase):
+    """Test cases for background model loading and the readiness endpoint."""
+
+    def setUp(self):
+        """Reset the loading state and load with FakePredictor into a temporary model path."""
+        self.client = api.app.test_client()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        FakePredictor.instances = 0
+        FakePredictor.release = None
+        FakePredictor.error = None
+        patches = [
+            mock.patch.object(api, 'CarbonPricePredictor', FakePredictor),
+            mock.patch.object(api, 'PRICE_MODEL_PATH', os.path.join(self.tmp_dir.name, 'model.h5'))
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.reset()
+
+    def tearDown(self):
+        """Wait for a running load and reset the loading state."""
+        if FakePredictor.release is not None:
+            FakePredictor.release.set()
+        self.wait_for_load()
+        self.reset()
+        self.tmp_dir.cleanup()
+
+    @staticmethod
+    def reset():
+        """Return the API to its state before any load."""
+        with api.model_lock:
+            api.price_predictor = None
+            api.model_status = 'not_loaded'
+            api.model_error = None
+            api.model_failures = 0
+            api.model_retry_at = 0.0
+
+    @staticmethod
+    def wait_for_load(timeout=5):
+        """Wait until no load is running."""
+        deadline = time.monotonic() + timeout
+        while api.model_status == 'loading' and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def test_single_flight_loading(self):
+        """Test that one background load serves 503s until it publishes the model."""
+        FakePredictor.release = threading.Event()
+
+        self.assertTrue(api.start_model_loading())
+        self.assertFalse(api.start_model_loading())
+
+        response = self.client.get('/api/ready')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.get_json()['model_status'], 'loading')
+        self.assertEqual(response.headers['Retry-After'], str(api.RETRY_AFTER_SECONDS))
+        self.assertEqual(self.client.get('/api/predict/price?days=2').status_code, 503)
+
+        FakePredictor.release.set()
+        self.wait_for_load()
+
+        self.assertEqual(FakePredictor.instances, 1)
+        self.assertEqual(self.client.get('/api/ready').get_json()['model_status'], 'ready')
+        self.assertEqual(self.client.get('/api/predict/price?days=2').status_code, 200)
+        self.assertFalse(api.start_model_loading())
+
+    def test_lazy_loading_on_first_request(self):
+        """Test that a request starts the load when nothing has loaded the model."""
+        api.warm_up('lazy')
+        self.assertEqual(api.model_status, 'not_loaded')
+
+        self.assertEqual(self.client.get('/api/predict/price').status_code, 503)
+        self.wait_for_load()
+        self.assertEqual(api.model_status, 'ready')
+
+    def test_failed_load_retries_after_backoff(self):
+        """Test that a failed load is reported and only retried once its backoff passed."""
+        FakePredictor.error = RuntimeError('no model')
+        api.warm_up('eager')
+
+        response = self.client.get('/api/ready')
+        body = response.get_json()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(body['model_status'], 'failed')
+        self.assertEqual(body['error'], 'no model')
+        self.assertEqual(response.headers['Retry-After'], str(int(api.RETRY_BACKOFF_SECONDS)))
+
+        # Requests during the backoff do not start new loads
+        self.assertEqual(self.client.get('/api/predict/price').status_code, 503)
+        self.assertEqual(api.model_status, 'failed')
+        self.assertEqual(FakePredictor.instances, 1)
+
+        # A second failure doubles the backoff
+        self.assertTrue(api.start_model_loading(force=True))
+        self.wait_for_load()
+        self.assertEqual(api.model_failures, 2)
+        self.assertGreater(api.model_retry_at - time.monotonic(), api.RETRY_BACKOFF_SECONDS)
+
+        # Once the backoff has passed, the next request retries
+        FakePredictor.error = None
+        api.model_retry_at = 0.0
+        self.assertEqual(self.client.get('/api/predict/price').status_code, 503)
+        self.wait_for_load()
+        self.assertEqual(FakePredictor.instances, 3)
+        self.assertEqual(api.model_status, 'ready')
+        self.assertEqual(api.model_failures, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+"""
+Tests for the LSTM price prediction model.
+"""
+
+import unittest
+import os
+import tempfile
+from unittest import mock
+import numpy as np
+import pandas as pd
+
+# Import the module to test
+from price_prediction import CarbonPricePredictor
+
+def make_predictor(days=150, look_back=10, epochs=1):
+    """
+    Train a small predictor on a synthetic price series.
+
+    Args:
+        days (int): Length of the price history.
+        look_back (int): Window length of the model.
+        epochs (int): Training epochs.
+
+    Returns:
+        CarbonPricePredictor: The trained predictor.
+    """
+    rng = np.random.RandomState(0)
+    prices = pd.DataFrame({
+        'Date': pd.date_range('2023-01-01', periods=days).strftime('%Y-%m-%d'),
+        'Price': 10 + 2 * np.sin(np.arange(days) / 8) + rng.normal(0, 0.1, days)
+    })
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_path = os.path.join(tmp_dir, 'prices.csv')
+        prices.to_csv(data_path, index=False)
+        predictor = CarbonPricePredictor(data_path=data_path)
+        predictor.look_back = look_back
+        predictor.load_data()
+    predictor.build_model()
+    predictor.train(epochs=epochs)
+    return predictor
+
+class TestCarbonPricePredictor(unittest.TestCase):
+    """Test cases for the CarbonPricePredictor class."""
+
+    @classmethod
+    def setUpClass(cls):
+        """Train one predictor shared by the tests; tests modify copies."""
+        cls.trained = make_predictor()
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.predictor = self.trained.copy()
+        last_date = self.predictor.data['Date'].iloc[-1]
+        self.new_prices = pd.DataFrame({
+            'Date': [last_date - pd.Timedelta(days=1), last_date + pd.Timedelta(days=1)],
+            'Price': [11.0, 12.0]
+        })
+
+    def test_update_fills_a_batch(self):
+        """Test that one new price is fitted together with the latest earlier windows."""
+        n_rows = len(self.predictor.data)
+        with mock.patch.object(self.predictor.model, 'fit', wraps=self.predictor.model.fit) as fit:
+            added = self.predictor.update(self.new_prices, epochs=1, batch_size=16)
+
+        self.assertEqual(added, 1)
+        X, y = fit.call_args[0]
+        self.assertEqual(X.shape, (16, 10, 1))
+        self.assertAlmostEqual(float(y[-1]), float(self.predictor.scaled_data[-1, 0]), places=6)
+        self.assertEqual(len(self.predictor.data), n_rows + 1)
+        self.assertEqual(len(self.predictor.scaled_data), n_rows + 1)
+        self.assertEqual(self.predictor.model_version, self.trained.model_version + 1)
+
+    def test_update_does_not_save(self):
+        """Test that fine-tuning leaves the checkpoint to whoever publishes the update."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.predictor.model_path = os.path.join(tmp_dir, 'model.h5')
+            self.predictor.update(self.new_prices, epochs=1)
+            self.assertFalse(os.path.exists(self.predictor.model_path))
+
+            self.predictor.save_model()
+            self.assertTrue(os.path.exists(self.predictor.model_path))
+
+    def test_update_ignores_known_dates(self):
+        """Test that prices not later than the loaded data are ignored."""
+        with mock.patch.object(self.predictor.model, 'fit') as fit:
+            self.assertEqual(self.predictor.update(self.new_prices.iloc[:1]), 0)
+        fit.assert_not_called()
+
+    def test_failed_update_keeps_data(self):
+        """Test that the data is only extended once fine-tuning succeeded."""
+        n_rows = len(self.predictor.data)
+        with mock.patch.object(self.predictor.model, 'fit', side_effect=RuntimeError('fit failed')):
+            with self.assertRaises(RuntimeError):
+                self.predictor.update(self.new_prices)
+        self.assertEqual(len(self.predictor.data), n_rows)
+        self.assertEqual(len(self.predictor.scaled_data), n_rows)
+
+    def test_copy_leaves_original_serving(self):
+        """Test that updating a copy changes neither the original's weights nor its forecasts."""
+        before = self.predictor.predict_future(days=5)
+        weights = [w.copy() for w in self.predictor.model.get_weights()]
+
+        candidate = self.predictor.copy()
+        np.testing.assert_allclose(candidate.predict_future(days=5)['prices'], before['prices'], rtol=1e-6)
+        candidate.update(self.new_prices, epochs=2)
+
+        for old, new in zip(weights, self.predictor.model.get_weights()):
+            np.testing.assert_array_equal(old, new)
+        self.assertEqual(self.predictor.predict_future(days=5), before)
+        self.assertEqual(len(candidate.data), len(self.predictor.data) + 1)
+
+    def reference_forecast(self, window, days):
+        """Forecast step by step with Model.predict, as before the compiled forward pass."""
+        current = np.asarray(window, dtype=np.float32).reshape(1, self.predictor.look_back, 1)
+        predictions = []
+        for _ in range(days):
+            next_value = self.predictor.model.predict(current, verbose=0)
+            predictions.append(next_value[0, 0])
+            current = np.append(current[:, 1:, :], next_value.reshape(1, 1, 1), axis=1)
+        return np.array(predictions)
+
+    def test_forecast_matches_step_by_step_predict(self):
+        """Test that the compiled forward pass forecasts what Model.predict does."""
+        window = self.predictor.scaled_data[-self.predictor.look_back:, 0]
+        expected = self.reference_forecast(window, 8)
+
+        scaled = self.predictor._forecast_scaled(window[np.newaxis], 8)
+        np.testing.assert_allclose(scaled[0], expected, rtol=1e-5, atol=1e-6)
+
+        prices = self.predictor.predict_future(days=8)['prices']
+        np.testing.assert_allclose(
+            prices, self.predictor.scaler.inverse_transform(expected.reshape(-1, 1))[:, 0], rtol=1e-5
+        )
+
+    def test_batch_matches_single_series(self):
+        """Test that batched forecasts equal forecasting each series on its own."""
+        history = self.predictor.data['Price'].to_numpy()
+        series = [history, history[:-7] + 0.5, history[:-20] * 0.9]
+
+        batch = self.predictor.predict_future_batch(series, days=6)
+
+        self.assertEqual(batch.shape, (3, 6))
+        np.testing.assert_allclose(batch[0], self.predictor.predict_future(days=6)['prices'], rtol=1e-5)
+        for prices, forecast in zip(series, batch):
+            np.testing.assert_allclose(
+                forecast, self.predictor.predict_future_batch([prices], days=6)[0], rtol=1e-5
+            )
+        with self.assertRaises(ValueError):
+            self.predictor.predict_future_batch([history[:5]])
+
+    def test_create_dataset_matches_loop(self):
+        """Test that the strided windows equal the windows of a plain loop."""
+        data = self.predictor.scaled_data
+        look_back = self.predictor.look_back
+        expected_X = np.array([data[i:i + look_back, 0] for i in range(len(data) - look_back)])
+        expected_y = np.array([data[i + look_back, 0] for i in range(len(data) - look_back)])
+
+        X, y = self.predictor.create_dataset(data, look_back)
+
+        self.assertEqual(len(X), len(data) - look_back)
+        np.testing.assert_array_equal(X, expected_X)
+        np.testing.assert_array_equal(y, expected_y)
+        self.assertEqual(self.predictor.create_dataset(data[:look_back], look_back)[0].shape, (0, look_back))
+
+    def test_streaming_dataset_matches_windows(self):
+        """Test that tf.data batches hold the same windows, also without keras.utils."""
+        import tensorflow as tf
+
+        data = self.predictor.scaled_data
+        look_back = self.predictor.look_back
+        X, y = self.predictor.create_dataset(data, look_back)
+
+        def collect():
+            batches = list(self.predictor.create_streaming_dataset(data, look_back, batch_size=16))
+            self.assertEqual(tuple(batches[0][0].shape), (16, look_back, 1))
+            return (np.concatenate([b[0].numpy()[:, :, 0] for b in batches]),
+                    np.concatenate([b[1].numpy() for b in batches]))
+
+        for streamed_X, streamed_y in [collect(), self.without_keras_utils(tf, collect)]:
+            self.assertEqual(len(streamed_X), len(data) - look_back)
+            np.testing.assert_allclose(streamed_X, X, rtol=1e-6)
+            np.testing.assert_allclose(streamed_y, y, rtol=1e-6)
+
+    @staticmethod
+    def without_keras_utils(tf, fn):
+        """Run fn as on TensorFlow releases without keras.utils.timeseries_dataset_from_array."""
+        with mock.patch.object(tf.keras.utils, 'timeseries_dataset_from_array', None):
+            return fn()
+
+if __name__ == '__main__':
+    unittest.main()
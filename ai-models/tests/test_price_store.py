@@ -0,0 +1,122 @@
+"""
+Tests for the incremental price store.
+"""
+
+import unittest
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Import the module to test
+from price_store import PriceStore
+
+class TestPriceStore(unittest.TestCase):
+    """Test cases for the PriceStore class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.tmp_dir.name, 'prices.csv')
+        self.store = PriceStore(os.path.join(self.tmp_dir.name, 'store'))
+        self.prices = pd.DataFrame({
+            'Date': pd.date_range('2023-01-01', periods=10),
+            'Price': np.linspace(10, 19, 10)
+        })
+
+    def tearDown(self):
+        """Remove the store and source files."""
+        self.tmp_dir.cleanup()
+
+    def write(self, text, mode='w'):
+        """Write or append to the CSV source."""
+        with open(self.source, mode) as f:
+            f.write(text)
+
+    def rows(self, start, stop):
+        """CSV lines of the fixture prices in [start, stop), each ending with a newline."""
+        return ''.join(
+            f"{row.Date.date()},{row.Price}\n" for row in self.prices.iloc[start:stop].itertuples()
+        )
+
+    def test_append(self):
+        """Test that only appended rows are read again."""
+        self.write('Date,Price\n' + self.rows(0, 6))
+        self.assertEqual(self.store.ingest(self.source), 6)
+        self.assertEqual(self.store.ingest(self.source), 0)
+
+        self.write(self.rows(6, 10), 'a')
+        self.assertEqual(PriceStore(self.store.path).ingest(self.source), 4)
+
+        reopened = PriceStore(self.store.path)
+        pd.testing.assert_frame_equal(reopened.read(), self.prices)
+        self.assertEqual(reopened.price_range(), (10.0, 19.0))
+
+    def test_missing_trailing_newline(self):
+        """Test that a final line without a newline is ingested and re-read once completed."""
+        self.write('Date,Price\n2023-01-01,10.0\n2023-01-02,11.5')
+        self.assertEqual(self.store.ingest(self.source), 2)
+        self.assertEqual(self.store.read()['Price'].tolist(), [10.0, 11.5])
+
+        # Completing the line unchanged does not add it again
+        self.write('\n2023-01-03,12.0', 'a')
+        self.assertEqual(self.store.ingest(self.source), 1)
+
+        # A line still being written is replaced by its completed value
+        self.write('5\n', 'a')
+        self.store.ingest(self.source)
+        data = self.store.read()
+        self.assertEqual(data['Price'].tolist(), [10.0, 11.5, 12.05])
+        self.assertEqual(self.store.price_range(), (10.0, 12.05))
+
+    def test_duplicate_dates_recompute_range(self):
+        """Test that a replaced price no longer counts towards the price range."""
+        self.write('Date,Price\n' + self.rows(0, 10))
+        self.store.ingest(self.source)
+        self.write('2023-01-10,15.0\n', 'a')
+        self.store.ingest(self.source)
+
+        data = self.store.read()
+        self.assertEqual(len(data), 10)
+        self.assertEqual(data['Price'].iloc[-1], 15.0)
+        self.assertEqual(self.store.price_range(), (10.0, 18.0))
+        self.assertEqual(self.store.state['parts'], [self.store.state['parts'][0]])
+
+    def test_rewrite_larger_file(self):
+        """Test that a rewritten source is read from the start even if it grew."""
+        self.write('Date,Price\n' + self.rows(0, 5))
+        self.store.ingest(self.source)
+
+        rewritten = self.prices.assign(Price=self.prices['Price'] + 100)
+        rewritten.to_csv(self.source, index=False, date_format='%Y-%m-%d')
+        self.assertEqual(self.store.ingest(self.source), 10)
+
+        pd.testing.assert_frame_equal(self.store.read(), rewritten)
+        self.assertEqual(self.store.price_range(), (110.0, 119.0))
+
+    def test_parquet_row_groups(self):
+        """Test that Parquet sources are read by row group and rewrites are detected."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        source = os.path.join(self.tmp_dir.name, 'prices.parquet')
+        pq.write_table(pa.Table.from_pandas(self.prices.iloc[:6]), source, row_group_size=3)
+        self.assertEqual(self.store.ingest(source), 6)
+
+        pq.write_table(pa.Table.from_pandas(self.prices), source, row_group_size=4)
+        self.assertEqual(self.store.ingest(source), 10)
+        pd.testing.assert_frame_equal(self.store.read(), self.prices)
+
+    def test_read_since(self):
+        """Test that reading recent history skips older parts."""
+        self.write('Date,Price\n' + self.rows(0, 5))
+        self.store.ingest(self.source)
+        self.write(self.rows(5, 10), 'a')
+        self.store.ingest(self.source)
+        os.remove(os.path.join(self.store.path, self.store.state['parts'][0]))
+
+        data = self.store.read(since=self.store.last_date() - pd.Timedelta(days=2))
+        self.assertEqual(data['Date'].tolist(), self.prices['Date'].iloc[7:].tolist())
+
+if __name__ == '__main__':
+    unittest.main()
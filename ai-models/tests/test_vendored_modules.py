@@ -0,0 +1,34 @@
+"""
+Tests that the modules vendored from the CarbonSol models stay in sync.
+
+The price model API is deployed on its own, so it carries copies of the
+modules it shares with CarbonSol/ai-models instead of importing them from
+there. Change the CarbonSol module first, then copy it over.
+"""
+
+import unittest
+import os
+
+MODELS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CARBONSOL_MODELS_DIR = os.path.join(os.path.dirname(MODELS_DIR), 'CarbonSol', 'ai-models')
+
+# Modules copied unchanged from CarbonSol/ai-models
+VENDORED_MODULES = ['forecast_cache.py', 'metrics.py']
+
+class TestVendoredModules(unittest.TestCase):
+    """Test cases for the vendored module copies."""
+
+    def test_copies_match(self):
+        """Test that every vendored module is identical to its CarbonSol original."""
+        for filename in VENDORED_MODULES:
+            with open(os.path.join(MODELS_DIR, filename), 'rb') as f:
+                copy = f.read()
+            with open(os.path.join(CARBONSOL_MODELS_DIR, filename), 'rb') as f:
+                original = f.read()
+            self.assertEqual(
+                copy, original,
+                f"ai-models/{filename} differs from CarbonSol/ai-models/{filename}; copy it over"
+            )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,519 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Price Prediction Benchmarks
+
+This script times the main operations of both price predictors on synthetic
+price histories of increasing size and records their peak memory:
+
+- PricePredictor (CarbonSol/ai-models): _prepare_features, train, predict
+  for 1/30/365 days and evaluate.
+- CarbonPricePredictor (ai-models): create_dataset, train, predict_future
+  for 1/30/365 days and evaluate.
+
+Both modules are named price_prediction, so every predictor and history size
+runs in its own worker process; this also keeps the process peak RSS of one
+run from leaking into the next. Results are written as JSON, and a previous
+results file can be passed as a baseline to fail on regressions:
+
+    python benchmarks/bench_price_prediction.py --output bench.json
+    python benchmarks/bench_price_prediction.py --sizes 1000 --compare bench.json
+
+With --dtypes float64 float32, every benchmark also runs on the float32
+feature path and a memory report compares the two:
+
+    python benchmarks/bench_price_prediction.py --dtypes float64 float32
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Directory each predictor is imported from
+MODEL_DIRS = {
+    'PricePredictor': os.path.join(REPO_ROOT, 'CarbonSol', 'ai-models'),
+    'CarbonPricePredictor': os.path.join(REPO_ROOT, 'ai-models')
+}
+
+DEFAULT_SIZES = [1000, 100000, 1000000]
+FORECAST_DAYS = [1, 30, 365]
+FEATURE_DTYPES = ['float64', 'float32']
+
+# Relative slowdown or memory growth reported as a regression
+DEFAULT_THRESHOLD = 0.2
+
+
+def synthetic_prices(rows, seed=42):
+    """
+    Generate a synthetic hourly price history.
+
+    Hourly steps keep a million rows within the pandas date range; the
+    predictors only depend on the row order, not on the spacing.
+
+    Args:
+        rows (int): Number of rows.
+        seed (int): Random seed.
+
+    Returns:
+        pd.DataFrame: History with date, price, volume and sentiment columns.
+    """
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    steps = np.arange(rows)
+    prices = (
+        10
+        + 5 * steps / max(rows - 1, 1)
+        + 2 * np.sin(steps * 2 * np.pi / 365)
+        + rng.normal(0, 0.5, rows)
+    )
+    return pd.DataFrame({
+        'date': pd.Timestamp('2000-01-01') + pd.to_timedelta(steps, unit='h'),
+        'price': prices,
+        'volume': rng.uniform(1000, 5000, rows),
+        'sentiment': rng.uniform(-1, 1, rows)
+    })
+
+
+def measure(fn, repeat, warmup=True):
+    """
+    Time a function and record the peak memory it allocates.
+
+    The timed runs are not traced, since tracing slows down Python code; one
+    additional traced run records the peak traced allocation, which includes
+    NumPy arrays but not memory allocated by native libraries such as
+    TensorFlow.
+
+    Args:
+        fn (callable): Zero-argument function to benchmark.
+        repeat (int): Number of timed runs.
+        warmup (bool): Whether to make an untimed first call, so one-off
+            costs such as compiling the model or tracing a tf.function are
+            not counted.
+
+    Returns:
+        dict: Run times in seconds, their min and median, and peak memory.
+    """
+    if warmup:
+        fn()
+
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'times': times,
+        'min': min(times),
+        'median': statistics.median(times),
+        'peak_memory_bytes': peak
+    }
+
+
+def price_predictor_benchmarks(rows, feature_dtype='float64'):
+    """
+    Set up the PricePredictor benchmarks.
+
+    Args:
+        rows (int): History size.
+        feature_dtype (str): Feature dtype of the predictor.
+
+    Returns:
+        tuple: (name, function) pairs in the order they must run, and the predictor.
+    """
+    from price_prediction import PricePredictor
+
+    data = synthetic_prices(rows)
+    split = int(rows * 0.8)
+    train_data = data.iloc[:split].reset_index(drop=True)
+    test_data = data.iloc[split:].reset_index(drop=True)
+    predictor = PricePredictor(feature_dtype=feature_dtype)
+
+    def train():
+        if not predictor.train(train_data):
+            raise RuntimeError("Training failed")
+
+    benchmarks = [
+        ('_prepare_features', lambda: predictor._prepare_features(train_data, fit=True)),
+        ('train', train)
+    ]
+    for days in FORECAST_DAYS:
+        benchmarks.append((f"predict_{days}d", lambda days=days: predictor.predict(train_data, days_ahead=days)))
+    benchmarks.append(('evaluate', lambda: predictor.evaluate(test_data)))
+    return benchmarks, predictor
+
+
+def carbon_price_predictor_benchmarks(rows, epochs, feature_dtype='float64'):
+    """
+    Set up the CarbonPricePredictor benchmarks.
+
+    Args:
+        rows (int): History size.
+        epochs (int): Training epochs.
+        feature_dtype (str): Feature dtype of the predictor.
+
+    Returns:
+        tuple: (name, function) pairs in the order they must run, and the predictor.
+    """
+    from price_prediction import CarbonPricePredictor
+
+    data_path = os.path.abspath('prices.csv')
+    synthetic_prices(rows)[['date', 'price']].rename(
+        columns={'date': 'Date', 'price': 'Price'}
+    ).to_csv(data_path, index=False)
+
+    predictor = CarbonPricePredictor(data_path=data_path, feature_dtype=feature_dtype)
+    predictor.load_data()
+    predictor.build_model()
+
+    benchmarks = [
+        ('create_dataset', lambda: predictor.create_dataset(predictor.train_data, predictor.look_back)),
+        ('train', lambda: predictor.train(epochs=epochs))
+    ]
+    for days in FORECAST_DAYS:
+        benchmarks.append((f"predict_{days}d", lambda days=days: predictor.predict_future(days=days)))
+    benchmarks.append(('evaluate', predictor.evaluate))
+    return benchmarks, predictor
+
+
+def retained_feature_bytes(predictor):
+    """
+    Get the feature memory a predictor holds between calls.
+
+    Traced peaks miss memory allocated before the traced run, such as the
+    reused buffers of the float32 path or the scaled LSTM series, so it is
+    reported separately.
+
+    Args:
+        predictor: PricePredictor or CarbonPricePredictor.
+
+    Returns:
+        int: Bytes of feature buffers or scaled data held by the predictor.
+    """
+    buffers = getattr(predictor, '_feature_buffers', None) or {}
+    retained = sum(buffer.nbytes for buffer in buffers.values())
+    scaled_data = getattr(predictor, 'scaled_data', None)
+    if scaled_data is not None:
+        retained += scaled_data.nbytes
+    return retained
+
+
+def max_rss_bytes():
+    """
+    Get the peak resident set size of the current process.
+
+    Returns:
+        int: Peak RSS in bytes, or None where it is not available.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def run_worker(predictor_name, rows, repeat, epochs, output, feature_dtype='float64'):
+    """
+    Run the benchmarks of one predictor and history size in this process.
+
+    Training runs once without a warm-up call (plus the traced run); the
+    other operations run `repeat` times after a warm-up call.
+
+    Args:
+        predictor_name (str): Key of MODEL_DIRS.
+        rows (int): History size.
+        repeat (int): Timed runs per operation.
+        epochs (int): Training epochs for CarbonPricePredictor.
+        output (str): Path of the JSON file to write the results to.
+        feature_dtype (str): Feature dtype of the predictor.
+    """
+    sys.path.insert(0, MODEL_DIRS[predictor_name])
+
+    if predictor_name == 'PricePredictor':
+        benchmarks, predictor = price_predictor_benchmarks(rows, feature_dtype)
+    else:
+        benchmarks, predictor = carbon_price_predictor_benchmarks(rows, epochs, feature_dtype)
+
+    results = []
+    for name, fn in benchmarks:
+        if name == 'train':
+            result = measure(fn, 1, warmup=False)
+        else:
+            result = measure(fn, repeat)
+        result.update({
+            'predictor': predictor_name,
+            'benchmark': name,
+            'rows': rows,
+            'feature_dtype': feature_dtype,
+            'retained_feature_bytes': retained_feature_bytes(predictor)
+        })
+        results.append(result)
+
+    rss = max_rss_bytes()
+    for result in results:
+        result['max_rss_bytes'] = rss
+
+    with open(output, 'w') as f:
+        json.dump(results, f)
+
+
+def environment_info():
+    """
+    Describe the machine and package versions the benchmarks ran with.
+
+    Returns:
+        dict: Environment details for the results file.
+    """
+    from importlib import metadata
+
+    packages = {}
+    for package, distributions in [
+        ('numpy', ['numpy']),
+        ('pandas', ['pandas']),
+        ('scikit-learn', ['scikit-learn']),
+        ('tensorflow', ['tensorflow', 'tensorflow-cpu'])
+    ]:
+        packages[package] = None
+        for distribution in distributions:
+            try:
+                packages[package] = metadata.version(distribution)
+                break
+            except metadata.PackageNotFoundError:
+                pass
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'packages': packages
+    }
+
+
+def run_benchmarks(predictors, sizes, repeat=3, epochs=1, verbose=False, dtypes=('float64',)):
+    """
+    Run the benchmarks, one worker process per predictor, history size and
+    feature dtype.
+
+    Args:
+        predictors (list): Predictor names (keys of MODEL_DIRS).
+        sizes (list): History sizes in rows.
+        repeat (int): Timed runs per operation.
+        epochs (int): Training epochs for CarbonPricePredictor.
+        verbose (bool): Whether to show the predictors' own output.
+        dtypes (tuple): Feature dtypes to benchmark.
+
+    Returns:
+        dict: Results document with 'created_at', 'environment' and 'results'.
+    """
+    env = dict(os.environ, TF_CPP_MIN_LOG_LEVEL='2')
+    results = []
+
+    for predictor_name in predictors:
+        for rows in sizes:
+            for feature_dtype in dtypes:
+                print(f"Benchmarking {predictor_name} with {rows} rows ({feature_dtype})...", flush=True)
+                with tempfile.TemporaryDirectory() as work_dir:
+                    output = os.path.join(work_dir, 'results.json')
+                    completed = subprocess.run(
+                        [
+                            sys.executable, os.path.abspath(__file__),
+                            '--worker', predictor_name,
+                            '--rows', str(rows),
+                            '--repeat', str(repeat),
+                            '--epochs', str(epochs),
+                            '--feature-dtype', feature_dtype,
+                            '--worker-output', output
+                        ],
+                        cwd=work_dir,
+                        env=env,
+                        stdout=None if verbose else subprocess.DEVNULL,
+                        stderr=None if verbose else subprocess.PIPE,
+                        text=True
+                    )
+                    if completed.returncode != 0:
+                        raise RuntimeError(
+                            f"Benchmark of {predictor_name} with {rows} rows ({feature_dtype}) failed:\n"
+                            f"{completed.stderr or ''}"
+                        )
+                    with open(output) as f:
+                        results.extend(json.load(f))
+
+    return {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'environment': environment_info(),
+        'results': results
+    }
+
+
+def compare_results(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Find benchmarks that got slower or use more memory than in a baseline.
+
+    Benchmarks are matched on predictor, benchmark name, history size and
+    feature dtype; benchmarks missing from either document are skipped.
+
+    Args:
+        current (dict): Results document of this run.
+        baseline (dict): Results document to compare against.
+        threshold (float): Relative increase of the median time or the peak
+            memory that counts as a regression.
+
+    Returns:
+        list: Regression descriptions, empty if there are none.
+    """
+    def key(result):
+        return result['predictor'], result['benchmark'], result['rows'], result.get('feature_dtype', 'float64')
+
+    baseline_results = {key(result): result for result in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        previous = baseline_results.get(key(result))
+        if previous is None:
+            continue
+        for metric in ['median', 'peak_memory_bytes']:
+            if previous[metric] and result[metric] > previous[metric] * (1 + threshold):
+                regressions.append(
+                    f"{result['predictor']}.{result['benchmark']} ({result['rows']} rows): "
+                    f"{metric} {previous[metric]:.4g} -> {result[metric]:.4g} "
+                    f"({result[metric] / previous[metric]:.2f}x)"
+                )
+    return regressions
+
+
+def memory_report(results):
+    """
+    Compare the float32 feature path with the float64 default.
+
+    Peaks are what one call allocates; the float32 path also holds its
+    reused buffers between calls, which is reported next to them.
+
+    Args:
+        results (dict): Results document with runs of both feature dtypes.
+
+    Returns:
+        list: One dict per predictor, benchmark and history size with the
+            peaks and median times of both dtypes, their ratios and the
+            feature memory retained by the float32 predictor.
+    """
+    runs = {}
+    for result in results['results']:
+        key = result['predictor'], result['benchmark'], result['rows']
+        runs.setdefault(key, {})[result.get('feature_dtype', 'float64')] = result
+
+    report = []
+    for (predictor, benchmark, rows), by_dtype in runs.items():
+        if 'float64' not in by_dtype or 'float32' not in by_dtype:
+            continue
+        double, single = by_dtype['float64'], by_dtype['float32']
+        report.append({
+            'predictor': predictor,
+            'benchmark': benchmark,
+            'rows': rows,
+            'float64_peak_bytes': double['peak_memory_bytes'],
+            'float32_peak_bytes': single['peak_memory_bytes'],
+            'peak_ratio': (single['peak_memory_bytes'] / double['peak_memory_bytes']
+                           if double['peak_memory_bytes'] else None),
+            'float32_retained_bytes': single.get('retained_feature_bytes', 0),
+            'float64_median': double['median'],
+            'float32_median': single['median'],
+            'time_ratio': single['median'] / double['median']
+        })
+    return report
+
+
+def main():
+    """Run the benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description='Benchmark the carbon credit price predictors')
+    parser.add_argument('--predictors', nargs='+', choices=sorted(MODEL_DIRS), default=sorted(MODEL_DIRS),
+                        help='Predictors to benchmark')
+    parser.add_argument('--sizes', nargs='+', type=int, default=DEFAULT_SIZES, help='History sizes in rows')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per operation (training runs once)')
+    parser.add_argument('--epochs', type=int, default=1, help='LSTM training epochs')
+    parser.add_argument('--output', default='bench_results.json', help='JSON file to write the results to')
+    parser.add_argument('--compare', help='Baseline results JSON file to check for regressions')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Relative increase counted as a regression')
+    parser.add_argument('--dtypes', nargs='+', choices=FEATURE_DTYPES, default=['float64'],
+                        help='Feature dtypes to benchmark; with both, a memory report compares them')
+    parser.add_argument('--verbose', action='store_true', help="Show the predictors' output")
+    parser.add_argument('--worker', choices=sorted(MODEL_DIRS), help=argparse.SUPPRESS)
+    parser.add_argument('--rows', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--worker-output', help=argparse.SUPPRESS)
+    parser.add_argument('--feature-dtype', default='float64', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.rows, args.repeat, args.epochs, args.worker_output, args.feature_dtype)
+        return 0
+
+    results = run_benchmarks(args.predictors, args.sizes, args.repeat, args.epochs, args.verbose, args.dtypes)
+    results['memory_report'] = memory_report(results)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=4)
+
+    for result in results['results']:
+        print(
+            f"{result['predictor']:>20} {result['benchmark']:>17} {result['rows']:>8} rows "
+            f"{result['feature_dtype']}: "
+            f"median {result['median'] * 1000:10.2f} ms, "
+            f"peak {result['peak_memory_bytes'] / 2 ** 20:8.1f} MiB"
+        )
+    if results['memory_report']:
+        print("Peak memory, float64 -> float32:")
+    for entry in results['memory_report']:
+        print(
+            f"{entry['predictor']:>20} {entry['benchmark']:>17} {entry['rows']:>8} rows: "
+            f"{entry['float64_peak_bytes'] / 2 ** 20:8.1f} -> {entry['float32_peak_bytes'] / 2 ** 20:8.1f} MiB "
+            f"(+{entry['float32_retained_bytes'] / 2 ** 20:.1f} MiB retained), "
+            f"{entry['time_ratio']:.2f}x time"
+        )
+    print(f"Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare_results(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
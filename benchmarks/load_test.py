@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+API Load Test
+
+This script measures the latency and throughput the AI API
+(CarbonSol/ai-models/api.py) sustains under concurrent load. It starts the
+API locally with models trained on synthetic data (or targets a running
+server with --url), then drives a weighted mix of /predict/price,
+/calculate/footprint and /analyze/project requests from closed-loop
+workers at each configured concurrency level, and reports p50/p95/p99
+latency and requests per second overall and per endpoint.
+
+Profiles bundle the concurrency levels, durations and pass/fail
+thresholds; the short 'ci' profile exits non-zero when a threshold is
+exceeded:
+
+    python benchmarks/load_test.py --profile ci
+    python benchmarks/load_test.py --profile full --output load.json
+    python benchmarks/load_test.py --url http://localhost:5000 --concurrency 16 32
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+import requests
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+API_DIR = os.path.join(REPO_ROOT, 'CarbonSol', 'ai-models')
+
+# Concurrency levels, seconds per level and thresholds checked at every level
+PROFILES = {
+    'ci': {
+        'concurrency': [4],
+        'duration': 10,
+        'warmup': 2,
+        'thresholds': {
+            'p99_ms': 2000,
+            'error_rate': 0.01,
+            'min_throughput': 10
+        }
+    },
+    'full': {
+        'concurrency': [1, 8, 32, 64],
+        'duration': 60,
+        'warmup': 5,
+        'thresholds': {
+            'error_rate': 0.01
+        }
+    }
+}
+
+# Share of requests per endpoint
+DEFAULT_MIX = {
+    'predict_price': 0.5,
+    'calculate_footprint': 0.3,
+    'analyze_project': 0.2
+}
+
+ENDPOINTS = {
+    'predict_price': '/predict/price',
+    'calculate_footprint': '/calculate/footprint',
+    'analyze_project': '/analyze/project'
+}
+
+REQUEST_TIMEOUT = 30
+
+
+class PayloadFactory:
+    """
+    Generates request payloads resembling frontend traffic.
+
+    Price requests draw their history from a fixed pool, so popular
+    histories repeat as they do in production and the forecast cache sees
+    a realistic share of hits.
+    """
+
+    def __init__(self, seed=42, n_histories=50, history_days=90):
+        """
+        Initialize the payload factory.
+
+        Args:
+            seed (int): Random seed.
+            n_histories (int): Number of distinct price histories.
+            history_days (int): Days per price history.
+        """
+        rng = np.random.default_rng(seed)
+        dates = [str(date) for date in np.datetime64('2023-01-01') + np.arange(history_days)]
+
+        self.histories = []
+        for _ in range(n_histories):
+            prices = 10 + np.cumsum(rng.normal(0, 0.2, history_days))
+            volumes = rng.integers(500, 5000, history_days)
+            self.histories.append([
+                {'date': date, 'price': round(float(price), 2), 'volume': int(volume)}
+                for date, price, volume in zip(dates, prices, volumes)
+            ])
+
+    def predict_price(self, rng):
+        """Build a /predict/price payload."""
+        # Popular histories are requested more often
+        index = min(int(rng.exponential(len(self.histories) / 5)), len(self.histories) - 1)
+        return {
+            'historical_data': self.histories[index],
+            'days_ahead': int(rng.choice([7, 30, 90], p=[0.3, 0.5, 0.2])),
+            'credit_type': str(rng.choice(['VCU', 'CER', 'GS']))
+        }
+
+    def calculate_footprint(self, rng):
+        """Build a /calculate/footprint payload."""
+        return {
+            'electricity_kwh': float(rng.uniform(100, 800)),
+            'natural_gas_kwh': float(rng.uniform(0, 1500)),
+            'car_petrol_km': float(rng.uniform(0, 2000)),
+            'bus_km': float(rng.uniform(0, 300)),
+            'flight_short_km': float(rng.choice([0, 0, 800, 2000])),
+            'beef_kg': float(rng.uniform(0, 8)),
+            'dairy_kg': float(rng.uniform(0, 15)),
+            'vegetables_kg': float(rng.uniform(5, 30))
+        }
+
+    def analyze_project(self, rng):
+        """Build an /analyze/project payload."""
+        return {'project_data': synthetic_project(rng)}
+
+
+def synthetic_project(rng):
+    """
+    Generate the features of one carbon reduction project.
+
+    Args:
+        rng (np.random.Generator): Random generator.
+
+    Returns:
+        dict: Project features as sent by the frontend.
+    """
+    return {
+        'project_type': str(rng.choice(['solar', 'wind', 'reforestation', 'landfill_gas', 'soil_carbon'])),
+        'region': str(rng.choice(['Asia', 'Europe', 'Africa', 'South America'])),
+        'verification_standard': str(rng.choice(['VCS', 'Gold Standard'])),
+        'size_hectares': float(rng.uniform(10, 5000)),
+        'duration_years': int(rng.integers(5, 40)),
+        'cost_per_ton': float(rng.uniform(2, 40)),
+        'total_investment': float(rng.uniform(1e5, 5e7)),
+        'expected_roi': float(rng.uniform(0, 0.3)),
+        'annual_reduction_tons': float(rng.uniform(1e3, 1e5)),
+        'total_reduction_tons': float(rng.uniform(1e4, 2e6)),
+        'biodiversity_score': float(rng.uniform(0, 1)),
+        'community_benefit_score': float(rng.uniform(0, 1)),
+        'jobs_created': int(rng.integers(0, 500)),
+        'permanence': float(rng.uniform(0, 1)),
+        'leakage': float(rng.uniform(0, 1)),
+        'additionality': float(rng.uniform(0, 1)),
+        'measurement': float(rng.uniform(0, 1)),
+        'social_impact': float(rng.uniform(0, 1))
+    }
+
+
+def train_models(model_dir, seed=42):
+    """
+    Train the price and project models on synthetic data and save them as
+    memory-mapped artifacts, so the server answers with real predictions.
+
+    Args:
+        model_dir (str): Directory to save the artifacts in.
+        seed (int): Random seed.
+
+    Returns:
+        dict: Environment variables pointing the API at the artifacts.
+    """
+    import pandas as pd
+
+    sys.path.insert(0, API_DIR)
+    from price_prediction import PricePredictor
+    from project_analyzer import ProjectAnalyzer
+
+    rng = np.random.default_rng(seed)
+
+    days = 730
+    history = pd.DataFrame({
+        'date': pd.date_range('2021-01-01', periods=days),
+        'price': 10 + np.cumsum(rng.normal(0, 0.2, days)),
+        'volume': rng.integers(500, 5000, days)
+    })
+    price_predictor = PricePredictor()
+    price_predictor.train(history)
+    price_path = os.path.join(model_dir, 'price')
+    price_predictor.save_model(price_path, artifact_format='mmap')
+
+    projects = pd.DataFrame([synthetic_project(rng) for _ in range(500)])
+    projects['success'] = (projects['additionality'] > projects['leakage']).astype(int)
+    projects['actual_reduction_tons'] = projects['total_reduction_tons'] * rng.uniform(0.5, 1.1, len(projects))
+    project_analyzer = ProjectAnalyzer()
+    project_analyzer.train(projects)
+    project_path = os.path.join(model_dir, 'project')
+    project_analyzer.save_models(project_path, artifact_format='mmap')
+
+    return {'PRICE_MODEL_PATH': price_path, 'PROJECT_MODEL_PATH': project_path}
+
+
+def free_port():
+    """
+    Find a free local TCP port.
+
+    Returns:
+        int: The port number.
+    """
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(work_dir, env_vars, port, startup_timeout=60):
+    """
+    Start the API in a subprocess and wait until it is healthy.
+
+    Args:
+        work_dir (str): Working directory of the server (receives api.log).
+        env_vars (dict): Extra environment variables for the server.
+        port (int): Port to listen on.
+        startup_timeout (float): Seconds to wait for the health check.
+
+    Returns:
+        tuple: (subprocess.Popen, base URL)
+    """
+    env = dict(os.environ, PORT=str(port), **env_vars)
+    log = open(os.path.join(work_dir, 'server.log'), 'w')
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(API_DIR, 'api.py')],
+        cwd=work_dir, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+    url = f"http://127.0.0.1:{port}"
+
+    deadline = time.monotonic() + startup_timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"API server exited with code {process.returncode}; see {log.name}")
+        try:
+            if requests.get(f"{url}/health", timeout=1).status_code == 200:
+                return process, url
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+
+    process.terminate()
+    raise RuntimeError(f"API server did not become healthy within {startup_timeout}s")
+
+
+def run_level(url, concurrency, duration, mix, payloads, warmup=0, seed=42):
+    """
+    Drive the API with closed-loop workers for a fixed duration.
+
+    Each worker sends its next request as soon as the previous one has been
+    answered, so the number of requests in flight equals the concurrency.
+
+    Args:
+        url (str): Base URL of the API.
+        concurrency (int): Number of concurrent workers.
+        duration (float): Seconds to measure.
+        mix (dict): Share of requests per endpoint name.
+        payloads (PayloadFactory): Payload generator.
+        warmup (float): Seconds of load before measuring starts.
+        seed (int): Random seed.
+
+    Returns:
+        list: (endpoint name, latency in seconds, ok) per measured request.
+    """
+    names = list(mix)
+    weights = np.array([mix[name] for name in names], dtype=float)
+    weights /= weights.sum()
+
+    start = time.monotonic()
+    measure_from = start + warmup
+    deadline = measure_from + duration
+    samples = []
+    samples_lock = threading.Lock()
+
+    def worker(worker_id):
+        rng = np.random.default_rng([seed, concurrency, worker_id])
+        session = requests.Session()
+        local = []
+        while True:
+            name = names[rng.choice(len(names), p=weights)]
+            payload = getattr(payloads, name)(rng)
+            sent = time.monotonic()
+            if sent >= deadline:
+                break
+            try:
+                response = session.post(f"{url}{ENDPOINTS[name]}", json=payload, timeout=REQUEST_TIMEOUT)
+                ok = response.status_code == 200
+            except requests.RequestException:
+                ok = False
+            if sent >= measure_from:
+                local.append((name, time.monotonic() - sent, ok))
+        session.close()
+        with samples_lock:
+            samples.extend(local)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples
+
+
+def summarize(samples, duration):
+    """
+    Summarize request samples.
+
+    Args:
+        samples (list): (endpoint name, latency in seconds, ok) tuples.
+        duration (float): Measured seconds.
+
+    Returns:
+        dict: Request and error counts, error rate, throughput in requests
+            per second and latency percentiles in milliseconds.
+    """
+    latencies = np.array([latency for _, latency, _ in samples]) * 1000
+    errors = sum(1 for _, _, ok in samples if not ok)
+    summary = {
+        'requests': len(samples),
+        'errors': errors,
+        'error_rate': errors / len(samples) if samples else 0.0,
+        'throughput_rps': len(samples) / duration
+    }
+    if len(latencies):
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        summary['latency_ms'] = {
+            'p50': float(p50),
+            'p95': float(p95),
+            'p99': float(p99),
+            'mean': float(latencies.mean()),
+            'max': float(latencies.max())
+        }
+    return summary
+
+
+def check_thresholds(level, thresholds):
+    """
+    Check a concurrency level's summary against the profile thresholds.
+
+    Args:
+        level (dict): Summary of one concurrency level.
+        thresholds (dict): Optional 'p50_ms', 'p95_ms', 'p99_ms',
+            'error_rate' maxima and 'min_throughput' minimum.
+
+    Returns:
+        list: Descriptions of the exceeded thresholds.
+    """
+    failures = []
+    prefix = f"concurrency {level['concurrency']}"
+    latency = level.get('latency_ms', {})
+    for percentile in ['p50', 'p95', 'p99']:
+        limit = thresholds.get(f"{percentile}_ms")
+        if limit is not None and latency.get(percentile, float('inf')) > limit:
+            failures.append(f"{prefix}: {percentile} {latency.get(percentile, float('nan')):.1f} ms > {limit} ms")
+    if 'error_rate' in thresholds and level['error_rate'] > thresholds['error_rate']:
+        failures.append(f"{prefix}: error rate {level['error_rate']:.2%} > {thresholds['error_rate']:.2%}")
+    if 'min_throughput' in thresholds and level['throughput_rps'] < thresholds['min_throughput']:
+        failures.append(
+            f"{prefix}: throughput {level['throughput_rps']:.1f} req/s < {thresholds['min_throughput']} req/s"
+        )
+    return failures
+
+
+def run_load_test(url, concurrency_levels, duration, warmup=0, mix=None, thresholds=None, seed=42):
+    """
+    Run the load test at each concurrency level.
+
+    Args:
+        url (str): Base URL of the API.
+        concurrency_levels (list): Numbers of concurrent workers.
+        duration (float): Seconds measured per level.
+        warmup (float): Seconds of unmeasured load before each level.
+        mix (dict, optional): Share of requests per endpoint name.
+        thresholds (dict, optional): Thresholds checked at every level.
+        seed (int): Random seed.
+
+    Returns:
+        dict: Report with a summary per level and endpoint, and the
+            exceeded thresholds under 'failures'.
+    """
+    mix = mix or DEFAULT_MIX
+    payloads = PayloadFactory(seed)
+    levels = []
+    failures = []
+
+    for concurrency in concurrency_levels:
+        print(f"Running {concurrency} concurrent workers for {duration}s...", flush=True)
+        samples = run_level(url, concurrency, duration, mix, payloads, warmup, seed)
+
+        level = {'concurrency': concurrency, **summarize(samples, duration), 'endpoints': {}}
+        for name in mix:
+            endpoint_samples = [sample for sample in samples if sample[0] == name]
+            level['endpoints'][name] = summarize(endpoint_samples, duration)
+        levels.append(level)
+        failures.extend(check_thresholds(level, thresholds or {}))
+
+    return {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'url': url,
+        'duration': duration,
+        'mix': mix,
+        'thresholds': thresholds or {},
+        'levels': levels,
+        'failures': failures
+    }
+
+
+def print_report(report):
+    """Print a latency and throughput table for a load test report."""
+    print(f"{'concurrency':>11} {'endpoint':>20} {'requests':>9} {'errors':>7} "
+          f"{'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for level in report['levels']:
+        rows = [('all', level)] + list(level['endpoints'].items())
+        for name, summary in rows:
+            latency = summary.get('latency_ms', {})
+            print(
+                f"{level['concurrency']:>11} {name:>20} {summary['requests']:>9} {summary['errors']:>7} "
+                f"{summary['throughput_rps']:>8.1f} {latency.get('p50', float('nan')):>8.1f} "
+                f"{latency.get('p95', float('nan')):>8.1f} {latency.get('p99', float('nan')):>8.1f}"
+            )
+
+
+def main():
+    """Run the load test from the command line."""
+    parser = argparse.ArgumentParser(description='Load test the CarbonSol AI API')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='ci', help='Load test profile')
+    parser.add_argument('--url', help='Base URL of a running API; by default one is started locally')
+    parser.add_argument('--concurrency', nargs='+', type=int, help='Concurrency levels (overrides the profile)')
+    parser.add_argument('--duration', type=float, help='Seconds per level (overrides the profile)')
+    parser.add_argument('--output', help='JSON file to write the report to')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the payloads')
+    args = parser.parse_args()
+
+    profile = PROFILES[args.profile]
+    concurrency = args.concurrency or profile['concurrency']
+    duration = args.duration or profile['duration']
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        server = None
+        url = args.url
+        if url is None:
+            print("Training models and starting the API...", flush=True)
+            env_vars = train_models(work_dir, args.seed)
+            server, url = start_server(work_dir, env_vars, free_port())
+
+        try:
+            report = run_load_test(
+                url, concurrency, duration,
+                warmup=profile['warmup'],
+                thresholds=profile['thresholds'],
+                seed=args.seed
+            )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+
+    report['profile'] = args.profile
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=4)
+        print(f"Report written to {args.output}")
+
+    for failure in report['failures']:
+        print(f"Threshold exceeded: {failure}")
+    return 1 if report['failures'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())